@@ -0,0 +1,72 @@
+import numpy as np
+
+# Chart angles from sidereal time, latitude and obliquity, vectorized: every function takes NumPy
+# arrays (or scalars) that broadcast together and works in degrees
+
+# Unix time of JD 2451545.0 (J2000.0, 2000-01-01 12:00 UT)
+J2000_UNIX = 946728000.0
+
+def julian_centuries(times):
+    return (np.asarray(times, dtype=np.float64) - J2000_UNIX) / (86400 * 36525)
+
+# Mean obliquity of the ecliptic (IAU 1980)
+def mean_obliquity(times):
+    t = julian_centuries(times)
+    return 23.439291111 - (46.8150 * t + 0.00059 * t ** 2 - 0.001813 * t ** 3) / 3600
+
+# Greenwich mean sidereal time (IAU 1982), UT taken as unix time
+def greenwich_sidereal_time(times):
+    t = julian_centuries(times)
+    days = (np.asarray(times, dtype=np.float64) - J2000_UNIX) / 86400
+    return (280.46061837 + 360.98564736629 * days + 0.000387933 * t ** 2 - t ** 3 / 38710000) % 360
+
+# Right ascension of the meridian (local sidereal time in degrees) for east-positive longitudes
+def ramc(times, longitude):
+    return (greenwich_sidereal_time(times) + np.asarray(longitude, dtype=np.float64)) % 360
+
+# Ecliptic longitude of the meridian
+def midheaven(ramc, obliquity):
+    r, e = np.radians(ramc), np.radians(obliquity)
+    return np.degrees(np.arctan2(np.sin(r), np.cos(r) * np.cos(e))) % 360
+
+# Ecliptic longitude rising on the eastern horizon
+def ascendant(ramc, obliquity, latitude):
+    r, e, f = np.radians(ramc), np.radians(obliquity), np.radians(latitude)
+    longitude = np.degrees(np.arctan2(np.cos(r), -(np.sin(r) * np.cos(e) + np.tan(f) * np.sin(e)))) % 360
+    # Inside the polar circles the formula can give the descendant instead; the ascendant is the
+    # intersection east of the meridian
+    west = (np.asarray(ramc) - right_ascension_of_longitude(longitude, obliquity)) % 360 < 180
+    return (longitude + 180 * west) % 360
+
+# Ecliptic longitude of the vertex, where the ecliptic crosses the prime vertical in the west: the
+# ascendant of the opposite meridian at the co-latitude
+def vertex(ramc, obliquity, latitude):
+    latitude = np.asarray(latitude, dtype=np.float64)
+    colatitude = np.where(latitude >= 0, 90 - latitude, -90 - latitude)
+    return ascendant(np.asarray(ramc, dtype=np.float64) + 180, obliquity, colatitude)
+
+# Ascendant, midheaven and vertex (degrees of tropical longitude) for unix times and geographic
+# coordinates (degrees, east and north positive). The inputs broadcast together: a day of minutes
+# at one place, one instant over a latitude x longitude grid, or both at once
+def chart_angles(times, latitude, longitude):
+    times = np.asarray(times, dtype=np.float64)
+    meridian = ramc(times, longitude)
+    obliquity = mean_obliquity(times)
+    return ascendant(meridian, obliquity, latitude), midheaven(meridian, obliquity), vertex(meridian, obliquity, latitude)
+
+# Zodiac sign index (0 = Aries ... 11 = Pisces) of ecliptic longitudes
+def sign_index(longitude):
+    return (np.floor(np.asarray(longitude, dtype=np.float64) / 30) % 12).astype(int)
+
+# Ecliptic longitude of the point with right ascension `ra`
+def ecliptic_longitude_of_ra(ra, obliquity):
+    return midheaven(ra, obliquity)
+
+# Right ascension of the ecliptic point at `longitude`
+def right_ascension_of_longitude(longitude, obliquity):
+    l, e = np.radians(longitude), np.radians(obliquity)
+    return np.degrees(np.arctan2(np.sin(l) * np.cos(e), np.cos(l))) % 360
+
+# Declination of the ecliptic point at `longitude`
+def ecliptic_declination(longitude, obliquity):
+    return np.degrees(np.arcsin(np.sin(np.radians(obliquity)) * np.sin(np.radians(longitude))))
@@ -0,0 +1,28 @@
+# Constants shared by the live scalpers, the backtest harness and the astro engines
+
+BODIES = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+# Observer of the scalpers' get_current_aspects() (Timișoara)
+SCALPER_LOCATION = (45.75415, 21.21621)
+# ephem dates count days from 1899-12-31 12:00 UTC
+UNIX_EPOCH_EPHEM = 25567.5
+
+# Mood models: coordinate compared, aspects as (name, center, orb) with the first match winning,
+# and the score each aspect adds. "scalper" is evaluate_market_mood() over get_current_aspects()
+# (right-ascension separations); "cycles" is astrokk3.analyze_market_cycles() (heliocentric
+# longitudes, minor aspects taking precedence as in classify_aspects())
+MOOD_MODELS = {
+    "scalper": {
+        "coordinate": "ra",
+        "aspects": [("Conjunction", 0, 10), ("Sextile", 60, 8), ("Square", 90, 8), ("Trine", 120, 8),
+                    ("Opposition", 180, 10), ("Quincunx", 150, 8)],
+        "weights": {"Conjunction": 1, "Trine": 1, "Square": -1, "Opposition": -1}
+    },
+    "cycles": {
+        "coordinate": "hlon",
+        "aspects": [("Septile", 52.5, 2.5), ("Semi-square", 45, 5), ("Sesquiquadrate", 135, 5),
+                    ("Quintile", 75, 5), ("Biquintile", 149, 5), ("Conjunction", 0, 8),
+                    ("Opposition", 180, 8), ("Square", 90, 8), ("Trine", 120, 8), ("Sextile", 60, 8)],
+        "weights": {"Conjunction": 1, "Trine": 1, "Sextile": 1,
+                    "Opposition": -1, "Square": -1, "Semi-square": -1, "Sesquiquadrate": -1}
+    }
+}
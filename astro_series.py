@@ -0,0 +1,184 @@
+import datetime
+import json
+import os
+import sys
+import ephem
+import numpy as np
+from astro_constants import BODIES, MOOD_MODELS, SCALPER_LOCATION, UNIX_EPOCH_EPHEM
+from backtest import CHUNK, PAIRS, aspect_codes, sample_grid, sample_positions
+
+# Precomputed astro signals: the scalpers' market-mood counts and aspect bitmasks, moon phase, age
+# and constellation, and astrob's FGI components, materialized once at 1-minute resolution into a
+# directory of .npy columns. Readers memory-map the columns and align them to candles by integer
+# index, so research code never calls PyEphem
+
+SERIES_DIR = os.environ.get("ASTRO_SERIES_DIR", os.path.join(os.path.expanduser("~"), ".cache", "astro", "series"))
+STEP_SECONDS = 60
+# astrob's FGI takes ~10 ms per evaluation, so it is sampled this often and held in between
+FGI_STEP_SECONDS = 3600
+META_FILE = "meta.json"
+# Aspects of get_current_aspects(); bit p of mask_<aspect> is set when pair p of PAIR_NAMES forms it
+ASPECTS = MOOD_MODELS["scalper"]["aspects"]
+PAIR_NAMES = [f"{BODIES[i]}-{BODIES[j]}" for i, j in zip(*PAIRS)]
+
+def mask_column(name):
+    return "mask_" + name.lower()
+
+# Times (unix seconds) at which ephem's constellation of the Moon changes within the samples, to
+# the second, and the constellation from each of them on
+def moon_constellations(samples):
+    moon = ephem.Moon()
+
+    def constellation(t):
+        moon.compute(t / 86400 + UNIX_EPOCH_EPHEM)
+        return ephem.constellation(moon)[1]
+
+    names = [constellation(t) for t in samples]
+    times, values = [samples[0]], [names[0]]
+    for i in range(1, len(samples)):
+        if names[i] != names[i - 1]:
+            low, high = samples[i - 1], samples[i]
+            while high - low > 1:
+                middle = np.floor((low + high) / 2)
+                if constellation(middle) == names[i - 1]:
+                    low = middle
+                else:
+                    high = middle
+            times.append(high)
+            values.append(names[i])
+    return np.array(times), values
+
+# New moons (unix seconds) from the one before samples[0] to the one after samples[-1]
+def new_moons(samples):
+    moons = [ephem.previous_new_moon(samples[0] / 86400 + UNIX_EPOCH_EPHEM)]
+    while (moons[-1] - UNIX_EPOCH_EPHEM) * 86400 <= samples[-1]:
+        moons.append(ephem.next_new_moon(moons[-1] + 1))
+    return (np.array(moons, dtype=np.float64) - UNIX_EPOCH_EPHEM) * 86400
+
+def moon_phases(samples):
+    moon = ephem.Moon()
+    phases = np.empty(len(samples))
+    for i, t in enumerate(samples / 86400 + UNIX_EPOCH_EPHEM):
+        moon.compute(t)
+        phases[i] = moon.phase
+    return phases
+
+def fgi_components(start, count, step, location):
+    import pytz
+    import astrob
+    start_time = datetime.datetime.fromtimestamp(start, pytz.UTC)
+    observer = astrob.setup_observer(location[0], location[1], start_time)
+    _, planets = astrob.get_planetary_positions(observer)
+    return astrob.calculate_fgi_component_series(observer, planets, start_time, datetime.timedelta(seconds=step), count)
+
+# Write the series for [start, end) (unix seconds, snapped to `step`) into the directory `path`
+def generate(start, end, path=SERIES_DIR, step=STEP_SECONDS, fgi_step=FGI_STEP_SECONDS,
+             location=SCALPER_LOCATION, fgi=True):
+    start = np.floor(start / step) * step
+    count = int(np.ceil((end - start) / step))
+    times = start + step * np.arange(count, dtype=np.float64)
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".npy"):
+            os.remove(os.path.join(path, name))
+
+    def column(name, dtype):
+        return np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode="w+", dtype=dtype, shape=(count,))
+
+    samples = sample_grid(times)
+    positions = sample_positions(samples, MOOD_MODELS["scalper"]["coordinate"], location)
+    bullish = column("mood_bullish", np.int16)
+    bearish = column("mood_bearish", np.int16)
+    masks = [column(mask_column(name), np.uint64) for name, _, _ in ASPECTS]
+    bits = np.left_shift(np.uint64(1), np.arange(len(PAIR_NAMES), dtype=np.uint64))[:, None]
+    weights = MOOD_MODELS["scalper"]["weights"]
+    for begin in range(0, count, CHUNK):
+        code = aspect_codes(times[begin:begin + CHUNK], samples, positions, ASPECTS)
+        # get_current_aspects() lists each pair in both orders, so its counts are twice the pair counts
+        for k, (name, _, _) in enumerate(ASPECTS):
+            present = code == k
+            masks[k][begin:begin + CHUNK] = np.bitwise_or.reduce(np.where(present, bits, np.uint64(0)), axis=0)
+        bullish[begin:begin + CHUNK] = 2 * np.isin(code, [k for k, a in enumerate(ASPECTS) if weights.get(a[0], 0) > 0]).sum(axis=0)
+        bearish[begin:begin + CHUNK] = 2 * np.isin(code, [k for k, a in enumerate(ASPECTS) if weights.get(a[0], 0) < 0]).sum(axis=0)
+
+    column("moon_phase", np.float32)[:] = np.interp(times, samples, moon_phases(samples))
+    moons = new_moons(samples)
+    column("moon_age", np.float32)[:] = (times - moons[np.searchsorted(moons, times, side="right") - 1]) / 86400
+    changes, constellations = moon_constellations(samples)
+    column("moon_constellation", np.uint8)[:] = np.searchsorted(changes, times, side="right") - 1
+
+    if fgi:
+        fgi_samples = np.arange(start, start + count * step, fgi_step)
+        held = np.searchsorted(fgi_samples, times, side="right") - 1
+        for name, values in fgi_components(start, len(fgi_samples), fgi_step, location).items():
+            column(f"fgi_{name}" if name != "fgi" else "fgi", np.float32)[:] = values[held]
+
+    meta = {"start": start, "step": step, "count": count, "fgi_step": fgi_step if fgi else None,
+            "location": list(location), "aspects": [name for name, _, _ in ASPECTS], "pairs": PAIR_NAMES,
+            "moon_constellations": constellations}
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return AstroSeries(path)
+
+# Read side: every column is a read-only memory map; series.moon_phase etc. return the full column
+class AstroSeries:
+    def __init__(self, path=SERIES_DIR):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.start = self.meta["start"]
+        self.step = self.meta["step"]
+        self.count = self.meta["count"]
+        self.columns = {name[:-4]: np.load(os.path.join(path, name), mmap_mode="r")
+                        for name in sorted(os.listdir(path)) if name.endswith(".npy")}
+
+    def __getattr__(self, name):
+        if name != "columns" and name in self.columns:
+            return self.columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return self.count
+
+    # Row of each unix time (seconds), -1 where it falls outside the series
+    def index(self, times):
+        rows = np.floor((np.asarray(times, dtype=np.float64) - self.start) / self.step).astype(np.int64)
+        rows[(rows < 0) | (rows >= self.count)] = -1
+        return rows
+
+    # Columns aligned to `times` (or a Candles' open times); rows outside the series are left out of
+    # the result's "valid" mask and carry the first row's values
+    def join(self, times, columns=None):
+        times = getattr(times, "time", times)
+        rows = self.index(times)
+        valid = rows >= 0
+        taken = np.where(valid, rows, 0)
+        joined = {name: self.columns[name][taken] for name in (columns or self.columns)}
+        joined["valid"] = valid
+        return joined
+
+    # Scalper mood (Bullish / Bearish / Neutral) for joined or full mood columns
+    @staticmethod
+    def mood(columns):
+        difference = columns["mood_bullish"].astype(np.int32) - columns["mood_bearish"]
+        return np.where(difference > 0, "Bullish", np.where(difference < 0, "Bearish", "Neutral"))
+
+    def constellation_names(self, codes):
+        return np.array(self.meta["moon_constellations"])[codes]
+
+    # Body pairs whose bit is set in an aspect mask value
+    def pairs(self, mask):
+        return [pair for p, pair in enumerate(self.meta["pairs"]) if int(mask) >> p & 1]
+
+if __name__ == "__main__":
+    import time
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    now = time.time()
+    started = time.perf_counter()
+    series = generate(now - days * 86400, now + 86400, fgi="--no-fgi" not in sys.argv)
+    print(f"Generated {len(series)} rows ({days + 1} days) in {SERIES_DIR} in {time.perf_counter() - started:.1f}s")
+    row = series.join(np.array([now]))
+    print(f"Now: mood {AstroSeries.mood(row)[0]} ({row['mood_bullish'][0]} bullish / {row['mood_bearish'][0]} bearish), "
+          f"moon phase {row['moon_phase'][0]:.1f}%, age {row['moon_age'][0]:.1f} days, "
+          f"in {series.constellation_names(row['moon_constellation'])[0]}")
+    for name, _, _ in ASPECTS:
+        print(f"  {name}: {', '.join(series.pairs(row[mask_column(name)][0])) or '-'}")
@@ -0,0 +1,147 @@
+import asyncio
+import contextlib
+import time
+import ephem
+import numpy as np
+from astro_constants import BODIES, MOOD_MODELS, SCALPER_LOCATION, UNIX_EPOCH_EPHEM
+
+# Event-driven astro state: each value (aspects, moon data, houses) is computed once and kept as a
+# snapshot until the next instant it can change (an aspect orb crossing, a moon age or sign change,
+# a house boundary). Reads between events come from the snapshot; run() refreshes at the events
+
+# Longest a snapshot is kept when no change is predicted within it
+MAX_HORIZON = 6 * 3600
+# Aspect crossings are extrapolated linearly from the current RA rates, so they are re-predicted
+# at least this often to keep the Moon's acceleration from accumulating
+ASPECT_HORIZON = 3600
+# Interval of the finite difference giving RA rates
+RATE_WINDOW = 60
+# Scan step and precision (seconds) when searching for the next change of a discrete value
+SCAN_STEP = 3600
+RESOLUTION = 1.0
+
+def ephem_date(t):
+    return t / 86400 + UNIX_EPOCH_EPHEM
+
+# Right ascensions (degrees) of BODIES at unix time t, as get_current_aspects() computes them
+def body_ras(t, location=SCALPER_LOCATION):
+    observer = ephem.Observer()
+    if location is not None:
+        observer.lat, observer.lon = str(location[0]), str(location[1])
+    observer.date = ephem_date(t)
+    ras = np.empty(len(BODIES))
+    for i, name in enumerate(BODIES):
+        body = getattr(ephem, name)()
+        body.compute(observer)
+        ras[i] = np.degrees(body.ra)
+    return ras
+
+# Seconds until each linear quantity value + rate * dt first reaches one of `levels` (inf if never)
+def first_crossings(values, rates, levels):
+    gaps = np.asarray(levels, dtype=np.float64)[None, :] - values[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dt = gaps / rates[:, None]
+    dt[~(dt > 0)] = np.inf
+    return dt.min(axis=1)
+
+# Next instant get_current_aspects() can change: an RA separation reaching an orb edge or an RA
+# wrapping through 0h
+def aspect_horizon(t, location=SCALPER_LOCATION, aspects=MOOD_MODELS["scalper"]["aspects"]):
+    ras = body_ras(t, location)
+    rates = (body_ras(t + RATE_WINDOW, location) - ras + 180) % 360 - 180
+    rates /= RATE_WINDOW
+    first, second = np.triu_indices(len(BODIES), 1)
+    difference = ras[first] - ras[second]
+    direction = np.where(difference < 0, -1.0, 1.0)
+    edges = [center + side * orb for _, center, orb in aspects for side in (-1, 1)]
+    pair_events = first_crossings(np.abs(difference), direction * (rates[first] - rates[second]), edges)
+    wrap_events = first_crossings(ras, rates, [0, 360])
+    return t + min(pair_events.min(), wrap_events.min(), ASPECT_HORIZON)
+
+# Next instant (to RESOLUTION) after t at which key(compute(t)) changes, scanning SCAN_STEP
+# ahead up to `limit` seconds and bisecting the step where it does
+def next_change(compute, t, key=lambda value: value, step=SCAN_STEP, limit=MAX_HORIZON):
+    current = key(compute(t))
+    low, end = t, t + limit
+    while low < end:
+        high = min(low + step, end)
+        if key(compute(high)) != current:
+            while high - low > RESOLUTION:
+                middle = (low + high) / 2
+                if key(compute(middle)) == current:
+                    low = middle
+                else:
+                    high = middle
+            return high
+        low = high
+    return end
+
+# Horizon for a value whose discrete parts (key) change at isolated instants; continuous parts
+# are refreshed at least every `tolerance` seconds
+def change_horizon(compute, key=lambda value: value, tolerance=MAX_HORIZON):
+    return lambda t: next_change(compute, t, key, limit=tolerance)
+
+def _report_failure(task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Astro state refresh stopped: {task.exception()!r}")
+
+class AstroState:
+    # sources: name -> (compute(unix time), horizon(unix time) -> unix time of the next possible change)
+    def __init__(self, sources, clock=time.time):
+        self.sources = sources
+        self.clock = clock
+        self.values = {}
+        self.expires = {}
+        self.metrics = {"reads": 0, "refreshes": 0}
+
+    # (value, expiry) of a source at `now`; pure, so it can run off the event loop
+    def evaluate(self, name, now):
+        compute, horizon = self.sources[name]
+        return compute(now), max(horizon(now), now + RESOLUTION)
+
+    def _store(self, name, evaluated):
+        self.values[name], self.expires[name] = evaluated
+        self.metrics["refreshes"] += 1
+        return self.values[name]
+
+    def refresh(self, name, now=None):
+        now = self.clock() if now is None else now
+        return self._store(name, self.evaluate(name, now))
+
+    def get(self, name):
+        self.metrics["reads"] += 1
+        if name not in self.values or self.clock() >= self.expires[name]:
+            return self.refresh(name)
+        return self.values[name]
+
+    def next_event(self):
+        return min(self.expires.values(), default=self.clock())
+
+    # Refresh every value at its predicted change instant, so reads never wait for a computation.
+    # The PyEphem evaluations and horizon searches run in `executor` (the loop's default thread
+    # pool when None), keeping the polling, stream and scanner loops responsive meanwhile
+    async def run(self, sleep=asyncio.sleep, executor=None):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = self.clock()
+            for name in self.sources:
+                if name not in self.values or now >= self.expires[name]:
+                    self._store(name, await loop.run_in_executor(executor, self.evaluate, name, now))
+            await sleep(max(self.next_event() - self.clock(), 0))
+
+    # Background run() for the duration of an `async with`; a failure is reported when it happens
+    # (reads then fall back to refreshing on expiry), and the task is cancelled on exit
+    @contextlib.asynccontextmanager
+    async def running(self):
+        task = asyncio.create_task(self.run())
+        task.add_done_callback(_report_failure)
+        try:
+            yield task
+        finally:
+            task.cancel()
+            # A failure was already reported by the callback
+            await asyncio.gather(task, return_exceptions=True)
+
+    def format_metrics(self):
+        upcoming = ", ".join(f"{name} in {self.expires[name] - self.clock():.0f}s" for name in sorted(self.expires))
+        return f"Astro state: {self.metrics['refreshes']} refreshes for {self.metrics['reads']} reads; next: {upcoming}"
@@ -1,14 +1,17 @@
 import ephem
-import geocoder
 import datetime
 import math
-import requests
 import numpy as np
 from dateutil import tz
 import matplotlib.pyplot as plt
 from matplotlib.patches import Wedge
 import pytz
-from timezonefinder import TimezoneFinder
+from location import resolve_location, location_timezone
+import spectral
+from angles import chart_angles
+from houses import unix_time
+from sun_table import table_at
+from timeline import SIGNS, sign_timeline
 
 # Zodiac sign data with elemental associations and qualities
 zodiac_signs = [
@@ -93,33 +96,17 @@ ranges = [
     (0.5, 1.0, "Extreme Greed", "Exuberance and overconfidence peak.")
 ]
 
+# Offset from PyEphem's Dublin Julian Date to the standard Julian Date
+EPHEM_JD_OFFSET = 2415020.0
+
 # Planetary hours order (traditional Chaldean order)
 PLANETARY_HOURS = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
 
 # Get current geolocation and time
 def get_local_datetime():
-    try:
-        response = requests.get("http://ip-api.com/json", timeout=5)
-        data = response.json()
-        if data["status"] == "success":
-            lat, lon = data["lat"], data["lon"]
-            city = data["city"]
-            print(f"Estimated location via IP-API: {city} (Lat: {lat}, Lon: {lon})")
-        else:
-            raise Exception("IP-API failed")
-    except Exception:
-        print("IP-API failed. Falling back to geocoder.")
-        g = geocoder.ip('me')
-        if g.ok:
-            lat, lon = g.lat, g.lng
-            print(f"Estimated location via geocoder: Lat: {lat}, Lon: {lon}")
-        else:
-            print("Geocoder failed. Using default (Timișoara, Romania).")
-            lat, lon = 45.7537, 21.2257
-
-    tf = TimezoneFinder()
-    timezone_str = tf.timezone_at(lat=lat, lng=lon) or "UTC"
-    timezone = pytz.timezone(timezone_str)
+    location = resolve_location()
+    lat, lon = location["lat"], location["lon"]
+    timezone = location_timezone(location)
     local_time = timezone.localize(datetime.datetime.now())
     utc_time = local_time.astimezone(pytz.UTC)
     return local_time, utc_time, lat, lon, timezone
@@ -146,57 +133,15 @@ def get_zodiac_sign(longitude):
             return sign
     return "Pisces"  # Fallback for 330-360
 
-# Calculate planetary hours
+# Calculate planetary hours: the planetary day containing local_time, from the location's sun table
 def calculate_planetary_hours(local_time, lat, lon):
-    observer = setup_observer(lat, lon, local_time.astimezone(pytz.UTC))
-    
-    observer.horizon = '-0:34'
-    sunrise = observer.next_rising(ephem.Sun()).datetime().replace(tzinfo=pytz.UTC)
-    sunset = observer.next_setting(ephem.Sun()).datetime().replace(tzinfo=pytz.UTC)
-    
     timezone = local_time.tzinfo
-    sunrise = sunrise.astimezone(timezone)
-    sunset = sunset.astimezone(timezone)
-    
-    day_length = (sunset - sunrise).total_seconds() / 3600
-    night_length = 24 - day_length
-    
-    day_hour_length = day_length / 12
-    night_hour_length = night_length / 12
-    
-    day_of_week = local_time.weekday()
-    day_rulers = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
-    start_planet = day_rulers[day_of_week]
-    start_idx = PLANETARY_HOURS.index(start_planet)
-    
-    planetary_hours = []
-    current_time = sunrise
-    for i in range(12):
-        planet_idx = (start_idx + i) % 7
-        planet = PLANETARY_HOURS[planet_idx]
-        end_time = current_time + datetime.timedelta(hours=day_hour_length)
-        planetary_hours.append((current_time, end_time, planet, "Day"))
-        current_time = end_time
-    
-    current_time = sunset
-    for i in range(12):
-        planet_idx = (start_idx + 12 + i) % 7
-        planet = PLANETARY_HOURS[planet_idx]
-        end_time = current_time + datetime.timedelta(hours=night_hour_length)
-        planetary_hours.append((current_time, end_time, planet, "Night"))
-        current_time = end_time
-    
-    current_planet = None
-    for start, end, planet, period in planetary_hours:
-        if start <= local_time <= end:
-            current_planet = (planet, period, start, end)
-            break
-    
-    if current_planet is None:
-        closest_hour = min(planetary_hours, key=lambda x: abs((x[0] - local_time).total_seconds()))
-        current_planet = (closest_hour[2], closest_hour[3], closest_hour[0], closest_hour[1])
-        print(f"Warning: Local time {local_time} not within calculated hours. Using closest: {closest_hour[2]} from {closest_hour[0]} to {closest_hour[1]}")
-    
+    now = local_time.timestamp()
+    table = table_at(now, lat, lon)
+    planetary_hours = [(datetime.datetime.fromtimestamp(start, timezone), datetime.datetime.fromtimestamp(end, timezone), planet, period)
+                       for start, end, planet, period in table.schedule(now)]
+    planet, period, start, end = table.planetary_hour(now)
+    current_planet = (planet, period, datetime.datetime.fromtimestamp(start, timezone), datetime.datetime.fromtimestamp(end, timezone))
     return planetary_hours, current_planet
 
 # Calculate planetary positions with lunar mansions and chakra associations (Fixed)
@@ -208,13 +153,7 @@ def get_planetary_positions(observer):
         "Black Moon Lilith": None, "Dark Moon Lilith": None, "Asteroid Lilith": None, "Rahu": None, "Ketu": None
     }
 
-    asc = observer.radec_of(0, 0)[0]
-    mc = observer.radec_of(math.pi/2, 0)[0]
-    asc_long = ephem.Ecliptic(asc, 0, epoch=observer.date).lon
-    mc_long = ephem.Ecliptic(mc, 0, epoch=observer.date).lon
-
-    lst = observer.sidereal_time()
-    asc_trop = (rad_to_deg(lst) + rad_to_deg(observer.lon) * 15 / math.pi) % 360
+    asc_trop, mc_trop, _ = (float(a) for a in chart_angles(unix_time(observer.date), math.degrees(observer.lat), math.degrees(observer.lon)))
     asc_sidereal = (asc_trop - ayanamsa) % 360
     asc_sign_idx = int(asc_sidereal // 30)
     asc_sign, _, asc_element, asc_modality, asc_polarity = zodiac_signs[asc_sign_idx]
@@ -307,7 +246,7 @@ def get_planetary_positions(observer):
 
     positions["Ascendant"] = {
         "sidereal_long": asc_sidereal,
-        "tropical_long": rad_to_deg(asc_long),
+        "tropical_long": asc_trop,
         "house": 1,
         "sign": asc_sign,
         "element": asc_element,
@@ -324,22 +263,22 @@ def get_planetary_positions(observer):
         "color": element_colors[asc_element]
     }
     positions["Midheaven"] = {
-        "sidereal_long": (rad_to_deg(mc_long) - ayanamsa) % 360,
-        "tropical_long": rad_to_deg(mc_long),
+        "sidereal_long": (mc_trop - ayanamsa) % 360,
+        "tropical_long": mc_trop,
         "house": 10,
-        "sign": get_zodiac_sign(rad_to_deg(mc_long)),
-        "element": zodiac_elements[get_zodiac_sign(rad_to_deg(mc_long))][0],
-        "modality": next(s[3] for s in zodiac_signs if s[0] == get_zodiac_sign(rad_to_deg(mc_long))),
-        "polarity": next(s[4] for s in zodiac_signs if s[0] == get_zodiac_sign(rad_to_deg(mc_long))),
-        "nakshatra": nakshatras[int(((rad_to_deg(mc_long) - ayanamsa) % 360) / 13.3333) % 27][0],  # Fixed for 27 nakshatras
-        "nakshatra_ruler": nakshatras[int(((rad_to_deg(mc_long) - ayanamsa) % 360) / 13.3333) % 27][2],
-        "nakshatra_quality": nakshatras[int(((rad_to_deg(mc_long) - ayanamsa) % 360) / 13.3333) % 27][3],
-        "nakshatra_attribute": nakshatras[int(((rad_to_deg(mc_long) - ayanamsa) % 360) / 13.3333) % 27][4],
+        "sign": get_zodiac_sign(mc_trop),
+        "element": zodiac_elements[get_zodiac_sign(mc_trop)][0],
+        "modality": next(s[3] for s in zodiac_signs if s[0] == get_zodiac_sign(mc_trop)),
+        "polarity": next(s[4] for s in zodiac_signs if s[0] == get_zodiac_sign(mc_trop)),
+        "nakshatra": nakshatras[int(((mc_trop - ayanamsa) % 360) / 13.3333) % 27][0],  # Fixed for 27 nakshatras
+        "nakshatra_ruler": nakshatras[int(((mc_trop - ayanamsa) % 360) / 13.3333) % 27][2],
+        "nakshatra_quality": nakshatras[int(((mc_trop - ayanamsa) % 360) / 13.3333) % 27][3],
+        "nakshatra_attribute": nakshatras[int(((mc_trop - ayanamsa) % 360) / 13.3333) % 27][4],
         "chakra": "None",
         "chakra_sanskrit": "None",
         "chakra_energy": "None",
         "chakra_color": "gray",
-        "color": element_colors[zodiac_elements[get_zodiac_sign(rad_to_deg(mc_long))][0]]
+        "color": element_colors[zodiac_elements[get_zodiac_sign(mc_trop)][0]]
     }
     return positions, planets
 
@@ -436,7 +375,8 @@ def build_geometric_patterns(positions, aspects):
     return patterns
 
 # Calculate planetary cycles with symmetrical distance percentages
-def calculate_planetary_cycles(observer, planets, positions, local_time, timezone):
+# With numeric=True, returns a dict of float arrays (plus "names") instead of per-planet dicts
+def calculate_planetary_cycles(observer, planets, positions, numeric=False):
     cycles = {}
     original_date = observer.date
     observer.date = original_date - 1.0
@@ -460,56 +400,56 @@ def calculate_planetary_cycles(observer, planets, positions, local_time, timezon
         prev_positions[planet] = prev_long
 
     observer.date = original_date
-    max_velocity = 0
-    for planet in planets:
-        curr_long = positions[planet]["tropical_long"]
-        prev_long = prev_positions[planet]
-        delta_long = (curr_long - prev_long + 180) % 360 - 180
-        velocity = delta_long
-        cycle_length = 360 / abs(velocity) if abs(velocity) > 0.0001 else float('inf')
-        
-        curr_sidereal = positions[planet]["sidereal_long"]
-        cycle_progress = (curr_sidereal % 360) / 360
-        days_since_start = cycle_progress * cycle_length if velocity > 0 else (1 - cycle_progress) * cycle_length
-        days_to_end = (1 - cycle_progress) * cycle_length if velocity > 0 else cycle_progress * cycle_length
-        
-        start_date = ephem.Date(original_date - days_since_start)
-        end_date = ephem.Date(original_date + days_to_end)
-        start_tuple = [int(x) for x in start_date.tuple()[:6]]
-        end_tuple = [int(x) for x in end_date.tuple()[:6]]
-        start_local = timezone.fromutc(datetime.datetime(*start_tuple)).strftime('%Y-%m-%d %H:%M:%S %Z')
-        end_local = timezone.fromutc(datetime.datetime(*end_tuple)).strftime('%Y-%m-%d %H:%M:%S %Z')
-        
-        start_long = (curr_sidereal - (days_since_start * velocity)) % 360
-        max_long = (start_long + 180) % 360
-        end_long = (start_long + 360) % 360
-        
-        dist_to_start = cycle_progress * 100 if velocity > 0 else (1 - cycle_progress) * 100
-        dist_to_max = 100.0 - dist_to_start
-        
-        cycles[planet] = {
-            "velocity": velocity,
-            "cycle_length": cycle_length,
-            "retrograde": " (Retrograde)" if velocity < 0 else "",
-            "start_long": start_long,
-            "max_long": max_long,
-            "end_long": end_long,
-            "start_datetime": start_local,
-            "end_datetime": end_local,
-            "dist_to_start": dist_to_start,
-            "dist_to_max": dist_to_max
-        }
-        max_velocity = max(max_velocity, abs(velocity))
+    names = list(planets)
+    curr_long = np.array([positions[p]["tropical_long"] for p in names])
+    prev_long = np.array([prev_positions[p] for p in names])
+    curr_sidereal = np.array([positions[p]["sidereal_long"] for p in names])
+
+    velocity = (curr_long - prev_long + 180) % 360 - 180
+    with np.errstate(divide='ignore'):
+        cycle_length = np.where(np.abs(velocity) > 0.0001, 360 / np.abs(velocity), np.inf)
+    direct = velocity > 0
+    cycle_progress = (curr_sidereal % 360) / 360
+    days_since_start = np.where(direct, cycle_progress, 1 - cycle_progress) * cycle_length
+    days_to_end = np.where(direct, 1 - cycle_progress, cycle_progress) * cycle_length
+
+    start_long = (curr_sidereal - (days_since_start * velocity)) % 360
+    dist_to_start = np.where(direct, cycle_progress, 1 - cycle_progress) * 100
 
     sun_long = positions["Sun"]["sidereal_long"]
-    for planet in cycles:
-        vel = cycles[planet]["velocity"]
-        long = positions[planet]["sidereal_long"]
-        freq = (vel / max_velocity) * math.cos(math.radians(long - sun_long))
-        cycles[planet]["frequency"] = max(min(freq, 1.0), -1.0)
-
+    freq = (velocity / np.abs(velocity).max()) * np.cos(np.radians(curr_sidereal - sun_long))
+
+    # Dates stay numeric (Julian dates); format_cycle_datetime renders them only for reports
+    arrays = {
+        "names": names,
+        "velocity": velocity,
+        "cycle_length": cycle_length,
+        "start_jd": float(original_date) + EPHEM_JD_OFFSET - days_since_start,
+        "end_jd": float(original_date) + EPHEM_JD_OFFSET + days_to_end,
+        "start_long": start_long,
+        "max_long": (start_long + 180) % 360,
+        "end_long": (start_long + 360) % 360,
+        "dist_to_start": dist_to_start,
+        "dist_to_max": 100.0 - dist_to_start,
+        "frequency": np.clip(freq, -1.0, 1.0)
+    }
+    if numeric:
+        return arrays
+
+    fields = [key for key in arrays if key != "names"]
+    columns = [arrays[key].tolist() for key in fields]
+    for i, planet in enumerate(names):
+        cycles[planet] = {key: column[i] for key, column in zip(fields, columns)}
+        cycles[planet]["retrograde"] = " (Retrograde)" if cycles[planet]["velocity"] < 0 else ""
     return cycles
 
+# Human-readable local time for a cycle Julian date
+def format_cycle_datetime(jd, timezone):
+    if not math.isfinite(jd):
+        return "N/A"
+    utc = ephem.Date(jd - EPHEM_JD_OFFSET).datetime().replace(microsecond=0)
+    return timezone.fromutc(utc).strftime('%Y-%m-%d %H:%M:%S %Z')
+
 # Harmonic Resonance Analysis
 def calculate_harmonic_resonance(cycles, positions):
     resonance_pairs = []
@@ -546,22 +486,24 @@ def sacred_geometry(positions):
 # Spectral analysis
 def spectral_analysis(positions, dt, cycles, aspects):
     times = np.linspace(0, 24, 25)
-    energies = {}
-    for planet, data in positions.items():
-        if planet in ["Ascendant", "Midheaven", "Black Moon Lilith", "Dark Moon Lilith", "Asteroid Lilith", "Rahu", "Ketu"]:
-            continue
-        freq = cycles[planet]["frequency"]
-        amplitude = data["distance"]
-        phase = data["sidereal_long"] / 360 * 2 * math.pi
-        wave = [amplitude * math.sin(2 * math.pi * freq * t + phase) for t in times]
-        energies[planet] = wave
-
-    total_energy = np.sum(list(energies.values()), axis=0)
-    fft = np.fft.fft(total_energy)
-    freqs = np.fft.fftfreq(len(times), d=24/len(times))
-    predominant_freqs = sorted(zip(abs(fft), freqs), reverse=True)[:5]
-
-    planet_contributions = {p: sum(abs(np.fft.fft(wave))) for p, wave in energies.items()}
+    names = [p for p in positions if p not in ["Ascendant", "Midheaven", "Black Moon Lilith", "Dark Moon Lilith", "Asteroid Lilith", "Rahu", "Ketu"]]
+    freq = np.array([cycles[p]["frequency"] for p in names])
+    amplitude = np.array([positions[p]["distance"] for p in names])
+    phase = np.array([positions[p]["sidereal_long"] for p in names]) / 360 * 2 * math.pi
+    waves = amplitude[:, None] * np.sin(2 * math.pi * freq[:, None] * times + phase[:, None])
+
+    # Real input, so the one-sided rfft carries the whole spectrum
+    total_energy = waves.sum(axis=0)
+    fft_mag = np.abs(np.fft.rfft(total_energy))
+    freqs = np.fft.rfftfreq(len(times), d=24/len(times))
+    top_idx = np.argsort(fft_mag)[::-1][:5]
+    predominant_freqs = [(float(fft_mag[i]), float(freqs[i])) for i in top_idx]
+
+    # Sum of |FFT| over all bins: positive bins count twice (their mirror images), DC and Nyquist once
+    wave_mag = np.abs(np.fft.rfft(waves, axis=1))
+    mirrored = wave_mag[:, 1:-1] if len(times) % 2 == 0 else wave_mag[:, 1:]
+    contributions = wave_mag.sum(axis=1) + mirrored.sum(axis=1)
+    planet_contributions = dict(zip(names, contributions.tolist()))
     top_planets = sorted(planet_contributions.items(), key=lambda x: x[1], reverse=True)[:3]
 
     polarity = "Positive" if np.mean(total_energy) > 0 else "Negative"
@@ -584,32 +526,100 @@ def spectral_analysis(positions, dt, cycles, aspects):
                           f"influenced by {', '.join(f'{p} (Amp={a:.2f})' for p, a in top_planets)}. Daily Pulse: {pulse_desc} ({daily_pulse:.2f})"
     }
 
+# Positions, numeric cycles and aspects at each of `times` (aware datetimes); observer.date is restored afterwards
+def sample_fgi_inputs(observer, planets, times):
+    original_date = observer.date
+    try:
+        for sample_time in times:
+            observer.date = sample_time.astimezone(pytz.UTC)
+            positions, _ = get_planetary_positions(observer)
+            cycles = calculate_planetary_cycles(observer, planets, positions, numeric=True)
+            yield positions, cycles, calculate_aspects(positions)
+    finally:
+        observer.date = original_date
+
+# FGI components of every planet (arrays in positions order, angles excluded) from numeric cycles
+def fgi_components(positions, cycles, aspects):
+    names = [p for p in positions if p not in ["Ascendant", "Midheaven"]]
+    velocity = cycles["velocity"][[cycles["names"].index(p) for p in names]]
+    return planet_fgi_components(names, positions, velocity, aspects)
+
+# Mean of the planets' hourly FGI
+def mean_fgi(positions, cycles, aspects):
+    return np.mean(np.clip(sum(fgi_components(positions, cycles, aspects).values()), -1.0, 1.0))
+
+# Overall FGI and aspect-score series sampled every `step` from `start_time`
+def calculate_fgi_series(observer, planets, start_time, step, count):
+    fgi_series = np.empty(count)
+    aspect_series = np.empty(count)
+    times = [start_time + step * i for i in range(count)]
+    for i, (positions, cycles, aspects) in enumerate(sample_fgi_inputs(observer, planets, times)):
+        fgi_series[i] = mean_fgi(positions, cycles, aspects)
+        aspect_series[i] = sum(strength for _, _, _, _, strength in aspects)
+    return fgi_series, aspect_series
+
+# Mean planet FGI and mean of each of its components, sampled every `step` from `start_time`
+def calculate_fgi_component_series(observer, planets, start_time, step, count):
+    series = {name: np.empty(count) for name in ("fgi", "aspect", "zodiac", "velocity", "retrograde", "degree")}
+    times = [start_time + step * i for i in range(count)]
+    for i, inputs in enumerate(sample_fgi_inputs(observer, planets, times)):
+        components = fgi_components(*inputs)
+        series["fgi"][i] = np.mean(np.clip(sum(components.values()), -1.0, 1.0))
+        for name, values in components.items():
+            series[name][i] = np.mean(values)
+    return series
+
+# Span of the FGI cycle scan in the report: a week of hourly samples
+FGI_CYCLE_STEP = datetime.timedelta(hours=1)
+FGI_CYCLE_SAMPLES = 168
+
+# Dominant cycles (in hours) of the FGI and aspect-score series
+def analyze_fgi_cycles(fgi_series, aspect_series, step_hours, top=5, window="hann", segment_length=None, max_period=None):
+    return {
+        "fgi": spectral.dominant_periods(fgi_series, step_hours, top=top, window=window, segment_length=segment_length,
+                                         max_period=max_period),
+        "aspects": spectral.dominant_periods(aspect_series, step_hours, top=top, window=window, segment_length=segment_length,
+                                             max_period=max_period)
+    }
+
+# Additive components of the Fear and Greed Index of each planet in `names`, before clipping, as
+# arrays in that order; velocity holds the planets' velocities in the same order
+def planet_fgi_components(names, positions, velocity, aspects):
+    index = {name: i for i, name in enumerate(names)}
+    aspect_score = np.zeros(len(names))
+    for p1, p2, _, _, strength in aspects:
+        for planet in {p1, p2}:
+            if planet in index:
+                aspect_score[index[planet]] += strength
+    signs = [positions[name]["sign"] for name in names]
+    element_modifiers = {"Fire": 0.1, "Air": 0.05, "Earth": 0.0, "Water": -0.1}
+    zodiac_score = np.array([element_modifiers[zodiac_elements[sign][0]] for sign in signs])
+    mean_velocity = np.array([0.111404 if name == "Black Moon Lilith" else 1.0 for name in names])
+    velocity_factor = (velocity - mean_velocity) / mean_velocity * 0.3
+
+    retrograde = velocity < 0
+    debilitated = np.array([sign in dignities.get(name, {}).get("debilitated", []) for name, sign in zip(names, signs)], dtype=bool)
+    exalted = np.array([sign in dignities.get(name, {}).get("exalted", []) for name, sign in zip(names, signs)], dtype=bool)
+    dignity_factor = np.where(debilitated, -0.1, np.where(exalted, 0.05, 0.0))
+    retrograde_factor = np.where(retrograde, -0.2 - 0.1 * (np.abs(velocity) / mean_velocity) + dignity_factor, 0.0)
+
+    degree_score = np.sin(np.radians([positions[name]["sidereal_long"] for name in names])) * 0.2
+
+    return {"aspect": aspect_score, "zodiac": zodiac_score, "velocity": velocity_factor,
+            "retrograde": retrograde_factor, "degree": degree_score}
+
+# Additive components of a planet's Fear and Greed Index, before clipping
+def calculate_planet_fgi_components(planet_name, positions, cycles, planet_aspects):
+    components = planet_fgi_components([planet_name], positions, np.array([cycles[planet_name]["velocity"]]), planet_aspects)
+    return {name: float(values[0]) for name, values in components.items()}
+
 # Fear and Greed Index for a single planet with retrograde effects
 def calculate_planet_fear_greed_index(planet_name, positions, cycles, aspects):
     planet_aspects = [(p1, p2, asp, diff, strength) for p1, p2, asp, diff, strength in aspects 
                       if p1 == planet_name or p2 == planet_name]
-    velocity = cycles[planet_name]["velocity"]
-    sign = positions[planet_name]["sign"]
-    long = positions[planet_name]["sidereal_long"]
-
-    aspect_score = sum(strength for _, _, _, _, strength in planet_aspects)
-    element_modifiers = {"Fire": 0.1, "Air": 0.05, "Earth": 0.0, "Water": -0.1}
-    zodiac_score = element_modifiers[zodiac_elements[sign][0]]
-    mean_velocity = 0.111404 if planet_name == "Black Moon Lilith" else 1.0
-    velocity_factor = (velocity - mean_velocity) / mean_velocity * 0.3
-    
-    retrograde_factor = -0.2 if velocity < 0 else 0.0
-    if velocity < 0:
-        retrograde_impact = -0.1 * (abs(velocity) / mean_velocity)
-        retrograde_factor += retrograde_impact
-        if sign in dignities.get(planet_name, {}).get("debilitated", []):
-            retrograde_factor -= 0.1
-        elif sign in dignities.get(planet_name, {}).get("exalted", []):
-            retrograde_factor += 0.05
-    
-    degree_score = math.sin(math.radians(long)) * 0.2
+    components = calculate_planet_fgi_components(planet_name, positions, cycles, planet_aspects)
 
-    fear_greed_index = aspect_score + zodiac_score + velocity_factor + retrograde_factor + degree_score
+    fear_greed_index = sum(components.values())
     fear_greed_index = max(min(fear_greed_index, 1.0), -1.0)
 
     description, range_desc = next((desc, r_desc) for min_v, max_v, desc, r_desc in ranges if min_v <= fear_greed_index <= max_v)
@@ -625,56 +635,46 @@ def calculate_hourly_fear_greed_index(positions, cycles, aspects):
             hourly_fgi[planet] = (float(index), str(desc))
     return hourly_fgi
 
+# Forecast step offsets per time frame: hourly for a day, daily for a week and month, every 10 days for a year
+FORECAST_STEPS = {
+    'daily': [datetime.timedelta(hours=hour) for hour in range(24)],
+    'weekly': [datetime.timedelta(days=day) for day in range(7)],
+    'monthly': [datetime.timedelta(days=day) for day in range(30)],
+    'yearly': [datetime.timedelta(days=day) for day in range(0, 365, 10)]
+}
+
+# Mean planet FGI at every distinct forecast step (shared steps are computed once), keyed by offset
+def calculate_forecast_fgi_samples(observer, planets, local_time):
+    offsets = sorted(set(step for steps in FORECAST_STEPS.values() for step in steps))
+    inputs = sample_fgi_inputs(observer, planets, [local_time + offset for offset in offsets])
+    return {offset: mean_fgi(*state) for offset, state in zip(offsets, inputs)}
+
 # Extended forecast calculation for multiple time frames
-def calculate_time_frame_forecasts(hourly_fgi, observer, planets, local_time, timezone):
-    forecasts = {'hourly': hourly_fgi, 'daily': 0.0, 'weekly': 0.0, 'monthly': 0.0, 'yearly': 0.0}
-    
-    daily_indices = []
-    for hour in range(24):
-        future_time = local_time + datetime.timedelta(hours=hour)
-        observer.date = future_time.astimezone(pytz.UTC)
-        positions, _ = get_planetary_positions(observer)
-        cycles = calculate_planetary_cycles(observer, planets, positions, future_time, timezone)
-        aspects = calculate_aspects(positions)
-        fgi = calculate_hourly_fear_greed_index(positions, cycles, aspects)
-        daily_indices.extend([idx for idx, _ in fgi.values()])
-    forecasts['daily'] = np.mean(daily_indices) if daily_indices else 0.0
-    
-    weekly_indices = []
-    for day in range(7):
-        future_time = local_time + datetime.timedelta(days=day)
-        observer.date = future_time.astimezone(pytz.UTC)
-        positions, _ = get_planetary_positions(observer)
-        cycles = calculate_planetary_cycles(observer, planets, positions, future_time, timezone)
-        aspects = calculate_aspects(positions)
-        fgi = calculate_hourly_fear_greed_index(positions, cycles, aspects)
-        weekly_indices.extend([idx for idx, _ in fgi.values()])
-    forecasts['weekly'] = np.mean(weekly_indices) if weekly_indices else 0.0
-    
-    monthly_indices = []
-    for day in range(30):
-        future_time = local_time + datetime.timedelta(days=day)
-        observer.date = future_time.astimezone(pytz.UTC)
-        positions, _ = get_planetary_positions(observer)
-        cycles = calculate_planetary_cycles(observer, planets, positions, future_time, timezone)
-        aspects = calculate_aspects(positions)
-        fgi = calculate_hourly_fear_greed_index(positions, cycles, aspects)
-        monthly_indices.extend([idx for idx, _ in fgi.values()])
-    forecasts['monthly'] = np.mean(monthly_indices) if monthly_indices else 0.0
-    
-    yearly_indices = []
-    for day in range(0, 365, 10):
-        future_time = local_time + datetime.timedelta(days=day)
-        observer.date = future_time.astimezone(pytz.UTC)
-        positions, _ = get_planetary_positions(observer)
-        cycles = calculate_planetary_cycles(observer, planets, positions, future_time, timezone)
-        aspects = calculate_aspects(positions)
-        fgi = calculate_hourly_fear_greed_index(positions, cycles, aspects)
-        yearly_indices.extend([idx for idx, _ in fgi.values()])
-    forecasts['yearly'] = np.mean(yearly_indices) if yearly_indices else 0.0
-    
+def calculate_time_frame_forecasts(hourly_fgi, observer, planets, local_time, samples=None):
+    if samples is None:
+        samples = calculate_forecast_fgi_samples(observer, planets, local_time)
+    forecasts = {'hourly': hourly_fgi}
+    for timeframe, steps in FORECAST_STEPS.items():
+        forecasts[timeframe] = np.mean([samples[step] for step in steps]) if steps else 0.0
     return forecasts
 
+# Periodicities (in hours) of FGI samples ({offset from local_time: FGI}, possibly unevenly spaced)
+# and, given Candles, of the log returns of their closes and those shared by both
+def analyze_market_fgi_cycles(samples, local_time, candles=None, top=5):
+    fgi_times = np.array([(local_time + offset).timestamp() / 3600 for offset in samples])
+    fgi_values = np.array(list(samples.values()))
+    # Periods beyond half the baseline, or shorter than two typical sample spacings, are not resolved
+    min_period, max_period = 2 * np.median(np.diff(np.sort(fgi_times))), np.ptp(fgi_times) / 2
+    result = {"fgi": spectral.lomb_scargle_periods(fgi_times, fgi_values, top=top, min_period=min_period, max_period=max_period),
+              "candles": [], "shared": []}
+    if candles is not None and len(candles) > 3:
+        candle_times = candles.time / 3600
+        result["candles"] = spectral.return_periods(candle_times, candles.close, top=top)
+        # Log returns rather than raw closes, so the price trend does not swamp the spectrum
+        result["shared"] = spectral.shared_periods(fgi_times, fgi_values, candle_times[1:], np.diff(np.log(candles.close)),
+                                                   top=top, min_period=min_period, max_period=max_period)
+    return result
+
 # Enhanced Fear and Greed Index with Quadrants and Quadrature
 def calculate_fear_greed_index(positions, cycles, aspects):
     lilith_fgi, description, lilith_aspects = calculate_planet_fear_greed_index("Black Moon Lilith", positions, cycles, aspects)
@@ -885,6 +885,9 @@ def calculate_planetary_positions():
         print("--------------------------------------------------")
         print(f"Moon Phase: {phase_name}, ~{moon_phase:.1f}% illuminated")
         print(f"Moon Zodiac: {positions['Moon']['sign']} (Sidereal: ~{positions['Moon']['sidereal_long']:.1f}°, House {positions['Moon']['house']})")
+        rising = sign_timeline(local_time.date(), lat, lon, timezone, ayanamsa=ayanamsa).next_change(utc_time.timestamp())
+        if rising is not None:
+            print(f"Ascendant enters {SIGNS[rising[1]]} at {datetime.datetime.fromtimestamp(rising[0], timezone).strftime('%H:%M:%S %Z')}")
         print("\nPlanetary Positions (Vedic Sidereal):")
         print("--------------------------------------------------")
         
@@ -921,16 +924,16 @@ def calculate_planetary_positions():
                 for inst in instances:
                     print(f"  {inst}")
 
-        cycles = calculate_planetary_cycles(observer, planets, positions, local_time, timezone)
+        cycles = calculate_planetary_cycles(observer, planets, positions)
         print("\nPlanetary Cycles (Sorted by Frequency, -1 to +1):")
         for planet, data in sorted(cycles.items(), key=lambda x: x[1]["frequency"]):
             print(f"{planet}:")
             print(f"  Velocity: {data['velocity']:.2f}°/day{data['retrograde']}")
             print(f"  Cycle Length: {data['cycle_length']:.2f} days")
             print(f"  Frequency: {data['frequency']:.2f}")
-            print(f"  Start Longitude: {data['start_long']:.2f}° at {data['start_datetime']}")
+            print(f"  Start Longitude: {data['start_long']:.2f}° at {format_cycle_datetime(data['start_jd'], timezone)}")
             print(f"  Max Longitude: {data['max_long']:.2f}°")
-            print(f"  End Longitude: {data['end_long']:.2f}° at {data['end_datetime']}")
+            print(f"  End Longitude: {data['end_long']:.2f}° at {format_cycle_datetime(data['end_jd'], timezone)}")
             print(f"  Distance to Start: {data['dist_to_start']:.2f}%")
             print(f"  Distance to Max: {data['dist_to_max']:.2f}% (Symmetrical Sum: {data['dist_to_start'] + data['dist_to_max']:.2f}%)")
 
@@ -954,6 +957,16 @@ def calculate_planetary_positions():
         print(f"Polarity: {analysis['polarity']}\nTrend: {analysis['trend']}")
         print(f"Energy Forecast: {analysis['energy_forecast']}")
 
+        fgi_series, aspect_series = calculate_fgi_series(observer, planets, local_time - FGI_CYCLE_STEP * (FGI_CYCLE_SAMPLES - 1),
+                                                         FGI_CYCLE_STEP, FGI_CYCLE_SAMPLES)
+        # Periods longer than half the span are not resolved by it
+        step_hours = FGI_CYCLE_STEP.total_seconds() / 3600
+        fgi_cycles = analyze_fgi_cycles(fgi_series, aspect_series, step_hours, max_period=FGI_CYCLE_SAMPLES * step_hours / 2)
+        print(f"\nFGI Cycles (past {FGI_CYCLE_SAMPLES} hourly samples):")
+        for name, label in (("fgi", "Mean FGI"), ("aspects", "Aspect Score")):
+            periods = ", ".join(f"{c['period']:.1f}h ({c['confidence']:.0%})" for c in fgi_cycles[name][:3])
+            print(f"  {label}: {periods or 'none'}")
+
         (fear_greed_index, description, lilith_aspects, range_desc, transition_desc, current_status, 
          quadrant_info, planet_fgis, overall_fgi, overall_desc, sidereal_fgi, sidereal_desc, quadrature) = calculate_fear_greed_index(positions, cycles, aspects)
         
@@ -989,7 +1002,8 @@ def calculate_planetary_positions():
         for planet, (index, desc) in hourly_fgi.items():
             print(f"  {planet}: {index:.2f} ({desc})")
 
-        forecasts = calculate_time_frame_forecasts(hourly_fgi, observer, planets, local_time, timezone)
+        forecast_samples = calculate_forecast_fgi_samples(observer, planets, local_time)
+        forecasts = calculate_time_frame_forecasts(hourly_fgi, observer, planets, local_time, forecast_samples)
         print("\nFear and Greed Forecasts:")
         for timeframe, value in forecasts.items():
             if timeframe == 'hourly':
@@ -997,6 +1011,11 @@ def calculate_planetary_positions():
             desc = next((d for min_v, max_v, d, _ in ranges if min_v <= value <= max_v), "Neutral")
             print(f"  {timeframe.capitalize()}: {value:.2f} ({desc})")
 
+        # The forecast steps are unevenly spaced (hourly, daily, every 10 days), hence Lomb-Scargle
+        market_cycles = analyze_market_fgi_cycles(forecast_samples, local_time, top=3)
+        print("FGI Forecast Cycles (Lomb-Scargle): " +
+              (", ".join(f"{c['period'] / 24:.1f}d ({c['confidence']:.0%})" for c in market_cycles["fgi"]) or "none"))
+
         reflection = generate_cosmic_reflection(local_time, positions["Ascendant"]["sign"], positions["Midheaven"]["sign"], 
                                                aspects, patterns, positions, cycles, analysis, fear_greed_index, description, 
                                                lilith_aspects, sacred_geo, overall_fgi, overall_desc, sidereal_fgi, sidereal_desc,
@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 import pytz
 import geocoder
 import math
+from angles import chart_angles
+from houses import unix_time
 
 # Constants for astrology
 PLANETS = {
@@ -111,15 +113,17 @@ observer.date = datetime.utcnow()
 current_datetime = datetime.now(pytz.utc).astimezone()  # Use local timezone
 observer.date = current_datetime
 
+def get_chart_angles(observer):
+    """Ascendant, Midheaven and Vertex ecliptic longitudes (degrees) for the observer."""
+    return chart_angles(unix_time(observer.date), math.degrees(observer.lat), math.degrees(observer.lon))
+
 def get_ascendant(observer):
     """Calculate Ascendant sign from the observer."""
-    ascendant = ephem.Sun(observer).ra
-    return get_zodiac_sign(math.degrees(ascendant) % 360)
+    return get_zodiac_sign(get_chart_angles(observer)[0])
 
 def get_midheaven(observer):
     """Calculate Midheaven sign from the observer."""
-    midheaven = ephem.Moon(observer).ra
-    return get_zodiac_sign(math.degrees(midheaven) % 360)
+    return get_zodiac_sign(get_chart_angles(observer)[1])
 
 def get_planet_data(observer):
     planet_data = {}
@@ -1,14 +1,12 @@
 import ephem
-import geocoder
 import datetime
 import math
-import requests
 import numpy as np
 from dateutil import tz
 import matplotlib.pyplot as plt
 from matplotlib.patches import Wedge
 import pytz
-from timezonefinder import TimezoneFinder
+from location import resolve_location, location_timezone
 
 # Elemental associations and qualities for zodiac signs (from images)
 zodiac_elements = {
@@ -64,32 +62,10 @@ ayanamsa = 24.0
 
 # Function to get current geolocation and time dynamically
 def get_local_datetime():
-    try:
-        # Try IP-API first
-        response = requests.get("http://ip-api.com/json")
-        data = response.json()
-        if data["status"] == "success":
-            lat = data["lat"]
-            lon = data["lon"]
-            city = data["city"]
-            print(f"Estimated location via IP-API: {city} (Lat: {lat}, Lon: {lon})")
-        else:
-            raise Exception("IP-API geolocation failed")
-    except Exception as e:
-        print(f"IP-API failed: {e}. Falling back to geocoder.")
-        g = geocoder.ip('me')
-        if g.ok:
-            lat, lon = g.lat, g.lng
-            print(f"Estimated location via geocoder: Lat: {lat}, Lon: {lon}")
-        else:
-            print("Geocoder failed. Using default (Timișoara, Romania).")
-            lat, lon = 45.7537, 21.2257
-
-    tf = TimezoneFinder()
-    timezone_str = tf.timezone_at(lat=lat, lng=lon)
-    timezone = pytz.timezone(timezone_str) if timezone_str else pytz.UTC
-    naive_local_time = datetime.datetime.now()  # Get current time
-    local_time = timezone.localize(naive_local_time)
+    location = resolve_location()
+    lat, lon = location["lat"], location["lon"]
+    timezone = location_timezone(location)
+    local_time = timezone.localize(datetime.datetime.now())
     utc_time = local_time.astimezone(pytz.UTC)
     return local_time, utc_time, lat, lon
 
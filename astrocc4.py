@@ -1,14 +1,12 @@
 import ephem
-import geocoder
 import datetime
 import math
-import requests
 import numpy as np
 from dateutil import tz
 import matplotlib.pyplot as plt
 from matplotlib.patches import Wedge
 import pytz
-from timezonefinder import TimezoneFinder
+from location import resolve_location, location_timezone
 
 # Zodiac sign data with elemental associations and qualities
 zodiac_signs = [
@@ -53,28 +51,9 @@ ayanamsa = 24.0
 
 # Get current geolocation and time
 def get_local_datetime():
-    try:
-        response = requests.get("http://ip-api.com/json", timeout=5)
-        data = response.json()
-        if data["status"] == "success":
-            lat, lon = data["lat"], data["lon"]
-            city = data["city"]
-            print(f"Estimated location via IP-API: {city} (Lat: {lat}, Lon: {lon})")
-        else:
-            raise Exception("IP-API failed")
-    except Exception:
-        print("IP-API failed. Falling back to geocoder.")
-        g = geocoder.ip('me')
-        if g.ok:
-            lat, lon = g.lat, g.lng
-            print(f"Estimated location via geocoder: Lat: {lat}, Lon: {lon}")
-        else:
-            print("Geocoder failed. Using default (Timișoara, Romania).")
-            lat, lon = 45.7537, 21.2257
-
-    tf = TimezoneFinder()
-    timezone_str = tf.timezone_at(lat=lat, lng=lon) or "UTC"
-    timezone = pytz.timezone(timezone_str)
+    location = resolve_location()
+    lat, lon = location["lat"], location["lon"]
+    timezone = location_timezone(location)
     local_time = timezone.localize(datetime.datetime.now())
     utc_time = local_time.astimezone(pytz.UTC)
     return local_time, utc_time, lat, lon
@@ -6,6 +6,8 @@ import math
 import matplotlib.pyplot as plt
 from matplotlib.patches import Wedge
 import random
+from angles import chart_angles
+from houses import house_cusps, unix_time
 
 # Get current date and time
 current_datetime = datetime.now()
@@ -30,6 +32,8 @@ observer.lat = str(latitude)
 observer.lon = str(longitude)
 observer.elev = 0
 observer.date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+# House system for the cusps: placidus, koch, porphyry, whole_sign or equal
+HOUSE_SYSTEM = "placidus"
 
 # Local timezone
 local_tz = datetime.now().astimezone().tzinfo
@@ -161,13 +165,10 @@ def generate_iching_hexagram(phase_angle, asc_deg):
             return hex_num, name, title, meaning
     return random.choice(iching_hexagrams)
 
-# Calculate house cusps (Equal House system)
-def calculate_house_cusps(asc_deg):
-    houses = {}
-    for i in range(1, 13):
-        cusp = (asc_deg + (i - 1) * 30) % 360
-        houses[f"House {i}"] = cusp
-    return houses
+# Calculate house cusps for the observer in the chosen house system
+def calculate_house_cusps(observer, system=HOUSE_SYSTEM):
+    cusps = house_cusps(unix_time(observer.date), math.degrees(observer.lat), math.degrees(observer.lon), system)
+    return {f"House {i + 1}": float(cusp) for i, cusp in enumerate(cusps)}
 
 # Calculate trigonometric relationships between houses and planets
 def calculate_trigonometric_relationships(positions, house_cusps):
@@ -272,6 +273,8 @@ def plot_astrological_wheel(positions, moon_phase, local_time_str, aspects, hous
 
 # Get Syzygy for the last New or Full Moon
 def get_syzygy(observer, current_date):
+    # Search on a copy so the caller's observer keeps its date
+    observer = observer.copy()
     moon = ephem.Moon()
     sun = ephem.Sun()
     current_dt = ephem.Date(current_date).datetime()
@@ -343,9 +346,9 @@ def astrological_clock():
         print(f"{name}: {positions[name]:.2f}° in {sign} ({element}, {modality}, {polarity}, {q1}, {q2})")
 
     # Ascendant
-    asc = observer.radec_of(0, 0)[0]
-    asc_deg = (math.degrees(asc) - observer.sidereal_time() * 180 / math.pi + 360) % 360
+    asc_deg, mc_deg, vertex_deg = (float(a) for a in chart_angles(unix_time(observer.date), math.degrees(observer.lat), math.degrees(observer.lon)))
     print(f"Ascendant: {asc_deg:.2f}°")
+    print(f"Midheaven: {mc_deg:.2f}°, Vertex: {vertex_deg:.2f}°")
 
     # Moon phase
     print("\nMoon Phase:")
@@ -381,9 +384,9 @@ def astrological_clock():
     print(f"Meaning: {hex_meaning}")
 
     # House cusps
-    print("\nHouse Cusps (Equal House System):")
+    print(f"\nHouse Cusps ({HOUSE_SYSTEM.replace('_', ' ').title()} House System):")
     print("-" * 40)
-    house_cusps = calculate_house_cusps(asc_deg)
+    house_cusps = calculate_house_cusps(observer)
     for house, cusp in house_cusps.items():
         sign, *_ = get_zodiac_sign(math.radians(cusp))
         print(f"{house}: {cusp:.2f}° in {sign}")
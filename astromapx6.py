@@ -2,8 +2,7 @@ import ephem
 import datetime
 import pytz
 import math
-from astroquery.jplhorizons import Horizons
-from astropy.time import Time
+import ephemeris
 
 def get_moon_phase_momentum(current_time):
     tz = pytz.timezone('Etc/GMT-3')  # Use 'Etc/GMT-3' for UTC+3
@@ -109,7 +108,7 @@ def get_astro_map_data(current_time):
     return astro_map_data
 
 def get_planet_positions():
-    now = Time.now()
+    now = ephemeris.julian_date_now()
 
     planets = [
         {'name': 'Mercury', 'id': '1'},
@@ -125,14 +124,12 @@ def get_planet_positions():
     planet_positions = {}
     sun_position = {}
 
+    # All planets and the Sun in one provider call: PyEphem within the accuracy budget, Horizons only beyond it
+    positions = ephemeris.get_positions([planet['id'] for planet in planets] + ['10'], now)
     for planet in planets:
-        obj = Horizons(id=planet['id'], location='500', epochs=now.jd)
-        eph = obj.ephemerides()[0]
-        planet_positions[planet['name']] = {'RA': eph['RA'], 'DEC': eph['DEC']}
+        planet_positions[planet['name']] = positions[planet['id']]
 
-    obj = Horizons(id='10', location='500', epochs=now.jd)
-    eph = obj.ephemerides()[0]
-    sun_position = {'RA': eph['RA'], 'DEC': eph['DEC']}
+    sun_position = positions['10']
 
     return planet_positions, sun_position
 
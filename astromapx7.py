@@ -4,8 +4,7 @@ import ephem
 import datetime
 import pytz
 import math
-from astroquery.jplhorizons import Horizons
-from astropy.time import Time
+import ephemeris
 from matplotlib.patches import Circle, Wedge, PathPatch
 from matplotlib.path import Path
 import warnings
@@ -425,7 +424,7 @@ def get_moon_phase_momentum(current_time):
 
 # Function to get planet positions with ecliptic coordinates
 def get_planet_positions():
-    now = Time.now()
+    now = ephemeris.julian_date_now()
     planets = [
         {'name': 'Mercury', 'id': '1', 'freq': 0.9, 'amp': 0.6},
         {'name': 'Venus', 'id': '2', 'freq': 0.6, 'amp': 0.9},
@@ -445,10 +444,10 @@ def get_planet_positions():
     observer.lon = '21.21621'
     observer.date = datetime.datetime.now(pytz.timezone('Europe/Bucharest'))  # Updated timezone
 
+    # All planets and the Sun in one provider call: PyEphem within the accuracy budget, Horizons only beyond it
+    positions = ephemeris.get_positions([planet['id'] for planet in planets] + ['10'], now)
     for planet in planets:
-        obj = Horizons(id=planet['id'], location='500', epochs=now.jd)
-        eph = obj.ephemerides()[0]
-        planet_positions[planet['name']] = {'RA': eph['RA'], 'DEC': eph['DEC']}
+        planet_positions[planet['name']] = dict(positions[planet['id']])
         
         # Get ecliptic longitude using ephem
         ephem_planet = getattr(ephem, planet['name'])()
@@ -478,10 +477,8 @@ def get_planet_positions():
     return planet_positions, planet_wave_properties
 
 def get_sun_position():
-    now = Time.now()
-    obj = Horizons(id='10', location='500', epochs=now.jd)
-    eph = obj.ephemerides()[0]
-    return {'RA': eph['RA'], 'DEC': eph['DEC']}
+    now = ephemeris.julian_date_now()
+    return ephemeris.get_positions(['10'], now)['10']
 
 # Main execution
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ import ephem
 import requests
 from datetime import datetime
 import pytz
-from geopy.geocoders import Nominatim
+import gazetteer
 
 # Constants
 phi = (1 + math.sqrt(5)) / 2  # Golden Ratio
@@ -27,13 +27,8 @@ def get_zodiac_sign(ra):
     return 'Unknown'
 
 def get_coordinates(city_name):
-    """Get latitude and longitude for a given city."""
-    geolocator = Nominatim(user_agent="astro_application")  # Use a descriptive user_agent
-    location = geolocator.geocode(city_name)
-    if location:
-        return location.latitude, location.longitude
-    else:
-        raise ValueError("City not found")
+    """Get latitude and longitude for a given city (bundled gazetteer, Nominatim as fallback)."""
+    return gazetteer.get_coordinates(city_name)
 
 def angular_distance(angle1, angle2):
     """Calculate the angular distance between two angles in radians."""
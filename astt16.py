@@ -6,6 +6,10 @@ import math
 import matplotlib.pyplot as plt
 from matplotlib.patches import Wedge
 import random
+from angles import chart_angles
+from houses import house_cusps, unix_time
+from sun_table import table_at
+from timeline import SIGNS, sign_timeline
 
 # --- Configuration and Data ---
 
@@ -29,6 +33,8 @@ observer.lat = str(latitude)
 observer.lon = str(longitude)
 observer.elev = 0
 observer.date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+# House system for the cusps: placidus, koch, porphyry, whole_sign or equal
+HOUSE_SYSTEM = "placidus"
 
 # Local timezone
 local_tz = datetime.now().astimezone().tzinfo
@@ -230,13 +236,10 @@ def visualize_hexagram(hexagram_lines):
         print(line_map[line_value])
     print("-" * 40)
 
-# Calculate house cusps (Equal House system for simplicity)
-def calculate_house_cusps(asc_deg):
-    houses = {}
-    for i in range(1, 13):
-        cusp = (asc_deg + (i - 1) * 30) % 360
-        houses[f"House {i}"] = cusp
-    return houses
+# Calculate house cusps for the observer in the chosen house system
+def calculate_house_cusps(observer, system=HOUSE_SYSTEM):
+    cusps = house_cusps(unix_time(observer.date), math.degrees(observer.lat), math.degrees(observer.lon), system)
+    return {f"House {i + 1}": float(cusp) for i, cusp in enumerate(cusps)}
 
 # Get Syzygy for the last New or Full Moon
 def get_syzygy(observer, current_date):
@@ -335,15 +338,17 @@ def plot_astrological_wheel(positions, moon_phase, local_time_str, aspects, hous
 
 # Main astrological clock function
 def astrological_clock():
-    sun = ephem.Sun()
-    sunrise_utc = observer.next_rising(sun).datetime()
-    sunset_utc = observer.next_setting(sun).datetime()
-    sunrise_local = pytz.utc.localize(sunrise_utc).astimezone(local_tz)
-    sunset_local = pytz.utc.localize(sunset_utc).astimezone(local_tz)
-    observer.date += 1  # To get next day's sunrise for nighttime boundary
-    next_sunrise_utc = observer.previous_rising(sun).datetime()
-    next_sunrise_local = pytz.utc.localize(next_sunrise_utc).astimezone(local_tz)
-    observer.date -= 1
+    day_start = unix_time(observer.date)
+    table = table_at(day_start, latitude, longitude)
+    # Events of this UTC day; None when the Sun does not rise or set (polar day or night)
+    def local(t):
+        return None if t is None else datetime.fromtimestamp(t, local_tz)
+
+    sunrise_local = local(table.event_between("sunrise_rise", day_start, day_start + 86400))
+    sunset_local = local(table.event_between("sunrise_set", day_start, day_start + 86400))
+    # Last sunrise before the next UTC midnight, the nighttime boundary
+    next_sunrise = table.previous_event("sunrise_rise", day_start + 86400)
+    next_sunrise_local = local(next_sunrise if next_sunrise is not None and next_sunrise >= day_start else None)
 
     # Check current time
     now = datetime.now(local_tz)
@@ -351,7 +356,9 @@ def astrological_clock():
     # Determine the current stage
     print("\nTime of Day:")
     print("-" * 40)
-    if sunrise_local <= now < sunrise_local + timedelta(hours=1):
+    if sunrise_local is None or sunset_local is None:
+        print("No sunrise or sunset today (polar day or night).")
+    elif sunrise_local <= now < sunrise_local + timedelta(hours=1):
         print("It's Early Morning!")
     elif sunrise_local + timedelta(hours=1) <= now < sunrise_local + timedelta(hours=3):
         print("It's Morning!")
@@ -361,16 +368,15 @@ def astrological_clock():
         print("It's Afternoon!")
     elif sunset_local - timedelta(hours=1) <= now < sunset_local:
         print("It's Late Afternoon!")
-    elif sunset_local <= now < next_sunrise_local:
+    elif next_sunrise_local is not None and sunset_local <= now < next_sunrise_local:
         print("It's Nighttime!")
     else:
         print("Time of day not precisely matched within defined ranges.")
 
 
     # Output sunrise and sunset times for reference
-    print(f"Sunrise: {sunrise_local.strftime('%H:%M:%S %Z')}")
-    print(f"Sunset: {sunset_local.strftime('%H:%M:%S %Z')}")
-    print(f"Next Sunrise: {next_sunrise_local.strftime('%H:%M:%S %Z')}")
+    for label, moment in (("Sunrise", sunrise_local), ("Sunset", sunset_local), ("Next Sunrise", next_sunrise_local)):
+        print(f"{label}: {moment.strftime('%H:%M:%S %Z') if moment else 'none'}")
 
     # Set observer to current UTC time for planetary positions
     observer.date = datetime.now(timezone.utc)
@@ -396,57 +402,19 @@ def astrological_clock():
 
 
     # Ascendant
-    # Calculate Ascendant in tropical degrees
     observer.date = datetime.now(timezone.utc) # Ensure observer date is current UTC
-    # Calculate Sidereal Time
-    sidereal_time = observer.sidereal_time()
-    # Calculate RA of Ascendant
-    ra_asc = math.atan2(-math.cos(sidereal_time), -math.sin(sidereal_time) * math.cos(observer.lat))
-    ra_asc = math.degrees(ra_asc) % 360
-
-    # Convert RA to Ecliptic Longitude (Approximation - more accurate methods exist)
-    # This conversion is complex and depends on the obliquity of the ecliptic.
-    # A simpler approximation using right ascension and declination could be used,
-    # or we can rely on ephem's internal calculations if a specific method is needed.
-    # For this script, let's use a simplified approach that might not be perfectly accurate
-    # compared to professional ephemeris software for ecliptic longitude from RA.
-    # A more robust approach would involve solving the spherical triangle.
-
-    # Let's use a simplified method for demonstration, acknowledging it's an approximation.
-    # A common approximation: convert RA to degrees and add/subtract based on hemisphere and time.
-    # A better approach would involve ephem's internal calculations if available for Ascendant ecliptic.
-    # Ephem's observer.radec_of(0,0) gives RA/Dec of Zenith, not directly Ascendant Ecliptic.
-    # Let's stick to the RA of the Ascendant for now and note the approximation.
-
-    # For plotting and Lot calculations, we need an ecliptic degree.
-    # A common simplification is to relate RA of Ascendant to Ecliptic Longitude.
-    # A more accurate way involves the observer's location and current sidereal time
-    # to find the intersection of the eastern horizon with the ecliptic.
-    # Ephem's `star.compute(observer)` calculates the position of a celestial body
-    # for the observer. We need the position of the *point* on the ecliptic.
-
-    # Let's revert to a common method for calculating Ascendant Ecliptic Longitude
-    # using Sidereal Time, Latitude, and Obliquity of the Ecliptic.
-    # Obliquity of the Ecliptic (approximate)
-    obliquity = math.radians(23.43928)
-    sin_st = math.sin(sidereal_time)
-    cos_st = math.cos(sidereal_time)
-    sin_lat = math.sin(observer.lat)
-    cos_lat = math.cos(observer.lat)
-    sin_obl = math.sin(obliquity)
-    cos_obl = math.cos(obliquity)
-
-    # Calculate Ecliptic Longitude of Ascendant (lambda_asc)
-    # Using formula: tan(lambda_asc) = -cos(ST) / (sin(ST) * cos(obliquity) + tan(latitude) * sin(obliquity))
-    denominator = sin_st * cos_obl + sin_lat / cos_lat * sin_obl
-    if abs(denominator) < 1e-9: # Handle division by zero near poles or specific times
-         lambda_asc = math.radians(90 if -cos_st > 0 else 270) # Approximation
-    else:
-         lambda_asc = math.atan2(-cos_st, denominator)
-
-    asc_deg = math.degrees(lambda_asc) % 360
+    asc_deg, mc_deg, vertex_deg = (float(a) for a in chart_angles(unix_time(observer.date), math.degrees(observer.lat), math.degrees(observer.lon)))
 
     print(f"Ascendant (Ecliptic Longitude): {asc_deg:.2f}°")
+    print(f"Midheaven: {mc_deg:.2f}°, Vertex: {vertex_deg:.2f}°")
+
+    # Sign changes of the angles today, from the cached timeline
+    print("\nRising Sign Timeline (Today):")
+    print("-" * 40)
+    timeline = sign_timeline(input_time.date(), latitude, longitude, local_tz, HOUSE_SYSTEM)
+    for change_time, point, sign in timeline.events(["Ascendant", "Midheaven"]):
+        marker = " <- next" if timeline.next_change(input_time.timestamp(), point) == (change_time, sign) else ""
+        print(f"{datetime.fromtimestamp(change_time, local_tz).strftime('%H:%M:%S')} {point} enters {SIGNS[sign]}{marker}")
 
     # Moon phase
     print("\nMoon Phase:")
@@ -486,9 +454,9 @@ def astrological_clock():
     visualize_hexagram(hexagram_lines)
 
     # House cusps
-    print("\nHouse Cusps (Equal House System):")
+    print(f"\nHouse Cusps ({HOUSE_SYSTEM.replace('_', ' ').title()} House System):")
     print("-" * 40)
-    house_cusps = calculate_house_cusps(asc_deg)
+    house_cusps = calculate_house_cusps(observer)
     for house, cusp in house_cusps.items():
         sign, *_ = get_zodiac_sign(math.radians(cusp))
         print(f"{house}: {cusp:.2f}° in {sign}")
@@ -0,0 +1,231 @@
+import concurrent.futures
+import glob
+import itertools
+import os
+import sys
+import ephem
+import numpy as np
+from astro_constants import BODIES, MOOD_MODELS, SCALPER_LOCATION, UNIX_EPOCH_EPHEM
+from candle_store import FIELDS, Candles
+
+# Backtesting of the astro mood signals against kline history: planet positions are sampled on a
+# coarse grid and interpolated to every candle, aspects and mood scores are computed for all
+# candles at once with NumPy, and parameter sweeps (orbs, aspect weights) run across processes
+
+# Every unordered body pair, as (first indices, second indices) into BODIES
+PAIRS = np.triu_indices(len(BODIES), 1)
+# Positions are computed every this many seconds and interpolated in between (the Moon moves ~0.5°/h)
+SAMPLE_SECONDS = 3600
+# Candles processed per block when turning positions into a mood series
+CHUNK = 65536
+# Candle lags at which the signal's edge on future returns is measured, for the latency estimate
+LATENCY_LAGS = (0, 1, 2, 3, 5, 10, 15, 30, 60, 120, 240, 480, 1440)
+
+# Kline history from a CandleStore .npz, a Binance public-data CSV (data.binance.vision) or a
+# directory of either; files are concatenated in name order and duplicate candles dropped
+def load_klines(path):
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, "*.npz")) + glob.glob(os.path.join(path, "*.csv")))
+    else:
+        files = [path]
+    blocks = []
+    for file in files:
+        if file.endswith(".npz"):
+            with np.load(file) as stored:
+                blocks.append(np.array([stored[field] for field in FIELDS]))
+        else:
+            block = np.loadtxt(file, delimiter=",", usecols=range(6), ndmin=2, skiprows=_header_rows(file)).T
+            # Open times are in milliseconds, or microseconds in the newer spot dumps
+            block[0] /= 1e6 if len(block[0]) and block[0][0] > 1e14 else 1e3
+            blocks.append(block)
+    block = np.concatenate(blocks, axis=1) if blocks else np.empty((len(FIELDS), 0))
+    times, first = np.unique(block[0], return_index=True)
+    return Candles(dict(zip(FIELDS, block[:, first])))
+
+def _header_rows(file):
+    with open(file) as f:
+        return 0 if f.readline()[:1].isdigit() else 1
+
+# Sample times (unix seconds) covering `times` on the SAMPLE_SECONDS grid
+def sample_grid(times, step=SAMPLE_SECONDS):
+    if not len(times):
+        return np.empty(0)
+    return np.arange(np.floor(times[0] / step) * step, times[-1] + 2 * step, step)
+
+# Unwrapped positions (degrees) of every body at each sample time, shape (len(BODIES), len(samples))
+def sample_positions(samples, coordinate="ra", location=SCALPER_LOCATION):
+    observer = ephem.Observer()
+    observer.lat, observer.lon = str(location[0]), str(location[1])
+    bodies = [getattr(ephem, name)() for name in BODIES]
+    positions = np.empty((len(bodies), len(samples)))
+    for j, t in enumerate(samples / 86400 + UNIX_EPOCH_EPHEM):
+        observer.date = t
+        for i, body in enumerate(bodies):
+            body.compute(observer)
+            positions[i, j] = getattr(body, coordinate)
+    return np.unwrap(np.degrees(positions), period=360, axis=1)
+
+def resolve_model(params):
+    model = MOOD_MODELS[params.get("model", "scalper")]
+    weights = dict(model["weights"])
+    weights.update(params.get("weights") or {})
+    scale = params.get("orb_scale", 1.0)
+    aspects = [(name, center, orb * scale) for name, center, orb in model["aspects"]]
+    return model["coordinate"], aspects, weights
+
+# Index into `aspects` of the aspect each body pair (PAIRS order) forms at each time, -1 for none;
+# shape (len(PAIRS), len(times))
+def aspect_codes(times, samples, positions, aspects):
+    longitudes = np.array([np.interp(times, samples, p) for p in positions]) % 360
+    separation = np.abs(longitudes[PAIRS[0]] - longitudes[PAIRS[1]])
+    code = np.full(separation.shape, -1, dtype=np.intp)
+    for k in range(len(aspects) - 1, -1, -1):
+        _, center, orb = aspects[k]
+        code[np.abs(separation - center) <= orb] = k
+    return code
+
+# Mood score (bullish minus bearish aspect weight, each body pair counted once) at every time
+def mood_scores(times, samples, positions, params):
+    _, aspects, weights = resolve_model(params)
+    # Index -1 (no aspect) picks the trailing zero weight
+    table = np.array([weights.get(name, 0) for name, _, _ in aspects] + [0], dtype=np.float64)
+    scores = np.empty(len(times))
+    for start in range(0, len(times), CHUNK):
+        code = aspect_codes(times[start:start + CHUNK], samples, positions, aspects)
+        scores[start:start + CHUNK] = table[code].sum(axis=0)
+    return scores
+
+# Long (+1) on a bullish mood, short (-1) on a bearish one, flat otherwise
+def mood_signal(scores):
+    return np.sign(scores).astype(np.int8)
+
+# astrob's mean planet Fear and Greed Index sampled every `step` seconds over `times`:
+# (sample unix times, FGI)
+def fgi_series(times, location=SCALPER_LOCATION, step=SAMPLE_SECONDS):
+    import datetime
+    import pytz
+    import astrob
+    samples = sample_grid(times, step)
+    start = datetime.datetime.fromtimestamp(samples[0], pytz.UTC)
+    observer = astrob.setup_observer(location[0], location[1], start)
+    _, planets = astrob.get_planetary_positions(observer)
+    fgi, _ = astrob.calculate_fgi_series(observer, planets, start, datetime.timedelta(seconds=step), len(samples))
+    return samples, fgi
+
+# The FGI held from each sample until the next; its Neutral band (|FGI| < 0.1) maps to flat.
+# `series` reuses an fgi_series() result
+def fgi_signal(times, location=SCALPER_LOCATION, step=SAMPLE_SECONDS, neutral=0.1, series=None):
+    samples, fgi = fgi_series(times, location, step) if series is None else series
+    held = fgi[np.searchsorted(samples, times, side="right") - 1]
+    return np.where(held >= neutral, 1, np.where(held <= -neutral, -1, 0)).astype(np.int8)
+
+# Performance of `signal` (one position per candle, taken at its open) over the candles:
+# hit rate, returns, drawdown, and latency as the lag where the signal's edge on returns peaks
+def evaluate(candles, signal, fee=0.0, lags=LATENCY_LAGS):
+    returns = candles.close / candles.open - 1
+    position = signal.astype(np.float64)
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    strategy = position * returns - fee * turnover
+    equity = np.cumprod(1 + strategy)
+    peak = np.maximum.accumulate(np.r_[1.0, equity])[1:]
+    active = position != 0
+    decided = active & (returns != 0)
+    hits = np.sign(returns[decided]) == position[decided]
+    lags = [lag for lag in lags if lag < len(returns)]
+    edge = np.array([np.dot(position[:len(returns) - lag], returns[lag:]) / (len(returns) - lag) for lag in lags])
+    seconds = float(np.median(np.diff(candles.time))) if len(candles) > 1 else 0.0
+    per_year = 365.25 * 86400 / seconds if seconds else 0.0
+    deviation = strategy.std()
+    return {
+        "candles": len(returns),
+        "exposure": float(active.mean()) if len(returns) else 0.0,
+        "trades": int(np.count_nonzero((turnover != 0) & active)),
+        "hit_rate": float(hits.mean()) if len(hits) else float("nan"),
+        "total_return": float(equity[-1] - 1) if len(equity) else 0.0,
+        "buy_and_hold": float(candles.close[-1] / candles.open[0] - 1) if len(returns) else 0.0,
+        "mean_return": float(strategy[active].mean()) if active.any() else 0.0,
+        "max_drawdown": float((1 - equity / peak).max()) if len(equity) else 0.0,
+        "sharpe": float(strategy.mean() / deviation * np.sqrt(per_year)) if deviation else 0.0,
+        "latency_candles": int(lags[int(np.argmax(edge))]) if len(lags) else 0,
+        "latency_seconds": float(lags[int(np.argmax(edge))] * seconds) if len(lags) else 0.0,
+        "edge_by_lag": dict(zip(lags, edge.tolist()))
+    }
+
+# Mood signal and metrics for one parameter set
+def backtest(candles, params, samples=None, positions=None, fee=0.0, location=SCALPER_LOCATION):
+    if positions is None:
+        coordinate, _, _ = resolve_model(params)
+        samples = sample_grid(candles.time)
+        positions = sample_positions(samples, coordinate, location)
+    signal = mood_signal(mood_scores(candles.time, samples, positions, params))
+    return evaluate(candles, signal, fee)
+
+# Every combination of the given axes, e.g. param_grid(orb_scale=[0.5, 1], weights=[None, {"Sextile": 1}])
+def param_grid(**axes):
+    return [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+
+# Worker state for sweeps: the candles and sampled positions are sent once per process
+_worker = {}
+
+def _init_worker(columns, samples, positions, fee):
+    _worker.update(candles=Candles(columns), samples=samples, positions=positions, fee=fee)
+
+def _run_params(params):
+    coordinate, _, _ = resolve_model(params)
+    return backtest(_worker["candles"], params, _worker["samples"], _worker["positions"][coordinate], _worker["fee"])
+
+# Backtest every parameter set in `grid` across `processes` worker processes; positions are
+# computed once here per coordinate, so workers only do the vectorized aspect and metric passes.
+# Returns (params, metrics) pairs, best total return first
+def sweep(candles, grid, fee=0.0, processes=None, location=SCALPER_LOCATION):
+    samples = sample_grid(candles.time)
+    coordinates = {resolve_model(params)[0] for params in grid}
+    positions = {c: sample_positions(samples, c, location) for c in coordinates}
+    columns = {field: np.ascontiguousarray(candles.columns[field]) for field in ("time", "open", "close")}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                                initargs=(columns, samples, positions, fee)) as pool:
+        results = list(pool.map(_run_params, grid))
+    return sorted(zip(grid, results), key=lambda row: row[1]["total_return"], reverse=True)
+
+def format_metrics(metrics):
+    return (f"{metrics['candles']} candles, exposure {metrics['exposure']:.1%}, trades {metrics['trades']}, "
+            f"hit rate {metrics['hit_rate']:.2%}, return {metrics['total_return']:+.2%} "
+            f"(buy & hold {metrics['buy_and_hold']:+.2%}), max drawdown {metrics['max_drawdown']:.2%}, "
+            f"Sharpe {metrics['sharpe']:.2f}, latency {metrics['latency_candles']} candles")
+
+if __name__ == "__main__":
+    import time
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        candles = load_klines(args[0])
+    else:
+        from binance_mock import make_klines
+        print("No kline file given; backtesting 30 days of mock 1m candles.")
+        candles = Candles.from_klines(make_klines("BTCUSDC", "1m", 30 * 1440))
+    for model in MOOD_MODELS:
+        started = time.perf_counter()
+        metrics = backtest(candles, {"model": model}, fee=0.001)
+        print(f"{model}: {format_metrics(metrics)} [{time.perf_counter() - started:.2f}s]")
+    if "--fgi" in sys.argv:
+        started = time.perf_counter()
+        samples, fgi = series = fgi_series(candles.time)
+        metrics = evaluate(candles, fgi_signal(candles.time, series=series), fee=0.001)
+        print(f"fgi: {format_metrics(metrics)} [{time.perf_counter() - started:.2f}s]")
+        # Cycles the FGI shares with the candles' returns over the same span
+        import datetime
+        import pytz
+        import astrob
+        start = datetime.datetime.fromtimestamp(samples[0], pytz.UTC)
+        cycles = astrob.analyze_market_fgi_cycles({datetime.timedelta(seconds=float(t - samples[0])): value
+                                                   for t, value in zip(samples, fgi)}, start, candles, top=3)
+        for name, label in (("fgi", "FGI"), ("candles", "Returns"), ("shared", "Shared")):
+            strength = "power" if name == "shared" else "confidence"
+            print(f"  {label} cycles: " + (", ".join(f"{c['period']:.2f}h ({c[strength]:.2f})" for c in cycles[name]) or "none"))
+    if "--sweep" in sys.argv:
+        grid = param_grid(model=list(MOOD_MODELS), orb_scale=[0.5, 0.75, 1.0, 1.25, 1.5],
+                          weights=[None, {"Sextile": 1}, {"Quincunx": -1}])
+        started = time.perf_counter()
+        rows = sweep(candles, grid, fee=0.001)
+        print(f"Sweep of {len(grid)} parameter sets in {time.perf_counter() - started:.2f}s; best:")
+        for params, metrics in rows[:5]:
+            print(f"  {params}: {format_metrics(metrics)}")
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import random
+import time
+import aiohttp
+from candle_store import Candles
+
+# Asyncio Binance market-data client: one pooled aiohttp session per process, every
+# (symbol, interval) kline request in flight at once, per-request timeouts and retry with backoff
+
+BINANCE_API_URL = os.environ.get("ASTRO_BINANCE_URL", "https://api.binance.com")
+KLINES_PATH = "/api/v3/klines"
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+MAX_CONNECTIONS = 10
+
+INTERVAL_MS = {
+    "1m": 60000, "3m": 180000, "5m": 300000, "15m": 900000, "30m": 1800000,
+    "1h": 3600000, "2h": 7200000, "4h": 14400000, "6h": 21600000, "8h": 28800000,
+    "12h": 43200000, "1d": 86400000
+}
+
+# Request weight of GET /api/v3/klines by limit, and the header carrying the weight used this minute
+WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+def klines_weight(limit):
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+class KlineError(Exception):
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+# Klines straight into columnar Candles (times in seconds, like the scalpers' get_candles())
+def parse_klines(klines):
+    return Candles.from_klines(klines)
+
+# Exponential backoff with jitter; Retry-After (seconds) wins when the server sends it
+def backoff_delay(attempt, base=BACKOFF_BASE, retry_after=None):
+    if retry_after is not None:
+        return float(retry_after)
+    return base * (2 ** attempt) * (0.5 + random.random())
+
+class KlineClient:
+    def __init__(self, base_url=None, timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES,
+                 backoff=BACKOFF_BASE, max_connections=MAX_CONNECTIONS, retry_rate_limits=True):
+        self.base_url = (base_url or BINANCE_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        # False hands 429/418 straight to the caller (e.g. a scheduler that backs off globally)
+        self.retry_rate_limits = retry_rate_limits
+        # Called as observer(path, status, headers, latency) after every response
+        self.observers = []
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # One GET with retries on network errors, timeouts, 5xx and 429/418; other 4xx raise at once
+    async def request(self, path, params):
+        await self.open()
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                started = time.perf_counter()
+                async with self.session.get(url, params=params) as response:
+                    for observer in self.observers:
+                        observer(path, response.status, response.headers, time.perf_counter() - started)
+                    if response.status == 200:
+                        return await response.json()
+                    message = await response.text()
+                    retry_after = response.headers.get("Retry-After")
+                    rate_limited = response.status in (418, 429)
+                    if (rate_limited and not self.retry_rate_limits) or (not rate_limited and response.status < 500):
+                        raise KlineError(response.status, message, retry_after)
+                    error = KlineError(response.status, message, retry_after)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            if attempt == self.retries:
+                raise error
+            await asyncio.sleep(backoff_delay(attempt, self.backoff, retry_after))
+
+    async def get_klines(self, symbol, interval, limit=1000, start_time=None):
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = int(start_time)
+        return parse_klines(await self.request(KLINES_PATH, params))
+
+    # {(symbol, interval): candles} for every pair, fetched concurrently; a failed pair maps to no candles
+    async def fetch_all(self, symbols, intervals, limit=1000):
+        pairs = [(s, i) for s in symbols for i in intervals]
+        results = await asyncio.gather(*(self.get_klines(s, i, limit) for s, i in pairs), return_exceptions=True)
+        candle_map = {}
+        for (symbol, interval), result in zip(pairs, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching candles for {symbol} at {interval}: {result}")
+                result = parse_klines([])
+            candle_map[(symbol, interval)] = result
+        return candle_map
+
+# Synchronous one-shot helper for scripts that are not async themselves
+def fetch_candle_map(symbols, intervals, limit=1000, base_url=None):
+    async def run():
+        async with KlineClient(base_url) as client:
+            return await client.fetch_all(symbols, intervals, limit)
+    return asyncio.run(run())
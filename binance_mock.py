@@ -0,0 +1,207 @@
+import asyncio
+import random
+import threading
+import time
+from aiohttp import web
+from binance_async import INTERVAL_MS, KLINES_PATH, WEIGHT_HEADER, klines_weight
+
+# Local stand-in for the Binance market-data API used by the scalpers (REST klines and the
+# combined kline WebSocket stream). Klines are a deterministic random walk per (symbol, interval,
+# open time), so repeated requests agree; the still-forming last candle changes with the clock
+
+# Reproducible OHLCV for one candle; `closed` False returns the forming candle as of now_ms
+def make_kline(symbol, interval, open_time, now_ms=None):
+    step = INTERVAL_MS[interval]
+    rng = random.Random(f"{symbol}|{interval}|{open_time}")
+    base = 30000.0 + 2000.0 * ((open_time // step) % 997) / 997.0
+    open_price = base * (1 + rng.uniform(-0.002, 0.002))
+    close = base * (1 + rng.uniform(-0.004, 0.004))
+    if now_ms is not None and now_ms < open_time + step:
+        # Forming candle: the close drifts towards its final value as the interval elapses
+        progress = max(0.0, (now_ms - open_time) / step)
+        close = open_price + (close - open_price) * progress
+    high = max(open_price, close) * (1 + rng.uniform(0, 0.002))
+    low = min(open_price, close) * (1 - rng.uniform(0, 0.002))
+    volume = rng.uniform(1, 50)
+    return [open_time, f"{open_price:.2f}", f"{high:.2f}", f"{low:.2f}", f"{close:.2f}", f"{volume:.5f}",
+            open_time + step - 1, f"{volume * close:.2f}", rng.randint(10, 500), f"{volume / 2:.5f}",
+            f"{volume * close / 2:.2f}", "0"]
+
+# Binance semantics: startTime gives the first `limit` klines opening at or after it,
+# otherwise the latest `limit` klines ending with the forming one
+def make_klines(symbol, interval, limit=500, start_time=None, now_ms=None):
+    step = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    current = now_ms - now_ms % step
+    if start_time is None:
+        first = current - (limit - 1) * step
+    else:
+        first = -(-int(start_time) // step) * step
+    last = min(current, first + (limit - 1) * step)
+    return [make_kline(symbol, interval, t, now_ms) for t in range(first, last + 1, step)]
+
+# Combined-stream kline event, as pushed on /stream?streams=...
+def make_kline_event(symbol, interval, open_time, now_ms, closed):
+    k = make_kline(symbol, interval, open_time, None if closed else now_ms)
+    return {"stream": f"{symbol.lower()}@kline_{interval}", "data": {
+        "e": "kline", "E": now_ms, "s": symbol, "k": {
+            "t": k[0], "T": k[6], "s": symbol, "i": interval, "o": k[1], "c": k[4], "h": k[2],
+            "l": k[3], "v": k[5], "n": k[8], "x": closed, "q": k[7], "V": k[9], "Q": k[10], "B": "0"}}}
+
+# Ban applied (seconds) to clients that keep sending during a 429 back-off
+MOCK_BAN_SECONDS = 120
+
+# Default listing: the scalpers' pairs plus generated ones, enough for a 300-symbol scan
+MOCK_SYMBOLS = ["BTCUSDC", "ETHUSDC"] + [f"C{i:03d}USDC" for i in range(298)]
+EXCHANGE_INFO_WEIGHT = 20
+
+class MockBinance:
+    def __init__(self, latency=0.0, fail_first=0, clock=None, push_period=1.0, weight_limit=6000, symbols=None):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.clock = clock or (lambda: int(time.time() * 1000))
+        self.push_period = push_period
+        self.weight_limit = weight_limit
+        self.symbols = symbols or MOCK_SYMBOLS
+        self.weight_minute = None
+        self.weight_used = 0
+        self.limited_until = 0
+        self.requests = 0
+        self.pushed = 0
+        self.app = web.Application()
+        self.app.router.add_get(KLINES_PATH, self.klines)
+        self.app.router.add_get("/api/v3/exchangeInfo", self.exchange_info)
+        self.app.router.add_get("/stream", self.stream)
+
+    # Per-minute request weight like the real API: 429 once the limit is exceeded, 418 (IP ban)
+    # for requests that arrive while the 429 back-off is still running
+    def _rate_limit(self, weight, now_ms):
+        minute = now_ms // 60000
+        if minute != self.weight_minute:
+            self.weight_minute, self.weight_used = minute, 0
+        if now_ms < self.limited_until:
+            self.limited_until = now_ms + MOCK_BAN_SECONDS * 1000
+            return 418, MOCK_BAN_SECONDS
+        self.weight_used += weight
+        if self.weight_used > self.weight_limit:
+            retry_after = -(-((minute + 1) * 60000 - now_ms) // 1000)
+            self.limited_until = (minute + 1) * 60000
+            return 429, retry_after
+        return 200, None
+
+    async def klines(self, request):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            return web.json_response({"code": -1003, "msg": "Too many requests."}, status=429,
+                                     headers={"Retry-After": "0"})
+        query = request.query
+        interval = query.get("interval", "")
+        if interval not in INTERVAL_MS or "symbol" not in query:
+            return web.json_response({"code": -1120, "msg": "Invalid interval."}, status=400)
+        limit = min(int(query.get("limit", 500)), 1000)
+        now_ms = self.clock()
+        status, retry_after = self._rate_limit(klines_weight(limit), now_ms)
+        headers = {WEIGHT_HEADER: str(self.weight_used)}
+        if status != 200:
+            headers["Retry-After"] = str(retry_after)
+            return web.json_response({"code": -1003, "msg": "Too much request weight used."}, status=status,
+                                     headers=headers)
+        start_time = query.get("startTime")
+        return web.json_response(make_klines(query["symbol"], interval, limit, start_time, now_ms), headers=headers)
+
+    async def exchange_info(self, request):
+        self.requests += 1
+        status, retry_after = self._rate_limit(EXCHANGE_INFO_WEIGHT, self.clock())
+        headers = {WEIGHT_HEADER: str(self.weight_used)}
+        if status != 200:
+            headers["Retry-After"] = str(retry_after)
+            return web.json_response({"code": -1003, "msg": "Too much request weight used."}, status=status,
+                                     headers=headers)
+        symbols = [{"symbol": s, "status": "TRADING", "baseAsset": s[:-4], "quoteAsset": s[-4:]} for s in self.symbols]
+        return web.json_response({"timezone": "UTC", "symbols": symbols}, headers=headers)
+
+    # Push the forming candle of every subscribed stream each push_period, plus a final
+    # closed event whenever the clock crosses a candle boundary
+    async def stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streams = []
+        for name in request.query.get("streams", "").split("/"):
+            market, _, interval = name.partition("@kline_")
+            if interval in INTERVAL_MS:
+                streams.append((market.upper(), interval))
+        open_times = {}
+        try:
+            while not ws.closed:
+                now_ms = self.clock()
+                for symbol, interval in streams:
+                    current = now_ms - now_ms % INTERVAL_MS[interval]
+                    previous = open_times.get((symbol, interval))
+                    if previous is not None and previous != current:
+                        await ws.send_json(make_kline_event(symbol, interval, previous, now_ms, True))
+                        self.pushed += 1
+                    open_times[(symbol, interval)] = current
+                    await ws.send_json(make_kline_event(symbol, interval, current, now_ms, False))
+                    self.pushed += 1
+                await asyncio.sleep(self.push_period)
+        except ConnectionResetError:
+            pass
+        return ws
+
+    # Start on the running loop; returns the base URL to hand to KlineClient
+    async def start(self, host="127.0.0.1", port=0):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    # Run on a private loop in a daemon thread, for synchronous callers; returns the base URL
+    def start_in_thread(self, host="127.0.0.1", port=0):
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.start(host, port))
+            started.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+        return self.url
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+if __name__ == "__main__":
+    from binance_async import KlineClient
+
+    async def demo():
+        mock = MockBinance(latency=0.2)
+        url = await mock.start()
+        symbols, intervals = ["BTCUSDC", "ETHUSDC"], ["5m", "1m"]
+        async with KlineClient(url) as client:
+            started = time.perf_counter()
+            for symbol in symbols:
+                for interval in intervals:
+                    await client.get_klines(symbol, interval)
+            sequential = time.perf_counter() - started
+            started = time.perf_counter()
+            candle_map = await client.fetch_all(symbols, intervals)
+            concurrent = time.perf_counter() - started
+        await mock.stop()
+        for (symbol, interval), candles in candle_map.items():
+            print(f"{symbol} {interval}: {len(candles)} candles, last close {candles[-1]['close']:.2f}")
+        print(f"Sequential: {sequential:.2f}s, concurrent: {concurrent:.2f}s ({mock.requests} requests served)")
+
+    asyncio.run(demo())
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import time
+import aiohttp
+from binance_async import backoff_delay
+
+# Kline streaming: one combined WebSocket subscription for every (symbol, interval), pushed
+# updates merged into the candle store, and reports triggered on candle close or on
+# configurable intra-candle events instead of polling REST in a loop
+
+BINANCE_STREAM_URL = os.environ.get("ASTRO_BINANCE_STREAM_URL", "wss://stream.binance.com:9443")
+# Binance closes idle-looking connections; a heartbeat keeps ours alive
+HEARTBEAT = 20
+MAX_RECONNECT_DELAY = 30
+
+def stream_name(symbol, interval):
+    return f"{symbol.lower()}@kline_{interval}"
+
+def stream_url(symbols, intervals, base_url=None):
+    streams = "/".join(stream_name(s, i) for s in symbols for i in intervals)
+    return f"{(base_url or BINANCE_STREAM_URL).rstrip('/')}/stream?streams={streams}"
+
+# Combined-stream kline event -> (symbol, interval, candle dict, closed)
+def parse_kline_event(message):
+    k = message["data"]["k"]
+    candle = {
+        "time": k["t"] / 1000,
+        "open": float(k["o"]),
+        "high": float(k["h"]),
+        "low": float(k["l"]),
+        "close": float(k["c"]),
+        "volume": float(k["v"])
+    }
+    return k["s"], k["i"], candle, k["x"]
+
+# Decides when an update is worth a report: always on close; within a candle only when
+# `interval` seconds have passed or the close moved by `move` (fraction) since the last report
+class ReportTrigger:
+    def __init__(self, interval=None, move=None):
+        self.interval = interval
+        self.move = move
+        self.last = {}
+
+    def __call__(self, symbol, interval, candle, closed):
+        key = (symbol, interval)
+        now = time.monotonic()
+        last_time, last_close = self.last.get(key, (None, None))
+        fire = closed
+        if not fire and self.interval is not None and (last_time is None or now - last_time >= self.interval):
+            fire = True
+        if not fire and self.move is not None and last_close and abs(candle["close"] / last_close - 1) >= self.move:
+            fire = True
+        if fire:
+            self.last[key] = (now, candle["close"])
+        return fire
+
+# Yield parsed kline events forever, reconnecting with backoff; `on_connect` runs before each
+# (re)subscription so the caller can backfill whatever was missed over REST
+async def stream_klines(session, symbols, intervals, base_url=None, on_connect=None):
+    url = stream_url(symbols, intervals, base_url)
+    attempt = 0
+    while True:
+        try:
+            if on_connect is not None:
+                await on_connect()
+            async with session.ws_connect(url, heartbeat=HEARTBEAT) as ws:
+                attempt = 0
+                async for message in ws:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        payload = message.json()
+                        if "data" in payload and payload["data"].get("e") == "kline":
+                            yield parse_kline_event(payload)
+                    elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+            print("Kline stream closed; reconnecting.")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Kline stream error ({e}); reconnecting.")
+        await asyncio.sleep(min(backoff_delay(attempt), MAX_RECONNECT_DELAY))
+        attempt += 1
+
+# Keep `store` current from the stream and call on_update(symbol, interval, closed) whenever
+# `trigger` says so (default: candle close only)
+async def run_stream(client, store, symbols, intervals, on_update, trigger=None, base_url=None):
+    trigger = trigger or ReportTrigger()
+    await client.open()
+
+    async def backfill():
+        await store.sync_all(client, symbols, intervals)
+
+    async for symbol, interval, candle, closed in stream_klines(client.session, symbols, intervals,
+                                                                base_url, on_connect=backfill):
+        store.buffer(symbol, interval).merge([candle])
+        if trigger(symbol, interval, candle, closed):
+            on_update(symbol, interval, closed)
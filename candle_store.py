@@ -0,0 +1,237 @@
+import asyncio
+import os
+import numpy as np
+
+# Incremental candle store: one bounded buffer per (symbol, interval), kept current with
+# delta fetches (only candles opening at or after the last stored one), optionally persisted
+# to disk as one .npz of columns per series
+
+FIELDS = ("time", "open", "high", "low", "close", "volume")
+DEFAULT_CAPACITY = 1000
+# Binance returns at most this many klines per request
+FETCH_LIMIT = 1000
+# Delta fetches ask for fewer than 100 klines, the cheapest request-weight tier
+DELTA_LIMIT = 99
+# Persistence is off unless a directory is given or ASTRO_CANDLE_DIR is set
+CANDLE_DIR = os.environ.get("ASTRO_CANDLE_DIR")
+
+# Candles as contiguous float64 columns (candles.close, candles.time, ...), which TA-Lib takes
+# without a copy. Indexing with an int gives the old per-candle dict, so candles[-1]["close"]
+# and iteration keep working
+class Candles:
+    def __init__(self, columns):
+        self.columns = columns
+
+    # Raw klines ([open_time_ms, "open", "high", "low", "close", "volume", ...]) parsed in one pass;
+    # each column is a row of one (6, n) block, so every column is contiguous
+    @classmethod
+    def from_klines(cls, klines):
+        block = np.empty((len(FIELDS), len(klines)))
+        if klines:
+            block[:] = np.array([k[:6] for k in klines], dtype=np.float64).T
+            block[0] /= 1000
+        return cls(dict(zip(FIELDS, block)))
+
+    @classmethod
+    def from_dicts(cls, candles):
+        block = np.array([[c[field] for c in candles] for field in FIELDS], dtype=np.float64).reshape(len(FIELDS), -1)
+        return cls(dict(zip(FIELDS, block)))
+
+    def __getattr__(self, name):
+        if name in FIELDS:
+            return self.columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.columns["time"])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Candles({field: column[index] for field, column in self.columns.items()})
+        return {field: float(self.columns[field][index]) for field in FIELDS}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+# Bounded candle buffer with columnar storage. Columns live in arrays twice the capacity and
+# are compacted only when the end is reached, so the live window is always one contiguous slice
+class CandleBuffer:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.data = {field: np.empty(2 * capacity) for field in FIELDS}
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def last_time(self):
+        return self.data["time"][self.end - 1] if self.end > self.start else None
+
+    def clear(self):
+        self.start = self.end = 0
+
+    def _append(self, columns):
+        count = len(columns["time"])
+        if count >= self.capacity:
+            for field in FIELDS:
+                self.data[field][:self.capacity] = columns[field][-self.capacity:]
+            self.start, self.end = 0, self.capacity
+            return
+        if self.end + count > 2 * self.capacity:
+            keep = min(len(self), self.capacity - count)
+            for column in self.data.values():
+                column[:keep] = column[self.end - keep:self.end]
+            self.start, self.end = 0, keep
+        for field in FIELDS:
+            self.data[field][self.end:self.end + count] = columns[field]
+        self.end += count
+        self.start = max(self.start, self.end - self.capacity)
+
+    # Merge candles (Candles or dicts) in time order: the forming last candle is updated in place,
+    # newer ones appended in one block. Returns how many candles were appended
+    def merge(self, candles):
+        if not isinstance(candles, Candles):
+            candles = Candles.from_dicts(candles)
+        times = candles.time
+        first = 0
+        last = self.last_time
+        if last is not None:
+            first = int(np.searchsorted(times, last))
+            if first < len(times) and times[first] == last:
+                for field in FIELDS[1:]:
+                    self.data[field][self.end - 1] = candles.columns[field][first]
+                first += 1
+        if first < len(times):
+            self._append({field: column[first:] for field, column in candles.columns.items()})
+        return len(times) - first
+
+    # Live window as {field: array view}, oldest first
+    def columns(self):
+        return {field: column[self.start:self.end] for field, column in self.data.items()}
+
+    # Live window as Candles over views of the buffer (no copy); valid until the next merge
+    def candles(self):
+        return Candles(self.columns())
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **self.columns())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, capacity=DEFAULT_CAPACITY):
+        buffer = cls(capacity)
+        with np.load(path) as stored:
+            count = min(len(stored["time"]), capacity)
+            for field in FIELDS:
+                buffer.data[field][:count] = stored[field][-count:]
+        buffer.end = count
+        return buffer
+
+class CandleStore:
+    def __init__(self, capacity=DEFAULT_CAPACITY, directory=CANDLE_DIR):
+        self.capacity = capacity
+        self.directory = directory
+        self.buffers = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.directory, f"{symbol}_{interval}.npz")
+
+    def buffer(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self.buffers:
+            path = self._path(symbol, interval) if self.directory else None
+            if path and os.path.exists(path):
+                try:
+                    self.buffers[key] = CandleBuffer.load(path, self.capacity)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Ignoring unreadable candle file {path}: {e}")
+            if key not in self.buffers:
+                self.buffers[key] = CandleBuffer(self.capacity)
+        return self.buffers[key]
+
+    def candles(self, symbol, interval):
+        return self.buffer(symbol, interval).candles()
+
+    # Bring one series up to date: full history when empty, otherwise only candles opening at or
+    # after the stored last one (normally the forming candle plus any that opened since).
+    # Returns the number of klines downloaded
+    async def sync(self, client, symbol, interval):
+        buffer = self.buffer(symbol, interval)
+        latest_limit = min(self.capacity, FETCH_LIMIT)
+        if buffer.last_time is None:
+            batch = await client.get_klines(symbol, interval, limit=latest_limit)
+            downloaded = len(batch)
+        else:
+            batch = await client.get_klines(symbol, interval, limit=DELTA_LIMIT, start_time=buffer.last_time * 1000)
+            downloaded = len(batch)
+            if len(batch) == DELTA_LIMIT:
+                buffer.merge(batch)
+                batch = await client.get_klines(symbol, interval, limit=latest_limit)
+                downloaded += len(batch)
+                downloaded += await self._close_gap(client, symbol, interval, buffer, batch)
+        buffer.merge(batch)
+        if self.directory and downloaded:
+            buffer.save(self._path(symbol, interval))
+        return downloaded
+
+    # Long gap, before `latest` (the newest page) is merged: a page that fills the window replaces
+    # it; otherwise the candles between the stored tail and that page are paged in forwards, or,
+    # when the stored tail would fall out of the window anyway, the buffer restarts from the page.
+    # The buffer never holds a hole. Returns the number of klines downloaded
+    async def _close_gap(self, client, symbol, interval, buffer, latest):
+        if len(latest) >= self.capacity or not len(latest) or latest.time[0] <= buffer.last_time:
+            return 0
+        step = latest.time[1] - latest.time[0] if len(latest) > 1 else None
+        if step is None or self.gap_pages(latest.time[0] - buffer.last_time, step) is None:
+            buffer.clear()
+            return 0
+        downloaded = 0
+        while buffer.last_time + step < latest.time[0]:
+            page = await client.get_klines(symbol, interval, limit=FETCH_LIMIT, start_time=buffer.last_time * 1000)
+            downloaded += len(page)
+            # Nothing new: the exchange has no candles there (e.g. a trading halt)
+            if not buffer.merge(page):
+                break
+        return downloaded
+
+    # Forward pages needed to close a gap of `span` seconds between the stored tail and the newest
+    # page, None when the tail would fall out of the window anyway (the buffer restarts instead)
+    def gap_pages(self, span, step):
+        missing = max(int(round(span / step)) - 1, 0)
+        if missing + min(self.capacity, FETCH_LIMIT) >= self.capacity:
+            return None
+        # Each page starts at the stored tail, so it brings FETCH_LIMIT - 1 new candles
+        return -(-missing // (FETCH_LIMIT - 1))
+
+    # Klines limits sync() requests for a series whose newest candle opened `behind` candles ago
+    # (ignored when empty), so a scheduler can budget the long-gap pages as well
+    def sync_limits(self, symbol, interval, behind):
+        latest_limit = min(self.capacity, FETCH_LIMIT)
+        if len(self.buffer(symbol, interval)) == 0:
+            return [latest_limit]
+        # The delta page also returns the stored last candle
+        if behind + 1 < DELTA_LIMIT:
+            return [DELTA_LIMIT]
+        limits = [DELTA_LIMIT, latest_limit]
+        if latest_limit < self.capacity:
+            pages = self.gap_pages(behind - latest_limit + 1, 1)
+            limits += [FETCH_LIMIT] * (pages or 0)
+        return limits
+
+    # Sync every (symbol, interval) concurrently; a failed series keeps its previous candles
+    async def sync_all(self, client, symbols, intervals):
+        pairs = [(s, i) for s in symbols for i in intervals]
+        results = await asyncio.gather(*(self.sync(client, s, i) for s, i in pairs), return_exceptions=True)
+        downloaded = {}
+        for (symbol, interval), result in zip(pairs, results):
+            if isinstance(result, Exception):
+                print(f"Error updating candles for {symbol} at {interval}: {result}")
+                result = 0
+            downloaded[(symbol, interval)] = result
+        return downloaded
@@ -0,0 +1,97 @@
+import concurrent.futures
+import math
+import os
+import ephem
+import horizons
+from horizons import julian_date_now
+from location import is_offline
+
+# Position provider with an accuracy budget: every request says how precise it must be (arcseconds).
+# PyEphem answers whenever its theory is good enough; Horizons is asked (asynchronously, with a
+# timeout) only for tighter budgets, and PyEphem still answers if Horizons is slow or unreachable
+
+BODY_IDS = {
+    "Sun": "10", "Moon": "301", "Mercury": "1", "Venus": "2", "Mars": "4",
+    "Jupiter": "5", "Saturn": "6", "Uranus": "7", "Neptune": "8", "Pluto": "9"
+}
+
+# Typical error of the PyEphem (libastro) theories against the JPL ephemerides, arcseconds
+LOCAL_ACCURACY_ARCSEC = {"10": 1.0, "301": 10.0, "9": 5.0, "999": 5.0}
+DEFAULT_LOCAL_ACCURACY_ARCSEC = 2.0
+
+# Default budget is far looser than any sign/house/aspect calculation needs, so runs stay local
+DEFAULT_ACCURACY_ARCSEC = float(os.environ.get("ASTRO_ACCURACY_ARCSEC", 60.0))
+HORIZONS_TIMEOUT = float(os.environ.get("ASTRO_HORIZONS_TIMEOUT", 5.0))
+
+_executor = None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    return _executor
+
+# Horizons id for a body name ("Mars") or an id that is already one ("499")
+def target_id(target):
+    return BODY_IDS.get(target, str(target))
+
+def local_accuracy(target, location="500"):
+    # PyEphem here is geocentric only; other Horizons centers always need the network
+    if location != "500" or target_id(target) not in horizons.EPHEM_BODIES:
+        return math.inf
+    return LOCAL_ACCURACY_ARCSEC.get(target_id(target), DEFAULT_LOCAL_ACCURACY_ARCSEC)
+
+# Astrometric geocentric RA/DEC (degrees, J2000), the same quantity the Horizons client returns
+def local_positions(targets, jd):
+    date = ephem.Date(jd - horizons.EPHEM_JD_OFFSET)
+    positions = {}
+    for target in targets:
+        body = horizons.EPHEM_BODIES[target_id(target)]()
+        body.compute(date)
+        positions[target] = {"RA": round(math.degrees(body.a_ra), 5), "DEC": round(math.degrees(body.a_dec), 5)}
+    return positions
+
+# Start a Horizons lookup in the background; returns a Future of {target_id: {'RA', 'DEC'}}
+def fetch_async(targets, jd, location="500", timeout=HORIZONS_TIMEOUT):
+    ids = [target_id(t) for t in targets]
+    return _get_executor().submit(horizons.get_positions, ids, jd, location, timeout=timeout)
+
+# {target: {'RA', 'DEC', 'source'}} for every target, each within `accuracy` arcseconds when possible
+def get_positions(targets, jd=None, accuracy=None, location="500", timeout=HORIZONS_TIMEOUT, offline=None):
+    if jd is None:
+        jd = julian_date_now()
+    if accuracy is None:
+        accuracy = DEFAULT_ACCURACY_ARCSEC
+    if offline is None:
+        offline = is_offline()
+    # Both sources use the same snapped epoch, so switching source only changes the theory error
+    jd = horizons.snap_epoch(jd)
+
+    local = [t for t in targets if local_accuracy(t, location) <= accuracy]
+    remote = [t for t in targets if t not in local]
+    future = fetch_async(remote, jd, location, timeout) if remote and not offline else None
+
+    positions = {t: dict(p, source="ephem") for t, p in local_positions(local, jd).items()}
+    if not remote:
+        return positions
+
+    fetched = None
+    if future is not None:
+        try:
+            fetched = future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            print(f"Horizons did not answer within {timeout}s; using PyEphem positions.")
+        except (OSError, ValueError) as e:
+            print(f"Horizons lookup failed ({e}); using PyEphem positions.")
+    if fetched is not None:
+        for t in remote:
+            positions[t] = dict(fetched[target_id(t)], source="horizons")
+        return positions
+
+    fallback = [t for t in remote if target_id(t) in horizons.EPHEM_BODIES]
+    missing = [t for t in remote if t not in fallback]
+    if missing:
+        raise ValueError(f"No position source available for {', '.join(map(str, missing))}")
+    for t, p in local_positions(fallback, jd).items():
+        positions[t] = dict(p, source="ephem-fallback")
+    return positions
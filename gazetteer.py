@@ -0,0 +1,137 @@
+import bisect
+import csv
+import difflib
+import os
+import unicodedata
+from location import is_offline
+
+# Offline city gazetteer: bundled city table (cities.csv) with an exact-name map,
+# a sorted prefix index and a fuzzy fallback; no network round-trips
+
+CITIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cities.csv")
+
+_index = None
+
+# Lower-case, accent-free, single-spaced key ("Timișoara" -> "timisoara")
+def normalize(name):
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in stripped.casefold())
+    return " ".join(cleaned.split())
+
+def load_cities(path=CITIES_PATH):
+    cities = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            cities.append({
+                "name": row["name"],
+                "country_code": row["country_code"],
+                "country": row["country"],
+                "lat": float(row["lat"]),
+                "lon": float(row["lon"]),
+                "timezone": row["timezone"],
+                "population": int(row["population_k"]) * 1000,
+                "alternate_names": [n for n in row["alternate_names"].split("|") if n]
+            })
+    return cities
+
+# Build (once) the key -> city ids map and the sorted key list used for prefix search
+def get_index():
+    global _index
+    if _index is None:
+        cities = load_cities()
+        by_key = {}
+        for i, city in enumerate(cities):
+            for name in [city["name"]] + city["alternate_names"]:
+                by_key.setdefault(normalize(name), []).append(i)
+        # Most populous first, so ambiguous names resolve to the best-known city
+        for ids in by_key.values():
+            ids.sort(key=lambda i: -cities[i]["population"])
+        countries = {normalize(c["country"]) for c in cities} | {c["country_code"].casefold() for c in cities}
+        _index = {"cities": cities, "by_key": by_key, "keys": sorted(by_key), "countries": countries}
+    return _index
+
+# Narrow candidate ids using qualifiers such as "Timis, Romania" or "US"; a qualifier matching
+# nothing is skipped. When strict, only country qualifiers are checked (the table has no regions)
+# and must match, and qualifiers naming no known country at all ("Paris, Texas") match nothing
+def _filter_by_qualifiers(ids, qualifiers, cities, strict=False):
+    if strict:
+        countries = [q for q in qualifiers if q in get_index()["countries"]]
+        if qualifiers and not countries:
+            return []
+        qualifiers = countries
+    for qualifier in qualifiers:
+        matching = [i for i in ids if qualifier in (normalize(cities[i]["country"]), cities[i]["country_code"].casefold())]
+        if matching or strict:
+            ids = matching
+    return ids
+
+# Ids of cities with a name starting with `key`, most populous first
+def _prefix_ids(key):
+    index = get_index()
+    keys = index["keys"]
+    start = bisect.bisect_left(keys, key)
+    end = bisect.bisect_left(keys, key + "\uffff", start)
+    ids = {i for k in keys[start:end] for i in index["by_key"][k]}
+    return sorted(ids, key=lambda i: -index["cities"][i]["population"])
+
+# City records whose name starts with `prefix`, most populous first
+def complete(prefix, limit=10):
+    cities = get_index()["cities"]
+    return [cities[i] for i in _prefix_ids(normalize(prefix))[:limit]]
+
+# Resolve "City" or "City, Region, Country" to a city record; None when nothing matches. With
+# exact=True only a bundled name in the given country is accepted (regions cannot be checked and
+# are ignored), without prefix or fuzzy fallbacks
+def lookup(query, fuzzy_cutoff=0.8, exact=False):
+    index = get_index()
+    cities = index["cities"]
+    parts = [normalize(p) for p in query.split(",")]
+    key, qualifiers = parts[0], [p for p in parts[1:] if p]
+    if not key:
+        return None
+
+    ids = index["by_key"].get(key)
+    if exact:
+        ids = _filter_by_qualifiers(ids or [], qualifiers, cities, strict=True)
+        return cities[ids[0]] if ids else None
+    if not ids:
+        ids = _prefix_ids(key)
+    if not ids:
+        close = difflib.get_close_matches(key, index["keys"], n=3, cutoff=fuzzy_cutoff)
+        ids = [i for k in close for i in index["by_key"][k]]
+    if not ids:
+        return None
+    return cities[_filter_by_qualifiers(ids, qualifiers, cities)[0]]
+
+# Like lookup(), but raises ValueError("City not found") as the geocoder-based helpers did
+def resolve(query):
+    city = lookup(query)
+    if city is None:
+        raise ValueError("City not found")
+    return city
+
+# Batch resolution: each distinct query is resolved once; unknown names map to None
+def resolve_many(queries):
+    resolved = {}
+    for query in queries:
+        if query not in resolved:
+            resolved[query] = lookup(query)
+    return [resolved[query] for query in queries]
+
+# Coordinates for a city: an exact gazetteer match first, then Nominatim when online; offline,
+# the closest bundled name (prefix or fuzzy match) is used instead
+def get_coordinates(city_name, allow_network=True):
+    city = lookup(city_name, exact=True)
+    if city is not None:
+        return city["lat"], city["lon"]
+    if allow_network and not is_offline():
+        from geopy.geocoders import Nominatim
+        location = Nominatim(user_agent="astro_application").geocode(city_name)
+        if location:
+            return location.latitude, location.longitude
+    else:
+        city = lookup(city_name)
+        if city is not None:
+            return city["lat"], city["lon"]
+    raise ValueError("City not found")
@@ -0,0 +1,227 @@
+import concurrent.futures
+import http.server
+import json
+import math
+import os
+import threading
+import urllib.parse
+import urllib.request
+import ephem
+
+# JPL Horizons access layer: all epochs of a target go out in one request, targets are
+# fetched concurrently, and every (target, epoch, location) answer is kept in an on-disk cache
+
+HORIZONS_URL = os.environ.get("ASTRO_HORIZONS_URL", "https://ssd.jpl.nasa.gov/api/horizons.api")
+CACHE_PATH = os.environ.get("ASTRO_HORIZONS_CACHE",
+                            os.path.join(os.path.expanduser("~"), ".cache", "astro", "horizons.json"))
+CACHE_MAX_ENTRIES = 50000
+NETWORK_TIMEOUT = 10
+MAX_WORKERS = 8
+# Epochs per request; keeps the TLIST (and the URL) well inside the API limits
+EPOCHS_PER_REQUEST = 50
+# Epochs are snapped to this grid (days) so repeated "now" queries within a minute share cache entries
+EPOCH_RESOLUTION = 1.0 / 1440
+
+# Offset between Julian dates and ephem (Dublin) dates
+EPHEM_JD_OFFSET = 2415020.0
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def julian_date_now():
+    return ephem.julian_date(ephem.now())
+
+def snap_epoch(jd, resolution=EPOCH_RESOLUTION):
+    if not resolution:
+        return float(jd)
+    return round(round(float(jd) / resolution) * resolution, 8)
+
+def _cache_key(target, jd, location):
+    return f"{target}|{location}|{jd:.8f}"
+
+def _load_cache(cache_path):
+    global _cache
+    if _cache is None or _cache[0] != cache_path:
+        try:
+            with open(cache_path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        _cache = (cache_path, entries)
+    return _cache[1]
+
+# Atomic write, oldest entries dropped beyond CACHE_MAX_ENTRIES
+def _save_cache(entries, cache_path):
+    if len(entries) > CACHE_MAX_ENTRIES:
+        for key in list(entries)[:len(entries) - CACHE_MAX_ENTRIES]:
+            del entries[key]
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write Horizons cache {cache_path}: {e}")
+
+def clear_cache(cache_path=CACHE_PATH):
+    global _cache
+    with _cache_lock:
+        _cache = None
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+
+# Horizons API parameters for astrometric RA/DEC (degrees) of one target at a list of Julian dates
+def build_params(target, epochs, location="500"):
+    return {
+        "format": "json",
+        "COMMAND": f"'{target}'",
+        "OBJ_DATA": "'NO'",
+        "MAKE_EPHEM": "'YES'",
+        "EPHEM_TYPE": "'OBSERVER'",
+        "CENTER": f"'{location}'",
+        "TLIST_TYPE": "'JD'",
+        "TLIST": " ".join(f"'{jd:.8f}'" for jd in epochs),
+        "QUANTITIES": "'1'",
+        "ANG_FORMAT": "'DEG'",
+        "CAL_FORMAT": "'JD'",
+        "CSV_FORMAT": "'YES'"
+    }
+
+# Rows between $$SOE and $$EOE: "JD, flag, flag, RA, DEC,"
+def parse_ephemeris(result):
+    if "$$SOE" not in result:
+        raise ValueError(f"Horizons returned no ephemeris: {result.strip()[:200]}")
+    body = result.split("$$SOE", 1)[1].split("$$EOE", 1)[0]
+    rows = []
+    for line in body.strip().splitlines():
+        fields = [field.strip() for field in line.split(",")]
+        rows.append((float(fields[0]), float(fields[3]), float(fields[4])))
+    return rows
+
+def fetch_target(target, epochs, location="500", url=HORIZONS_URL, timeout=NETWORK_TIMEOUT):
+    query = urllib.parse.urlencode(build_params(target, epochs, location))
+    with urllib.request.urlopen(f"{url}?{query}", timeout=timeout) as response:
+        payload = json.loads(response.read().decode("utf-8"))
+    if "error" in payload:
+        raise ValueError(f"Horizons error for target {target}: {payload['error']}")
+    rows = parse_ephemeris(payload["result"])
+    if len(rows) != len(epochs):
+        raise ValueError(f"Horizons returned {len(rows)} rows for {len(epochs)} epochs of target {target}")
+    # Answers come back in TLIST order; key them by the requested epochs
+    return {jd: (ra, dec) for jd, (_, ra, dec) in zip(epochs, rows)}
+
+# Astrometric RA/DEC (degrees) for every target at every epoch:
+# {target: [{'jd', 'RA', 'DEC'}, ...]} in the order of `epochs`
+def query_positions(targets, epochs, location="500", url=None, cache_path=CACHE_PATH,
+                    timeout=NETWORK_TIMEOUT, max_workers=MAX_WORKERS, resolution=EPOCH_RESOLUTION):
+    url = url or HORIZONS_URL
+    targets = list(dict.fromkeys(str(t) for t in targets))
+    snapped = [snap_epoch(jd, resolution) for jd in epochs]
+    with _cache_lock:
+        entries = _load_cache(cache_path) if cache_path else {}
+        missing = {}
+        for target in targets:
+            todo = [jd for jd in dict.fromkeys(snapped) if _cache_key(target, jd, location) not in entries]
+            if todo:
+                missing[target] = todo
+
+    batches = [(target, todo[i:i + EPOCHS_PER_REQUEST])
+               for target, todo in missing.items()
+               for i in range(0, len(todo), EPOCHS_PER_REQUEST)]
+    fetched = {}
+    if batches:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+            futures = {pool.submit(fetch_target, target, batch, location, url, timeout): target
+                       for target, batch in batches}
+            for future in concurrent.futures.as_completed(futures):
+                target = futures[future]
+                for jd, radec in future.result().items():
+                    fetched[_cache_key(target, jd, location)] = list(radec)
+        with _cache_lock:
+            entries.update(fetched)
+            if cache_path:
+                _save_cache(entries, cache_path)
+
+    positions = {}
+    for target in targets:
+        rows = []
+        for jd in snapped:
+            ra, dec = entries[_cache_key(target, jd, location)]
+            rows.append({"jd": jd, "RA": ra, "DEC": dec})
+        positions[target] = rows
+    return positions
+
+# Single-epoch convenience: {target: {'RA', 'DEC'}}, as the per-planet Horizons(...).ephemerides()[0] rows were used
+def get_positions(targets, jd=None, location="500", **kwargs):
+    if jd is None:
+        jd = julian_date_now()
+    positions = query_positions(targets, [jd], location=location, **kwargs)
+    return {target: {"RA": rows[0]["RA"], "DEC": rows[0]["DEC"]} for target, rows in positions.items()}
+
+# --- Local stand-in server -------------------------------------------------------------
+# Answers the Horizons API subset used above from PyEphem, so the whole path runs offline:
+#   server = serve_fixture(); query_positions(..., url=server.url, cache_path=None)
+
+EPHEM_BODIES = {
+    "10": ephem.Sun, "301": ephem.Moon,
+    "1": ephem.Mercury, "199": ephem.Mercury, "2": ephem.Venus, "299": ephem.Venus,
+    "4": ephem.Mars, "499": ephem.Mars, "5": ephem.Jupiter, "599": ephem.Jupiter,
+    "6": ephem.Saturn, "699": ephem.Saturn, "7": ephem.Uranus, "799": ephem.Uranus,
+    "8": ephem.Neptune, "899": ephem.Neptune, "9": ephem.Pluto, "999": ephem.Pluto
+}
+
+def fixture_result(target, epochs):
+    lines = []
+    for jd in epochs:
+        body = EPHEM_BODIES[target]()
+        body.compute(ephem.Date(jd - EPHEM_JD_OFFSET))
+        lines.append(f" {jd:.9f}, , , {math.degrees(body.a_ra):.5f}, {math.degrees(body.a_dec):.5f},")
+    return "\n".join(["*" * 40, f"Target body name: {target} (local fixture)", "$$SOE"] + lines + ["$$EOE"])
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        params = {k: v[0].strip("'") for k, v in urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).items()}
+        target = params.get("COMMAND", "")
+        self.server.requests_served += 1
+        if target in EPHEM_BODIES:
+            epochs = [float(jd.strip("'")) for jd in params.get("TLIST", "").split()]
+            payload = {"result": fixture_result(target, epochs)}
+        else:
+            payload = {"error": f"No matches found for target '{target}'"}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# Start the stand-in on a background thread; server.url is the API endpoint, server.shutdown() stops it
+def serve_fixture(host="127.0.0.1", port=0):
+    server = http.server.ThreadingHTTPServer((host, port), _FixtureHandler)
+    server.daemon_threads = True
+    server.requests_served = 0
+    server.url = f"http://{host}:{server.server_address[1]}/api/horizons.api"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    import sys
+    targets = ["10", "1", "2", "4", "5", "6", "7", "8", "9"]
+    url = None
+    if "--fixture" in sys.argv:
+        server = serve_fixture()
+        url = server.url
+        print(f"Using local Horizons stand-in at {url}")
+    now = julian_date_now()
+    positions = query_positions(targets, [now, now + 1, now + 2], url=url, cache_path=None if url else CACHE_PATH)
+    for target, rows in positions.items():
+        print(target, ", ".join(f"JD {row['jd']:.4f}: RA {row['RA']:.4f}° DEC {row['DEC']:.4f}°" for row in rows))
+    if url:
+        print(f"Requests served: {server.requests_served}")
+        server.shutdown()
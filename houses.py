@@ -0,0 +1,126 @@
+import ephem
+import numpy as np
+from angles import ascendant, ecliptic_declination, ecliptic_longitude_of_ra, mean_obliquity, midheaven, ramc
+from astro_constants import BODIES, UNIX_EPOCH_EPHEM
+
+# House engine: cusps for the major house systems vectorized over arrays of (time, latitude,
+# longitude); every body is computed once per instant, and house membership for all bodies and
+# instants is one vectorized lookup against the cusp longitudes, keeping every occupant
+
+HOUSE_COUNT = 12
+# scalper19's houses: fixed 30° sectors of right ascension starting at 0h
+RA_SECTOR_CUSPS = np.arange(HOUSE_COUNT) * 30.0
+HOUSE_SYSTEMS = ("placidus", "koch", "porphyry", "whole_sign", "equal")
+# Fixed-point iterations for the Placidus cusps; converges to well below 1e-9° outside polar latitudes
+PLACIDUS_ITERATIONS = 30
+
+def unix_time(date):
+    return (float(date) - UNIX_EPOCH_EPHEM) * 86400
+
+# Cusps 1-12 in order along the last axis, from the angles and the cusps of houses 11, 12, 2 and 3
+def _assemble(asc, mc, c11, c12, c2, c3):
+    return np.stack([asc, c2, c3, mc + 180, c11 + 180, c12 + 180,
+                     asc + 180, c2 + 180, c3 + 180, mc, c11, c12], axis=-1) % 360
+
+def _porphyry(asc, mc):
+    lower = (mc + 180 - asc) % 360
+    upper = (asc - mc) % 360
+    return mc + upper / 3, mc + 2 * upper / 3, asc + lower / 3, asc + 2 * lower / 3
+
+# Placidus: a cusp is the ecliptic point whose hour angle is a fixed fraction of its own semi-arc;
+# solved by iterating on its right ascension
+def _placidus(ramc, obliquity, latitude):
+    tan_lat = np.tan(np.radians(latitude))
+
+    def cusp(fraction, upper):
+        ra = ramc + (90 * fraction if upper else 180 - 90 * fraction)
+        for _ in range(PLACIDUS_ITERATIONS):
+            dec = ecliptic_declination(ecliptic_longitude_of_ra(ra, obliquity), obliquity)
+            diurnal = np.degrees(np.arccos(np.clip(-tan_lat * np.tan(np.radians(dec)), -1, 1)))
+            ra = ramc + fraction * diurnal if upper else ramc + 180 - fraction * (180 - diurnal)
+        return ecliptic_longitude_of_ra(ra, obliquity)
+
+    return cusp(1 / 3, True), cusp(2 / 3, True), cusp(2 / 3, False), cusp(1 / 3, False)
+
+# Koch: the sidereal time from the MC degree rising to the ASC rising (the MC's diurnal semi-arc)
+# is trisected, and so is the same span from the ASC to the IC degree rising; each cusp is the
+# degree rising at one of those moments
+def _koch(ramc, obliquity, latitude, mc):
+    dec = np.radians(ecliptic_declination(mc, obliquity))
+    difference = np.degrees(np.arcsin(np.clip(np.tan(np.radians(latitude)) * np.tan(dec), -1, 1)))
+    step = (90 + difference) / 3
+    rising = ramc - 3 * step
+
+    def cusp(steps):
+        return ascendant(rising + steps * step, obliquity, latitude)
+
+    return cusp(1), cusp(2), cusp(4), cusp(5)
+
+# Cusps (ecliptic longitudes, shape (..., 12)) from RAMC, obliquity and latitude arrays. Placidus
+# and Koch are undefined inside the polar circles, where Porphyry cusps are returned instead
+def cusps_from_angles(ramc, obliquity, latitude, system="placidus"):
+    ramc, obliquity, latitude = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (ramc, obliquity, latitude)))
+    asc = ascendant(ramc, obliquity, latitude)
+    mc = midheaven(ramc, obliquity)
+    if system == "equal":
+        return (asc[..., None] + 30.0 * np.arange(HOUSE_COUNT)) % 360
+    if system == "whole_sign":
+        return (np.floor(asc / 30)[..., None] * 30 + 30.0 * np.arange(HOUSE_COUNT)) % 360
+    porphyry = _porphyry(asc, mc)
+    if system == "porphyry":
+        quadrants = porphyry
+    elif system in ("placidus", "koch"):
+        quadrants = _placidus(ramc, obliquity, latitude) if system == "placidus" else _koch(ramc, obliquity, latitude, mc)
+        polar = np.abs(latitude) >= 90 - obliquity
+        quadrants = [np.where(polar, p, q) for p, q in zip(porphyry, quadrants)]
+    else:
+        raise ValueError(f"Unknown house system {system!r}; expected one of {', '.join(HOUSE_SYSTEMS)}")
+    return _assemble(asc, mc, *quadrants)
+
+# Tropical house cusps for unix times and geographic coordinates (degrees, east and north
+# positive); the inputs broadcast together, e.g. 1,440 minutes at one place give shape (1440, 12)
+def house_cusps(times, latitude, longitude, system="placidus"):
+    times = np.asarray(times, dtype=np.float64)
+    return cusps_from_angles(ramc(times, longitude), mean_obliquity(times), latitude, system)
+
+# RA (degrees) and constellation of each body at each unix time; arrays of shape (len(bodies), len(times))
+def body_positions(times, location=None, bodies=BODIES):
+    times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    observer = ephem.Observer()
+    if location is not None:
+        observer.lat, observer.lon = str(location[0]), str(location[1])
+    instances = [getattr(ephem, name)() for name in bodies]
+    ras = np.empty((len(bodies), len(times)))
+    constellations = np.empty((len(bodies), len(times)), dtype=object)
+    for j, t in enumerate(times / 86400 + UNIX_EPOCH_EPHEM):
+        observer.date = t
+        for i, body in enumerate(instances):
+            body.compute(observer)
+            ras[i, j] = np.degrees(body.ra) % 360
+            constellations[i, j] = ephem.constellation(body)[1]
+    return ras, constellations
+
+# House index (0-11) of each longitude. `cusps` holds the 12 cusp longitudes in house order,
+# either one set for all longitudes or one set per instant (shape (..., 12), broadcast against
+# longitudes of shape (..., n)); cusps may wrap through 0°
+def assign_houses(longitudes, cusps):
+    cusps = np.asarray(cusps, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    offsets = (cusps - cusps[..., :1]) % 360
+    relative = (longitudes - cusps[..., :1]) % 360
+    if cusps.ndim == 1:
+        return np.searchsorted(offsets, relative, side="right") - 1
+    return (relative[..., None] >= offsets[..., None, :]).sum(axis=-1) - 1
+
+# Occupants of every house at each unix time: a list (one per time) of
+# {"House n": [{"planet": ..., "zodiac_sign": ...}, ...]} with bodies in BODIES order
+def house_occupants(times, location=None, cusps=RA_SECTOR_CUSPS, bodies=BODIES):
+    ras, constellations = body_positions(times, location, bodies)
+    houses = assign_houses(ras.T, cusps).T
+    charts = []
+    for j in range(ras.shape[1]):
+        chart = {f"House {h + 1}": [] for h in range(HOUSE_COUNT)}
+        for i, name in enumerate(bodies):
+            chart[f"House {houses[i, j] + 1}"].append({"planet": name, "zodiac_sign": constellations[i, j]})
+        charts.append(chart)
+    return charts
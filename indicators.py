@@ -0,0 +1,171 @@
+import math
+import numpy as np
+
+# Streaming indicators: each indicator is a pure step(state, inputs) -> (state, value) that mirrors
+# TA-Lib's arithmetic operation for operation, so EMA and RSI are bit-identical to TA-Lib run over
+# the same history (ATR agrees to the last ulp or two). IndicatorStream keeps the state after the
+# last closed candle and re-steps only the forming one, so a new or revised candle costs O(1)
+
+NAN = float("nan")
+
+# TA_IS_ZERO from TA-Lib
+def is_zero(value):
+    return -0.00000001 < value < 0.00000001
+
+# TA-Lib EMA (default compatibility): SMA of the first `period` values as seed, then
+# ema += (x - ema) * k
+class EMA:
+    inputs = ("close",)
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+
+    def initial(self):
+        return (0, 0.0)
+
+    def step(self, state, inputs):
+        count, value = state
+        x = inputs[0]
+        count += 1
+        if count < self.period:
+            return (count, value + x), NAN
+        if count == self.period:
+            value = (value + x) / self.period
+            return (count, value), value
+        value = ((x - value) * self.k) + value
+        return (count, value), value
+
+# TA-Lib RSI: Wilder smoothing of gains/losses, seeded with their plain average over `period` changes.
+# TA-Lib scales by the reciprocal of the period rather than dividing; so does this
+class RSI:
+    inputs = ("close",)
+
+    def __init__(self, period=14):
+        self.period = period
+        self.scale = 1.0 / period
+
+    def initial(self):
+        # (changes seen, previous close, average gain, average loss)
+        return (-1, 0.0, 0.0, 0.0)
+
+    def _value(self, gain, loss):
+        total = gain + loss
+        return 100 * (gain / total) if not is_zero(total) else 0.0
+
+    def step(self, state, inputs):
+        count, prev, gain, loss = state
+        x = inputs[0]
+        count += 1
+        if count == 0:
+            return (count, x, gain, loss), NAN
+        change = x - prev
+        if count <= self.period:
+            if change < 0:
+                loss -= change
+            else:
+                gain += change
+            if count < self.period:
+                return (count, x, gain, loss), NAN
+            gain *= self.scale
+            loss *= self.scale
+            return (count, x, gain, loss), self._value(gain, loss)
+        loss *= (self.period - 1)
+        gain *= (self.period - 1)
+        if change < 0:
+            loss -= change
+        else:
+            gain += change
+        loss *= self.scale
+        gain *= self.scale
+        return (count, x, gain, loss), self._value(gain, loss)
+
+# TA-Lib ATR: true range from the second candle on, SMA seed over `period` true ranges, then Wilder smoothing
+class ATR:
+    inputs = ("high", "low", "close")
+
+    def __init__(self, period=14):
+        self.period = period
+
+    def initial(self):
+        # (candles seen, previous close, running sum or ATR)
+        return (0, 0.0, 0.0)
+
+    def step(self, state, inputs):
+        count, prev_close, value = state
+        high, low, close = inputs
+        count += 1
+        if count == 1:
+            return (count, close, value), NAN
+        true_range = high - low
+        true_range = max(true_range, abs(prev_close - high), abs(prev_close - low))
+        if count <= self.period:
+            return (count, close, value + true_range), NAN
+        if count == self.period + 1:
+            value = (value + true_range) / self.period
+            return (count, close, value), value
+        value *= self.period - 1
+        value += true_range
+        value /= self.period
+        return (count, close, value), value
+
+# One indicator over one candle series: `committed` is the state after the last closed candle,
+# the forming candle is stepped from it on every update
+class IndicatorStream:
+    def __init__(self, indicator):
+        self.indicator = indicator
+        self.reset()
+
+    def reset(self):
+        self.committed = self.indicator.initial()
+        self.pending_time = None
+        self.pending_state = None
+        self.value = NAN
+
+    def update(self, time, inputs):
+        if self.pending_time is not None and time > self.pending_time:
+            self.committed = self.pending_state
+        elif self.pending_time is not None and time < self.pending_time:
+            raise ValueError("Candles must arrive in time order")
+        self.pending_time = time
+        self.pending_state, self.value = self.indicator.step(self.committed, inputs)
+        return self.value
+
+# Streaming indicators for one (symbol, timeframe); update() consumes only the candles at or
+# after the last one seen, so each call costs O(new candles) whatever the window length
+class IndicatorEngine:
+    def __init__(self, indicators):
+        self.streams = {name: IndicatorStream(indicator) for name, indicator in indicators.items()}
+        self.last_time = None
+
+    def reset(self):
+        for stream in self.streams.values():
+            stream.reset()
+        self.last_time = None
+
+    def update(self, candles):
+        times = candles.time
+        start = 0
+        if self.last_time is not None:
+            start = int(np.searchsorted(times, self.last_time))
+            # The last seen candle left the window (long gap or new history): replay what we have
+            if start == len(times) or times[start] != self.last_time:
+                self.reset()
+                start = 0
+        columns = candles.columns
+        for i in range(start, len(times)):
+            for stream in self.streams.values():
+                stream.update(times[i], tuple(float(columns[f][i]) for f in stream.indicator.inputs))
+        if len(times):
+            self.last_time = float(times[-1])
+        return self.values()
+
+    def values(self):
+        return {name: stream.value for name, stream in self.streams.items()}
+
+    def ready(self):
+        return all(not math.isnan(value) for value in self.values().values())
+
+# The indicators generate_report() prints
+def report_indicators():
+    return {"rsi": RSI(14), "ema_50": EMA(50), "ema_200": EMA(200)}
@@ -2,6 +2,8 @@ import ephem
 import datetime
 import pytz
 import math
+import queue
+import threading
 
 # Define the 72 angels and demons with corrected syntax
 ANGELS_DEMONS = [
@@ -173,22 +175,71 @@ def get_active_entities(positions):
                 })
     return active
 
-# Generate forecast
-def generate_forecast(start_time, interval, steps):
-    forecast = []
+# Forecast pipeline stages: each stage consumes the previous one lazily
+def forecast_times(start_time, interval, steps):
     for i in range(steps):
-        time = start_time + interval * i
-        obs = get_observer(time)
-        positions = get_planetary_positions(obs)
-        aspects = get_aspects(positions)
-        entities = get_active_entities(positions)
-        forecast.append({
-            "time": time,
-            "positions": positions,
-            "aspects": aspects,
-            "entities": entities
-        })
-    return forecast
+        yield start_time + interval * i
+
+def position_stage(times):
+    for time in times:
+        yield {"time": time, "positions": get_planetary_positions(get_observer(time))}
+
+def aspect_stage(items):
+    for item in items:
+        item["aspects"] = get_aspects(item["positions"])
+        yield item
+
+def entity_stage(items):
+    for item in items:
+        item["entities"] = get_active_entities(item["positions"])
+        yield item
+
+_PIPELINE_DONE = object()
+
+# Run an iterable in a background thread, handing items over through a bounded queue
+def prefetch(iterable, buffer_size=4):
+    handoff = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                handoff.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+        except Exception as exc:
+            put((False, exc))
+        put(_PIPELINE_DONE)
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            entry = handoff.get()
+            if entry is _PIPELINE_DONE:
+                break
+            ok, value = entry
+            if not ok:
+                raise value
+            yield value
+    finally:
+        stop.set()
+        worker.join()
+
+# Generate forecast lazily; with buffer_size > 0 the computation runs ahead of the consumer
+def generate_forecast(start_time, interval, steps, buffer_size=4):
+    pipeline = entity_stage(aspect_stage(position_stage(forecast_times(start_time, interval, steps))))
+    if buffer_size > 0:
+        return prefetch(pipeline, buffer_size)
+    return pipeline
 
 # Format output
 def format_output(data, title):
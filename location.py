@@ -0,0 +1,132 @@
+import functools
+import json
+import os
+import time
+import pytz
+
+# Location resolver shared by the astro scripts: on-disk cache of the last resolved
+# location, one lazily created TimezoneFinder, and a fully offline path
+
+# Default location (Timișoara, Romania)
+DEFAULT_LOCATION = {"lat": 45.7537, "lon": 21.2257, "city": "Timișoara", "timezone": "Europe/Bucharest"}
+
+CACHE_PATH = os.environ.get("ASTRO_LOCATION_CACHE",
+                            os.path.join(os.path.expanduser("~"), ".cache", "astro", "location.json"))
+CACHE_TTL = float(os.environ.get("ASTRO_LOCATION_TTL", 24 * 3600))
+NETWORK_TIMEOUT = 3
+# After a failed network lookup, the next attempt waits this long (the stale cache or the
+# fallbacks are used meanwhile), so hosts without network do not time out on every run
+RETRY_BACKOFF = float(os.environ.get("ASTRO_LOCATION_RETRY", 3600))
+
+_timezone_finder = None
+
+# One TimezoneFinder per process; None when the package is not installed
+def get_timezone_finder():
+    global _timezone_finder
+    if _timezone_finder is None:
+        try:
+            from timezonefinder import TimezoneFinder
+        except ImportError:
+            return None
+        _timezone_finder = TimezoneFinder()
+    return _timezone_finder
+
+# Timezone name for a coordinate; falls back to a whole-hour offset zone from the longitude
+@functools.lru_cache(maxsize=256)
+def timezone_name(lat, lon):
+    finder = get_timezone_finder()
+    name = finder.timezone_at(lat=lat, lng=lon) if finder is not None else None
+    if name:
+        return name
+    offset = int(round(lon / 15.0))
+    # Etc/GMT zones use inverted signs: Etc/GMT-2 is UTC+2
+    return "UTC" if offset == 0 else f"Etc/GMT{-offset:+d}"
+
+def is_offline():
+    return os.environ.get("ASTRO_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# Cache contents: the last resolved location and/or the time of the last failed lookup ("failed_at")
+def read_cache(cache_path=CACHE_PATH):
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+        if isinstance(cache, dict):
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def load_cached_location(cache_path=CACHE_PATH):
+    location = read_cache(cache_path)
+    return location if "lat" in location and "lon" in location else None
+
+# Atomic write so a crashed run never leaves a truncated cache behind
+def save_cached_location(location, cache_path=CACHE_PATH):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(location, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write location cache {cache_path}: {e}")
+
+# Online lookups: IP-API first, then geocoder; None when both fail
+def lookup_ip_location(timeout=NETWORK_TIMEOUT):
+    try:
+        import requests
+        data = requests.get("http://ip-api.com/json", timeout=timeout).json()
+        if data["status"] == "success":
+            print(f"Estimated location via IP-API: {data['city']} (Lat: {data['lat']}, Lon: {data['lon']})")
+            return {"lat": data["lat"], "lon": data["lon"], "city": data["city"],
+                    "timezone": data.get("timezone"), "source": "ip-api"}
+        raise Exception("IP-API failed")
+    except Exception:
+        print("IP-API failed. Falling back to geocoder.")
+    try:
+        import geocoder
+        g = geocoder.ip('me', timeout=timeout)
+        if g.ok:
+            print(f"Estimated location via geocoder: Lat: {g.lat}, Lon: {g.lng}")
+            return {"lat": g.lat, "lon": g.lng, "city": g.city, "timezone": None, "source": "geocoder"}
+    except Exception:
+        pass
+    print("Geocoder failed.")
+    return None
+
+# Resolve the observer location: fresh cache, then network (unless offline or a lookup failed
+# within retry_backoff), then stale cache, then ASTRO_LAT/ASTRO_LON, then the default
+def resolve_location(offline=None, ttl=CACHE_TTL, cache_path=CACHE_PATH, retry_backoff=RETRY_BACKOFF):
+    if offline is None:
+        offline = is_offline()
+    cache = read_cache(cache_path)
+    cached = cache if "lat" in cache and "lon" in cache else None
+    if cached is not None and time.time() - cached.get("resolved_at", 0) < ttl:
+        return dict(cached, source="cache")
+
+    attempt = not offline and time.time() - cache.get("failed_at", 0) >= retry_backoff
+    location = lookup_ip_location() if attempt else None
+    if location is not None:
+        if not location.get("timezone"):
+            location["timezone"] = timezone_name(location["lat"], location["lon"])
+        location["resolved_at"] = time.time()
+        save_cached_location(location, cache_path)
+        return location
+    if attempt:
+        save_cached_location(dict(cache, failed_at=time.time()), cache_path)
+
+    if cached is not None:
+        print(f"Using cached location: {cached.get('city') or 'unknown'} (Lat: {cached['lat']}, Lon: {cached['lon']})")
+        return dict(cached, source="stale-cache")
+    if "ASTRO_LAT" in os.environ and "ASTRO_LON" in os.environ:
+        lat, lon = float(os.environ["ASTRO_LAT"]), float(os.environ["ASTRO_LON"])
+        return {"lat": lat, "lon": lon, "city": None, "timezone": timezone_name(lat, lon), "source": "environment"}
+    print(f"Using default ({DEFAULT_LOCATION['city']}, Romania).")
+    return dict(DEFAULT_LOCATION, source="default")
+
+# pytz timezone of a resolved location
+def location_timezone(location):
+    try:
+        return pytz.timezone(location.get("timezone") or timezone_name(location["lat"], location["lon"]))
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(timezone_name(location["lat"], location["lon"]))
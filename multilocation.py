@@ -0,0 +1,155 @@
+import datetime
+import math
+import ephem
+import numpy as np
+import pytz
+from angles import ascendant, greenwich_sidereal_time, mean_obliquity, midheaven
+from houses import unix_time
+
+# Multi-location fan-out: geocentric body positions are computed once per instant,
+# only the observer-dependent parts (angles, houses, alt/az, planetary hour) per city
+
+BODIES = {
+    "Sun": ephem.Sun, "Moon": ephem.Moon, "Mercury": ephem.Mercury, "Venus": ephem.Venus,
+    "Mars": ephem.Mars, "Jupiter": ephem.Jupiter, "Saturn": ephem.Saturn, "Uranus": ephem.Uranus,
+    "Neptune": ephem.Neptune, "Pluto": ephem.Pluto
+}
+
+ZODIAC = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+          "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+
+# Planetary hours order (traditional Chaldean order) and day rulers by weekday (Monday first)
+PLANETARY_HOURS = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+DAY_RULERS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+
+# Ayanamsa for sidereal calculations (same value as astrob)
+AYANAMSA = 24.0
+
+# Sun altitude at rise/set: refraction plus semi-diameter
+SUNRISE_ALTITUDE = math.radians(-0.8333)
+
+# Observer-independent state for one instant, shared by every city
+def geocentric_state(utc_time):
+    date = ephem.Date(utc_time)
+    names = list(BODIES)
+    ra = np.empty(len(names))
+    dec = np.empty(len(names))
+    ecl_long = np.empty(len(names))
+    hlon = np.empty(len(names))
+    for i, name in enumerate(names):
+        body = BODIES[name]()
+        body.compute(date, epoch=date)
+        ra[i], dec[i] = float(body.ra), float(body.dec)
+        ecl_long[i] = math.degrees(float(ephem.Ecliptic(body, epoch=date).lon))
+        hlon[i] = math.degrees(float(body.hlon)) % 360
+    return {
+        "date": date,
+        "names": names,
+        "ra": ra,
+        "dec": dec,
+        "ecliptic_long": ecl_long,
+        "sidereal_long": (hlon - AYANAMSA) % 360,
+        "tropical_long": hlon,
+        # Radians, from the same sidereal time and obliquity as every other chart angle
+        "gst": math.radians(float(greenwich_sidereal_time(unix_time(date)))),
+        "obliquity": math.radians(float(mean_obliquity(unix_time(date))))
+    }
+
+# Current planetary hour per city from the Sun's hour angle: day and night are each split in 12 equal arcs
+def planetary_hours(state, lat, hour_angle_sun, utc_time, lon_deg):
+    sun = state["names"].index("Sun")
+    dec = state["dec"][sun]
+    cos_h0 = (math.sin(SUNRISE_ALTITUDE) - np.sin(lat) * math.sin(dec)) / (np.cos(lat) * math.cos(dec))
+    # Polar day/night: the whole circle belongs to one period
+    h0 = np.arccos(np.clip(cos_h0, -1.0, 1.0))
+    h = (hour_angle_sun + math.pi) % (2 * math.pi) - math.pi
+    is_day = np.abs(h) < h0
+    day_fraction = np.where(h0 > 0, (h + h0) / np.where(h0 > 0, 2 * h0, 1), 0.0)
+    night_arc = 2 * math.pi - 2 * h0
+    night_fraction = np.where(night_arc > 0, ((h - h0) % (2 * math.pi)) / np.where(night_arc > 0, night_arc, 1), 0.0)
+    index = np.where(is_day, np.floor(day_fraction * 12), 12 + np.floor(night_fraction * 12))
+    index = np.clip(index, 0, 23).astype(int)
+
+    # Local apparent solar date decides the weekday; before sunrise the planetary day began yesterday
+    utc_hours = utc_time.hour + utc_time.minute / 60 + utc_time.second / 3600
+    equation_of_time = ((12 + np.degrees(h) / 15.0) - (utc_hours + lon_deg / 15.0) + 12) % 24 - 12
+    solar_offset_hours = lon_deg / 15.0 + equation_of_time
+    hours = []
+    for i in range(lat.shape[0]):
+        local_solar = utc_time + datetime.timedelta(hours=float(solar_offset_hours[i]))
+        weekday = local_solar.weekday()
+        if not is_day[i] and h[i] < 0:
+            weekday = (weekday - 1) % 7
+        start_idx = PLANETARY_HOURS.index(DAY_RULERS[weekday])
+        hours.append({
+            "planet": PLANETARY_HOURS[(start_idx + index[i]) % 7],
+            "period": "Day" if is_day[i] else "Night",
+            "hour": int(index[i] % 12) + 1,
+            "day_ruler": DAY_RULERS[weekday]
+        })
+    return hours
+
+# Fan one instant out to many cities; cities are (name, lat, lon) tuples in degrees
+def fan_out(utc_time, cities, state=None):
+    if utc_time.tzinfo is None:
+        utc_time = pytz.UTC.localize(utc_time)
+    utc_time = utc_time.astimezone(pytz.UTC)
+    if state is None:
+        state = geocentric_state(utc_time)
+    names = [c[0] for c in cities]
+    lat_deg = np.array([c[1] for c in cities], dtype=float)
+    lon_deg = np.array([c[2] for c in cities], dtype=float)
+    lat = np.radians(lat_deg)
+    lst = (state["gst"] + np.radians(lon_deg)) % (2 * math.pi)
+
+    asc = ascendant(np.degrees(lst), math.degrees(state["obliquity"]), lat_deg)
+    mc = midheaven(np.degrees(lst), math.degrees(state["obliquity"]))
+    asc_sidereal = (asc - AYANAMSA) % 360
+
+    # Whole-sign houses from the sidereal ascendant, as astrob assigns them: (cities x bodies)
+    body_sign = (state["sidereal_long"] // 30).astype(int)
+    asc_sign = (asc_sidereal // 30).astype(int)
+    houses = (body_sign[np.newaxis, :] - asc_sign[:, np.newaxis]) % 12 + 1
+
+    # Horizontal coordinates (geocentric, no refraction or lunar parallax): (cities x bodies)
+    hour_angle = lst[:, np.newaxis] - state["ra"][np.newaxis, :]
+    sin_lat, cos_lat = np.sin(lat)[:, np.newaxis], np.cos(lat)[:, np.newaxis]
+    sin_dec, cos_dec = np.sin(state["dec"]), np.cos(state["dec"])
+    alt = np.arcsin(sin_lat * sin_dec + cos_lat * cos_dec * np.cos(hour_angle))
+    az = np.arctan2(-cos_dec * np.sin(hour_angle), cos_lat * sin_dec - sin_lat * cos_dec * np.cos(hour_angle))
+
+    sun = state["names"].index("Sun")
+    return {
+        "time": utc_time,
+        "geocentric": state,
+        "cities": names,
+        "ascendant": asc,
+        "midheaven": mc,
+        "ascendant_sign": [ZODIAC[i] for i in asc_sign],
+        "houses": houses,
+        "alt": np.degrees(alt),
+        "az": np.degrees(az) % 360,
+        "planetary_hours": planetary_hours(state, lat, hour_angle[:, sun], utc_time, lon_deg)
+    }
+
+# Print a compact per-city table
+def print_fan_out_report(result):
+    state = result["geocentric"]
+    print(f"Multi-location report for {result['time'].strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    print("Geocentric (shared) sidereal longitudes:")
+    for name, long in zip(state["names"], state["sidereal_long"]):
+        print(f"  {name}: {long:.2f}° {ZODIAC[int(long // 30)]}")
+    print("--------------------------------------------------")
+    for i, city in enumerate(result["cities"]):
+        hour = result["planetary_hours"][i]
+        above = [n for n, a in zip(state["names"], result["alt"][i]) if a > 0]
+        print(f"{city}: ASC {result['ascendant'][i]:.2f}° ({result['ascendant_sign'][i]} sidereal), "
+              f"MC {result['midheaven'][i]:.2f}°, Hour of {hour['planet']} ({hour['period']} {hour['hour']}, "
+              f"day of {hour['day_ruler']}), above horizon: {', '.join(above) or 'none'}")
+
+if __name__ == "__main__":
+    cities = [
+        ("Timișoara", 45.7537, 21.2257), ("London", 51.5074, -0.1278), ("New York", 40.7128, -74.0060),
+        ("Tokyo", 35.6762, 139.6503), ("Sydney", -33.8688, 151.2093), ("San Francisco", 37.7749, -122.4194)
+    ]
+    print_fan_out_report(fan_out(datetime.datetime.now(pytz.UTC), cities))
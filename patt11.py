@@ -7,6 +7,7 @@ from datetime import datetime, timedelta, timezone
 import pytz
 import geocoder
 import math
+from sun_table import ALTITUDES, sun_altitude, table_at
 
 # --- Sacred Geometry Setup ---
 phi = (1 + np.sqrt(5)) / 2  # Golden ratio ≈ 1.618
@@ -192,33 +193,39 @@ def draw_elemental_connections(ax, radius):
                 ax.plot([x1, x2], [y1, y2], color=color, linewidth=1.5, alpha=0.7)
 
 # --- Time Stage Calculations ---
-sun = ephem.Sun()
 observer.date = current_datetime.astimezone(timezone.utc)
-sunrise_utc = observer.next_rising(sun).datetime()
-sunset_utc = observer.next_setting(sun).datetime()
-sunrise_local = pytz.utc.localize(sunrise_utc).astimezone(local_tz)
-sunset_local = pytz.utc.localize(sunset_utc).astimezone(local_tz)
-daylight_duration = (sunset_local - sunrise_local).total_seconds()
-stage_duration = daylight_duration / 4
-morning_end = sunrise_local + timedelta(seconds=stage_duration)
-noon_end = sunrise_local + timedelta(seconds=2 * stage_duration)
-afternoon_end = sunrise_local + timedelta(seconds=3 * stage_duration)
 now = current_datetime
-if sunrise_local <= now < morning_end:
-    current_stage = "Morning"
-    stage_color = 'gold'
-elif morning_end <= now < noon_end:
-    current_stage = "Noon"
-    stage_color = 'orange'
-elif noon_end <= now < afternoon_end:
-    current_stage = "Afternoon"
-    stage_color = 'coral'
-elif afternoon_end <= now <= sunset_local:
-    current_stage = "Evening"
-    stage_color = 'violet'
+sun_events = table_at(now.timestamp(), latitude, longitude)
+# Next sunrise and sunset within a day; None during polar day or night
+sunrise_ts = sun_events.event_between("sunrise_rise", now.timestamp(), now.timestamp() + 86400)
+sunset_ts = sun_events.event_between("sunrise_set", now.timestamp(), now.timestamp() + 86400)
+sunrise_local = datetime.fromtimestamp(sunrise_ts, local_tz) if sunrise_ts is not None else None
+sunset_local = datetime.fromtimestamp(sunset_ts, local_tz) if sunset_ts is not None else None
+if sunrise_local is None or sunset_local is None:
+    polar_day = sun_altitude(now.timestamp(), latitude, longitude) > ALTITUDES["sunrise"]
+    current_stage = "Polar Day" if polar_day else "Polar Night"
+    stage_color = 'gold' if polar_day else 'navy'
 else:
-    current_stage = "Nighttime"
-    stage_color = 'navy'
+    daylight_duration = (sunset_local - sunrise_local).total_seconds()
+    stage_duration = daylight_duration / 4
+    morning_end = sunrise_local + timedelta(seconds=stage_duration)
+    noon_end = sunrise_local + timedelta(seconds=2 * stage_duration)
+    afternoon_end = sunrise_local + timedelta(seconds=3 * stage_duration)
+    if sunrise_local <= now < morning_end:
+        current_stage = "Morning"
+        stage_color = 'gold'
+    elif morning_end <= now < noon_end:
+        current_stage = "Noon"
+        stage_color = 'orange'
+    elif noon_end <= now < afternoon_end:
+        current_stage = "Afternoon"
+        stage_color = 'coral'
+    elif afternoon_end <= now <= sunset_local:
+        current_stage = "Evening"
+        stage_color = 'violet'
+    else:
+        current_stage = "Nighttime"
+        stage_color = 'navy'
 
 # --- Planetary Positions ---
 positions = {}
@@ -380,7 +387,7 @@ if current_stage != "Nighttime":
 # Annotations
 plt.title("Astrological Sigil: Sacred Geometry & Celestial Harmony", fontsize=14, pad=20, color='darkblue')
 ax.text(-3.8, 3.8, f"Time: {formatted_datetime}\nStage: {current_stage}\nMoon: {moon_phase}", fontsize=10, va='top', ha='left', bbox=dict(facecolor='white', alpha=0.8))
-ax.text(3.8, 3.8, f"Sunrise: {sunrise_local.strftime('%H:%M:%S')}\nSunset: {sunset_local.strftime('%H:%M:%S')}\nASC: {asc_deg:.2f}°", fontsize=10, va='top', ha='right', bbox=dict(facecolor='white', alpha=0.8))
+ax.text(3.8, 3.8, f"Sunrise: {sunrise_local.strftime('%H:%M:%S') if sunrise_local else 'none'}\nSunset: {sunset_local.strftime('%H:%M:%S') if sunset_local else 'none'}\nASC: {asc_deg:.2f}°", fontsize=10, va='top', ha='right', bbox=dict(facecolor='white', alpha=0.8))
 ax.text(0, -3.8, f"Lat: {latitude:.2f}, Lon: {longitude:.2f}", fontsize=10, va='bottom', ha='center', color='darkblue')
 
 # Legend
@@ -393,8 +400,8 @@ plt.show()
 print(f"\nAstrological Data for {formatted_datetime}")
 print("=" * 50)
 print(f"Location: Latitude {latitude:.2f}, Longitude {longitude:.2f}")
-print(f"Sunrise: {sunrise_local.strftime('%H:%M:%S %Z')}")
-print(f"Sunset: {sunset_local.strftime('%H:%M:%S %Z')}")
+print(f"Sunrise: {sunrise_local.strftime('%H:%M:%S %Z') if sunrise_local else 'none'}")
+print(f"Sunset: {sunset_local.strftime('%H:%M:%S %Z') if sunset_local else 'none'}")
 print(f"Current Time Stage: {current_stage}")
 
 print("\nPlanetary Positions:")
@@ -2,8 +2,7 @@ import ephem
 import datetime
 import pytz
 import math
-from astroquery.jplhorizons import Horizons
-from astropy.time import Time
+from houses import house_cusps, unix_time
 
 def get_moon_phase_momentum(current_time):
     tz = pytz.timezone('Etc/GMT-3')
@@ -159,22 +158,9 @@ def get_all_planet_data(current_time):
 def get_vedic_houses(date, observer, planet_data):
     date_ephem = ephem.Date(date)
 
-    obs = ephem.Observer()
-    obs.lon = str(observer['longitude'])
-    obs.lat = str(observer['latitude'])
-    obs.date = date_ephem
-
-    sidereal_time = float(obs.sidereal_time())
-    asc_deg = obs.radec_of(date_ephem, 0)[0] * 180 / ephem.pi  # Ascendant in degrees
-    mc_deg = (sidereal_time - asc_deg + 180) % 360  # Midheaven
-
-    house_cusps = []
-    for i in range(1, 13):
-        cusp_deg = (i * 30 - asc_deg) % 360
-        cusp_sign = get_vedic_sign(cusp_deg)
-        house_cusps.append((i, cusp_sign))
-
-    house_cusps_dict = {house: sign for house, sign in house_cusps}
+    # Whole-sign houses from the ascendant
+    cusps = house_cusps(unix_time(date_ephem), float(observer['latitude']), float(observer['longitude']), "whole_sign")
+    house_cusps_dict = {i + 1: get_vedic_sign(cusp) for i, cusp in enumerate(cusps)}
 
     # Determine current planet positions relative to the houses
     planets_in_houses = {i: [] for i in range(1, 13)}
@@ -2,8 +2,8 @@ import ephem
 import datetime
 import pytz
 import math
-from astroquery.jplhorizons import Horizons
-from astropy.time import Time
+from houses import house_cusps, unix_time
+import ephemeris
 
 def get_moon_phase_momentum(current_time):
     tz = pytz.timezone('Etc/GMT-3')  # Use 'Etc/GMT-3' for UTC+3
@@ -160,7 +160,7 @@ def get_all_planet_data(current_time):
     return all_planet_data
 
 def get_planet_positions():
-    now = Time.now()
+    now = ephemeris.julian_date_now()
 
     planets = [
         {'name': 'Mercury', 'id': '1'},
@@ -176,36 +176,21 @@ def get_planet_positions():
     planet_positions = {}
     sun_position = {}
 
+    # All planets and the Sun in one provider call: PyEphem within the accuracy budget, Horizons only beyond it
+    positions = ephemeris.get_positions([planet['id'] for planet in planets] + ['10'], now)
     for planet in planets:
-        obj = Horizons(id=planet['id'], location='500', epochs=now.jd)
-        eph = obj.ephemerides()[0]
-        planet_positions[planet['name']] = {'RA': eph['RA'], 'DEC': eph['DEC']}
+        planet_positions[planet['name']] = positions[planet['id']]
 
-    obj = Horizons(id='10', location='500', epochs=now.jd)
-    eph = obj.ephemerides()[0]
-    sun_position = {'RA': eph['RA'], 'DEC': eph['DEC']}
+    sun_position = positions['10']
 
     return planet_positions, sun_position
 
 def get_vedic_houses(date, observer):
     date_ephem = ephem.Date(date)
 
-    obs = ephem.Observer()
-    obs.lon = str(observer['longitude'])
-    obs.lat = str(observer['latitude'])
-    obs.date = date_ephem
-
-    sidereal_time = float(obs.sidereal_time())
-    asc_deg = obs.radec_of(date_ephem, 0)[0] * 180 / ephem.pi
-    mc_deg = (sidereal_time - asc_deg + 180) % 360
-
-    house_cusps = []
-    for i in range(1, 13):
-        cusp_deg = (i * 30 - asc_deg) % 360
-        cusp_sign = get_vedic_sign(cusp_deg)
-        house_cusps.append((i, cusp_sign))
-
-    house_cusps_dict = {house: sign for house, sign in house_cusps}
+    # Whole-sign houses from the ascendant
+    cusps = house_cusps(unix_time(date_ephem), float(observer['latitude']), float(observer['longitude']), "whole_sign")
+    house_cusps_dict = {i + 1: get_vedic_sign(cusp) for i, cusp in enumerate(cusps)}
     return house_cusps_dict
 
 def get_vedic_sign(deg):
@@ -0,0 +1,205 @@
+import asyncio
+import time
+from binance_async import INTERVAL_MS, WEIGHT_HEADER, KlineError, klines_weight
+
+# Request-weight-aware polling: each timeframe is fetched right after its candle closes, every
+# fetch is charged against the per-minute weight budget (corrected by the server's own count),
+# and 429/418 answers pause all polling with an adaptive back-off
+
+WEIGHT_LIMIT_1M = 6000
+# Plan against this share of the limit, leaving room for other clients on the same IP
+WEIGHT_SAFETY = 0.8
+# Fetch this long after a candle boundary so the closed candle is final on the exchange
+SETTLE_SECONDS = 1.0
+# Retry delay after a network error
+RETRY_SECONDS = 5.0
+# Back-off when 429/418 come without Retry-After; doubled for each consecutive one
+RATE_LIMIT_BACKOFF = 60.0
+BAN_BACKOFF = 120.0
+
+class WeightBudget:
+    def __init__(self, limit=WEIGHT_LIMIT_1M, safety=WEIGHT_SAFETY, clock=time.time):
+        self.limit = limit * safety
+        self.clock = clock
+        self.minute = None
+        self.used = 0
+
+    def _roll(self):
+        minute = int(self.clock() // 60)
+        if minute != self.minute:
+            self.minute, self.used = minute, 0
+
+    def spend(self, weight):
+        self._roll()
+        self.used += weight
+
+    # The server's X-MBX-USED-WEIGHT-1M also counts other processes on this IP
+    def observe(self, used):
+        self._roll()
+        self.used = max(self.used, used)
+
+    def available(self):
+        self._roll()
+        return self.limit - self.used
+
+    def seconds_to_reset(self):
+        return 60 - self.clock() % 60
+
+class PollScheduler:
+    def __init__(self, client, store, symbols, intervals, weight_limit=WEIGHT_LIMIT_1M, safety=WEIGHT_SAFETY,
+                 settle=SETTLE_SECONDS, clock=time.time, sleep=asyncio.sleep):
+        self.client = client
+        self.store = store
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.settle = settle
+        self.clock = clock
+        self.sleep = sleep
+        self.budget = WeightBudget(weight_limit, safety, clock)
+        now = clock()
+        self.next_due = {interval: now for interval in self.intervals}
+        self.paused_until = 0.0
+        self.consecutive_limits = 0
+        self.metrics = {
+            "cycles": 0, "requests": 0, "weight_planned": 0, "server_weight": None,
+            "skipped_cycles": 0, "rate_limited": 0, "banned": 0, "errors": 0,
+            "latency_last": 0.0, "latency_max": 0.0, "latency_total": 0.0
+        }
+        # The scheduler owns rate-limit handling, so the client must not retry 429/418 on its own
+        client.retry_rate_limits = False
+        client.observers.append(self.observe)
+
+    def observe(self, path, status, headers, latency):
+        metrics = self.metrics
+        metrics["requests"] += 1
+        metrics["latency_last"] = latency
+        metrics["latency_total"] += latency
+        metrics["latency_max"] = max(metrics["latency_max"], latency)
+        if WEIGHT_HEADER in headers:
+            used = int(headers[WEIGHT_HEADER])
+            metrics["server_weight"] = used
+            self.budget.observe(used)
+
+    # First moment after the next candle close of `interval`
+    def next_close(self, interval, now):
+        step = INTERVAL_MS[interval] / 1000
+        return (now // step + 1) * step + self.settle
+
+    # Weight of syncing one series now: the delta fetch, plus the newest page and any gap pages
+    # when the series has fallen DELTA_LIMIT or more candles behind (e.g. after a stall)
+    def series_weight(self, symbol, interval, now):
+        last = self.store.buffer(symbol, interval).last_time
+        behind = 0 if last is None else int((now - last) // (INTERVAL_MS[interval] / 1000))
+        return sum(klines_weight(limit) for limit in self.store.sync_limits(symbol, interval, behind))
+
+    def estimate_weight(self, intervals):
+        now = self.clock()
+        return sum(self.series_weight(symbol, interval, now) for symbol in self.symbols for interval in intervals)
+
+    def back_off(self, error, now):
+        self.consecutive_limits += 1
+        if error.status == 418:
+            self.metrics["banned"] += 1
+            default = BAN_BACKOFF
+        else:
+            self.metrics["rate_limited"] += 1
+            default = RATE_LIMIT_BACKOFF
+        delay = float(error.retry_after) if error.retry_after is not None else default * 2 ** (self.consecutive_limits - 1)
+        self.paused_until = max(self.paused_until, now + delay)
+        print(f"Binance answered HTTP {error.status}; pausing polling for {delay:.0f}s.")
+
+    # Fetch the due timeframes for every symbol; returns the (symbol, interval) pairs updated
+    async def run_cycle(self, due):
+        now = self.clock()
+        cost = self.estimate_weight(due)
+        if cost > self.budget.available():
+            self.metrics["skipped_cycles"] += 1
+            resume = now + self.budget.seconds_to_reset()
+            for interval in due:
+                self.next_due[interval] = resume
+            return []
+        self.metrics["cycles"] += 1
+        self.metrics["weight_planned"] += cost
+        self.budget.spend(cost)
+
+        updated, failed = await self._sync([(s, i) for s in self.symbols for i in due])
+        now = self.clock()
+        failed = {interval for _, interval in failed}
+        for interval in due:
+            self.next_due[interval] = now + RETRY_SECONDS if interval in failed else self.next_close(interval, now)
+        return updated
+
+    # Sync (symbol, interval) pairs concurrently; returns (updated pairs, failed pairs)
+    async def _sync(self, pairs):
+        results = await asyncio.gather(*(self.store.sync(self.client, s, i) for s, i in pairs),
+                                       return_exceptions=True)
+        now = self.clock()
+        updated, failed = [], []
+        for (symbol, interval), result in zip(pairs, results):
+            if isinstance(result, KlineError) and result.status in (418, 429):
+                self.back_off(result, now)
+                failed.append((symbol, interval))
+            elif isinstance(result, Exception):
+                self.metrics["errors"] += 1
+                print(f"Error updating candles for {symbol} at {interval}: {result}")
+                failed.append((symbol, interval))
+            else:
+                updated.append((symbol, interval))
+        if not any(isinstance(r, KlineError) and r.status in (418, 429) for r in results):
+            self.consecutive_limits = 0
+        return updated, failed
+
+    # One-off history download of `intervals` for every symbol without it (e.g. the derived
+    # timeframes the resampler seeds, or the first fill of many symbols), in batches that fit the
+    # weight budget, waiting for the next minute in between. Series that fail for another reason
+    # than a rate limit stay empty. Returns the (symbol, interval) pairs filled
+    async def fill(self, intervals):
+        pending = [(s, i) for s in self.symbols for i in intervals if len(self.store.buffer(s, i)) == 0]
+        filled = []
+        while pending:
+            now = self.clock()
+            if now < self.paused_until:
+                await self.sleep(self.paused_until - now)
+                continue
+            available = self.budget.available()
+            batch, cost = [], 0
+            for symbol, interval in pending:
+                weight = self.series_weight(symbol, interval, now)
+                if cost + weight > available:
+                    break
+                batch.append((symbol, interval))
+                cost += weight
+            if not batch:
+                await self.sleep(self.budget.seconds_to_reset())
+                continue
+            self.metrics["weight_planned"] += cost
+            self.budget.spend(cost)
+            updated, failed = await self._sync(batch)
+            filled += updated
+            pending = pending[len(batch):]
+            if self.clock() < self.paused_until:
+                pending = [pair for pair in failed if len(self.store.buffer(*pair)) == 0] + pending
+        return filled
+
+    # Poll forever, calling on_update(updated_pairs) after every cycle that refreshed something
+    async def run(self, on_update):
+        while True:
+            now = self.clock()
+            if now < self.paused_until:
+                await self.sleep(self.paused_until - now)
+                continue
+            due = [interval for interval in self.intervals if self.next_due[interval] <= now]
+            if not due:
+                await self.sleep(min(self.next_due.values()) - now)
+                continue
+            updated = await self.run_cycle(due)
+            if updated:
+                on_update(updated)
+
+    def format_metrics(self):
+        m = self.metrics
+        mean = m["latency_total"] / m["requests"] if m["requests"] else 0.0
+        return (f"Polling: {m['cycles']} cycles, {m['requests']} requests, weight planned {m['weight_planned']} "
+                f"(server count this minute: {m['server_weight']}), latency last {m['latency_last'] * 1000:.0f} ms / "
+                f"mean {mean * 1000:.0f} ms / max {m['latency_max'] * 1000:.0f} ms, skipped cycles {m['skipped_cycles']}, "
+                f"429s {m['rate_limited']}, 418s {m['banned']}, errors {m['errors']}")
@@ -0,0 +1,66 @@
+import numpy as np
+from binance_async import INTERVAL_MS
+from candle_store import Candles
+
+# Multi-timeframe resampling: higher timeframes (3m/5m/15m/1h/4h...) are derived from the
+# maintained 1m candles with vectorized OHLCV aggregation, so every timeframe comes from the
+# same data and adding one costs no extra requests once its history is in the store
+
+# Aggregate base candles into `interval` buckets, aligned to UTC epoch multiples like Binance.
+# A leading bucket whose first base candle is missing is dropped unless keep_partial is set
+def resample(candles, interval, keep_partial=False):
+    step = INTERVAL_MS[interval] / 1000
+    times = candles.time
+    if not len(times):
+        return Candles.from_klines([])
+    buckets = np.floor(times / step) * step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    if not keep_partial and times[0] != buckets[0]:
+        starts = starts[1:]
+        if not len(starts):
+            return Candles.from_klines([])
+    ends = np.r_[starts[1:], len(times)] - 1
+    return Candles({
+        "time": buckets[starts],
+        "open": candles.open[starts],
+        "high": np.maximum.reduceat(candles.high, starts),
+        "low": np.minimum.reduceat(candles.low, starts),
+        "close": candles.close[ends],
+        "volume": np.add.reduceat(candles.volume, starts)
+    })
+
+# Keeps the derived timeframes of one symbol in the candle store current from its base buffer
+class Resampler:
+    def __init__(self, store, symbol, intervals, base="1m"):
+        self.store = store
+        self.symbol = symbol
+        self.intervals = [i for i in intervals if i != base]
+        self.base = base
+
+    # One full fetch per derived timeframe that has no history yet (EMA-200 on 4h needs far more
+    # 1m candles than one request returns); afterwards everything is derived locally
+    async def seed(self, client):
+        for interval in self.intervals:
+            if len(self.store.buffer(self.symbol, interval)) == 0:
+                await self.store.sync(client, self.symbol, interval)
+
+    # Re-aggregate only the base candles from each derived timeframe's forming bucket onwards.
+    # Returns the derived timeframes that started a new candle, i.e. whose previous one closed
+    def update(self):
+        base = self.store.buffer(self.symbol, self.base).candles()
+        closed = []
+        for interval in self.intervals:
+            target = self.store.buffer(self.symbol, interval)
+            last = target.last_time
+            start = 0 if last is None else int(np.searchsorted(base.time, last))
+            # The forming bucket is only rebuilt when the base window holds all of it
+            covered = last is not None and len(base) > 0 and base.time[0] <= last
+            derived = resample(base[start:], interval, keep_partial=covered)
+            if target.merge(derived) and last is not None:
+                closed.append(interval)
+        return closed
+
+    # Derived timeframes whose candle ends with the base candle opening at base_time (seconds)
+    def closed_by(self, base_time):
+        end_ms = int(round(base_time * 1000)) + INTERVAL_MS[self.base]
+        return [interval for interval in self.intervals if end_ms % INTERVAL_MS[interval] == 0]
@@ -1,25 +1,22 @@
 #!/usr/bin/env python3
 
-import requests
-import numpy as np
-import talib
 import ephem
 import pytz
 import datetime
-import math
 import time
-from binance.client import Client as BinanceClient
-from binance.exceptions import BinanceAPIException
+import asyncio
+import sys
 from colorama import init, Fore, Style
-from scipy.stats import linregress
-
-# Load credentials from file
-with open("credentials.txt", "r") as f:
-    api_key = f.readline().strip()
-    api_secret = f.readline().strip()
-
-# Instantiate Binance client
-client = BinanceClient(api_key, api_secret)
+from binance_async import KlineClient
+from candle_store import CandleStore
+from binance_stream import ReportTrigger, run_stream
+from poll_scheduler import PollScheduler
+from scanner import SCAN_CONCURRENCY, list_symbols, print_ranked_table, scan
+from indicators import IndicatorEngine, report_indicators
+from resampler import Resampler
+import spectral
+from astro_state import AstroState, aspect_horizon, change_horizon, ephem_date
+from houses import house_occupants
 
 # Initialize colorama
 init(autoreset=True)
@@ -27,26 +24,23 @@ init(autoreset=True)
 symbol = "BTCUSDC"
 timeframes = ["5m", "1m"]
 candle_map = {}
-
-# Define a function to get candles
-def get_candles(symbol, timeframe, limit=1000):
-    try:
-        klines = client.get_klines(symbol=symbol, interval=timeframe, limit=limit)
-        return [{
-            "time": k[0] / 1000,
-            "open": float(k[1]),
-            "high": float(k[2]),
-            "low": float(k[3]),
-            "close": float(k[4]),
-            "volume": float(k[5])
-        } for k in klines]
-    except BinanceAPIException as e:
-        print(f"Error fetching candles for {symbol} at {timeframe}: {e}")
-        return []
-
-def get_moon_phase_momentum():
+# Local candle history per timeframe, refreshed with delta fetches
+candle_store = CandleStore(capacity=1000)
+# Streaming RSI/EMA state per (symbol, timeframe)
+indicator_engines = {}
+# Only 1m is fetched; the other timeframes are resampled from it
+base_timeframe = "1m"
+resampler = Resampler(candle_store, symbol, timeframes, base_timeframe)
+# Streaming mode (--stream) reports on candle close; set these for intra-candle reports too
+intra_candle_interval = None  # seconds between intra-candle reports
+intra_candle_move = None  # fractional close move since the last report, e.g. 0.002
+# Scanner mode (--scan): every TRADING pair quoted in scan_quote_asset, ranked on each 1m close
+scan_quote_asset = "USDC"
+scan_top = 25  # rows printed per timeframe
+
+def get_moon_phase_momentum(timestamp=None):
     tz = pytz.timezone('Etc/GMT-3')
-    current_time = datetime.datetime.now(tz)
+    current_time = datetime.datetime.now(tz) if timestamp is None else datetime.datetime.fromtimestamp(timestamp, tz)
     moon = ephem.Moon(current_time)
     moon_phase = moon.phase
 
@@ -63,11 +57,11 @@ def get_moon_phase_momentum():
         'moon_sign': moon_sign
     }
 
-def get_current_aspects():
+def get_current_aspects(date=None):
     obs = ephem.Observer()
     obs.lon = '21.21621'  # Longitude of Timișoara
     obs.lat = '45.75415'  # Latitude of Timișoara
-    obs.date = ephem.now()
+    obs.date = ephem.now() if date is None else date
 
     planets = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 
                'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']
@@ -106,41 +100,16 @@ def check_aspect(separation_deg):
             return aspect
     return None
 
-def calculate_house_positions():
-    current_time = ephem.now()
-    obs = ephem.Observer()
-    obs.date = current_time
-
-    houses = {}
-    for i in range(12):
-        # Each house is associated with 30 degrees in the zodiac
-        house_start = i * 30  # Start of each house in degrees
-        house_end = house_start + 30  # End of the house
-
-        # For each planet, check which house it falls into
-        for planet_name in ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 
-                            'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']:
-            planet = getattr(ephem, planet_name)()
-            planet.compute(obs)
-            planet_longitude = math.degrees(planet.ra) % 360  # Convert radians to degrees and normalize
-
-            if house_start <= planet_longitude < house_end:
-                houses[f'House {i + 1}'] = {
-                    'planet': planet_name,
-                    'zodiac_sign': ephem.constellation(planet)[1]
-                }
-                break
-        else:
-            houses[f'House {i + 1}'] = {'planet': None, 'zodiac_sign': None}  # No planet in the house
-
-    return houses
+# Every planet in each of the 12 Vedic houses (30° sectors of right ascension), bodies computed once
+def calculate_house_positions(timestamp=None):
+    return house_occupants([time.time() if timestamp is None else timestamp])[0]
 
 def print_house_positions():
-    houses = calculate_house_positions()
+    houses = astro_state.get("houses")
     print("\nVedic Houses and their Corresponding Planets and Zodiac Signs:")
-    for house, data in houses.items():
-        if data['planet']:
-            print(f"{house}: Planet - {data['planet']}, Sign - {data['zodiac_sign']}")
+    for house, occupants in houses.items():
+        if occupants:
+            print(f"{house}: " + ", ".join(f"Planet - {data['planet']}, Sign - {data['zodiac_sign']}" for data in occupants))
         else:
             print(f"{house}: No planet present.")
 
@@ -158,17 +127,29 @@ def evaluate_market_mood(aspects):
 
     return mood_signals
 
+# Astro values are computed only when they can change (aspect orb crossings, moon age or sign
+# changes, house boundaries); the continuously moving moon phase is refreshed every 10 minutes
+astro_state = AstroState({
+    "aspects": (lambda t: get_current_aspects(ephem_date(t)), aspect_horizon),
+    "moon": (get_moon_phase_momentum,
+             change_horizon(get_moon_phase_momentum, lambda moon: (moon['moon_age'], moon['moon_sign']), tolerance=600)),
+    "houses": (calculate_house_positions, change_horizon(calculate_house_positions)),
+})
+
 def generate_report(timeframe, candles, astro_moon_data):
     print(f"\nTimeframe: {timeframe}")
 
     # Current close price
-    current_close = candles[-1]["close"]
+    current_close = candles.close[-1]
     print(f"Current Close Price: {current_close:.2f}")
 
-    # Technical indicators
-    rsi = talib.RSI(np.array([c["close"] for c in candles]), timeperiod=14)[-1]
-    ema_50 = talib.EMA(np.array([c["close"] for c in candles]), timeperiod=50)[-1]
-    ema_200 = talib.EMA(np.array([c["close"] for c in candles]), timeperiod=200)[-1]
+    # Technical indicators, updated incrementally: only candles new or revised since the last report are processed
+    if (symbol, timeframe) not in indicator_engines:
+        indicator_engines[(symbol, timeframe)] = IndicatorEngine(report_indicators())
+    indicators = indicator_engines[(symbol, timeframe)].update(candles)
+    rsi = indicators["rsi"]
+    ema_50 = indicators["ema_50"]
+    ema_200 = indicators["ema_200"]
 
     print(f"RSI: {rsi:.2f}")
     print(f"50-period EMA: {ema_50:.2f}")
@@ -182,8 +163,12 @@ def generate_report(timeframe, candles, astro_moon_data):
     else:
         print(f"{Fore.YELLOW}Market is in a Consolidation Phase{Style.RESET_ALL}")
 
+    # Dominant cycles of the log returns; Lomb-Scargle tolerates gaps in the candle series
+    cycles = spectral.return_periods(candles.time / 3600, candles.close, top=3)
+    print("Return Cycles (Lomb-Scargle): " + (", ".join(f"{c['period']:.1f}h ({c['confidence']:.0%})" for c in cycles) or "none"))
+
     # Astrological Data
-    aspects = get_current_aspects()
+    aspects = astro_state.get("aspects")
     mood_signals = evaluate_market_mood(aspects)
     
     bullish_aspects = mood_signals['Bullish']
@@ -213,25 +198,92 @@ def generate_report(timeframe, candles, astro_moon_data):
     print(f"Moon Age: {astro_moon_data['moon_age']} days")
     print(f"Moon Sign: {astro_moon_data['moon_sign']}")
 
-# The main loop for continuous analysis
-if __name__ == "__main__":
-    while True:
-        candle_map.clear()  # Clear old data
-
-        # Fetch candles for all timeframes
-        for timeframe in timeframes:
-            candle_map[timeframe] = get_candles(symbol, timeframe)
-
-        # Get astrological data
-        astro_moon_data = get_moon_phase_momentum()
-
-        # Analyze timeframes
+# The main loop for continuous analysis: 1m is refreshed right after each candle close, within
+# the Binance request-weight budget; higher timeframes are derived from it and reported on their close
+async def main():
+    # Keep the astro snapshot current in the background: it is recomputed only when a value changes
+    async with astro_state.running(), KlineClient() as kline_client:
+        await resampler.seed(kline_client)
+        scheduler = PollScheduler(kline_client, candle_store, [symbol], [base_timeframe])
+
+        def on_update(updated):
+            closed = resampler.update()
+
+            # Get astrological data
+            astro_moon_data = astro_state.get("moon")
+
+            # Analyze the refreshed timeframes
+            for timeframe in timeframes:
+                if timeframe != base_timeframe and timeframe not in closed:
+                    continue
+                candle_map[timeframe] = candle_store.candles(symbol, timeframe)
+                candles = candle_map[timeframe]
+
+                if len(candles) > 0:
+                    generate_report(timeframe, candles, astro_moon_data)
+                    print_house_positions()  # Print House Info
+                    print()  # Add a newline for better separation of timeframes.
+
+            print(scheduler.format_metrics())
+            print(astro_state.format_metrics())
+
+        await scheduler.run(on_update)
+
+# Streaming mode: 1m candles kept current by the kline WebSocket, higher timeframes derived from
+# them; reports only when the trigger fires (derived timeframes on their close)
+async def stream_main():
+    trigger = ReportTrigger(interval=intra_candle_interval, move=intra_candle_move)
+
+    def on_update(stream_symbol, stream_timeframe, closed):
+        resampler.update()
+        refreshed = [stream_timeframe]
+        if closed:
+            refreshed += resampler.closed_by(candle_store.buffer(symbol, base_timeframe).last_time)
+        astro_moon_data = astro_state.get("moon")
         for timeframe in timeframes:
-            candles = candle_map[timeframe]
-
-            if len(candles) > 0:
-                generate_report(timeframe, candles, astro_moon_data)
-                print_house_positions()  # Print House Info
-                print()  # Add a newline for better separation of timeframes.
+            if timeframe not in refreshed:
+                continue
+            candle_map[timeframe] = candle_store.candles(symbol, timeframe)
+            generate_report(timeframe, candle_map[timeframe], astro_moon_data)
+            print_house_positions()  # Print House Info
+            print()  # Add a newline for better separation of timeframes.
+
+    # Keep the astro snapshot current in the background: it is recomputed only when a value changes
+    async with astro_state.running(), KlineClient() as kline_client:
+        await resampler.seed(kline_client)
+        await run_stream(kline_client, candle_store, [symbol], [base_timeframe], on_update, trigger)
+
+# Scanner mode: one astro evaluation per tick shared by every symbol. Each symbol's 1m candles are
+# kept current with delta fetches within the request-weight budget, the higher timeframes are
+# resampled from them, and every 1m close ranks all symbols again
+async def scan_main():
+    async with astro_state.running(), KlineClient(max_connections=SCAN_CONCURRENCY) as kline_client:
+        symbols = await list_symbols(kline_client, scan_quote_asset)
+        print(f"Scanning {len(symbols)} {scan_quote_asset} pairs on {', '.join(timeframes)}")
+        scheduler = PollScheduler(kline_client, candle_store, symbols, [base_timeframe])
+        resamplers = {s: Resampler(candle_store, s, timeframes, base_timeframe) for s in symbols}
+        # First history of every timeframe in budget-sized batches; afterwards only 1m deltas are fetched
+        await scheduler.fill([base_timeframe] + resampler.intervals)
+
+        def on_update(updated):
+            for updated_symbol in {s for s, _ in updated}:
+                resamplers[updated_symbol].update()
+            aspects = astro_state.get("aspects")
+            astro = {
+                "aspects": aspects,
+                "mood": evaluate_market_mood(aspects),
+                "moon": astro_state.get("moon"),
+                "houses": astro_state.get("houses"),
+            }
+            for timeframe in timeframes:
+                rows = scan(candle_store, symbols, timeframe, astro)
+                print_ranked_table(rows, timeframe, astro, top=scan_top)
+            print(scheduler.format_metrics())
+
+        await scheduler.run(on_update)
 
-        time.sleep(5)  # Wait for 5 seconds before the next iteration
\ No newline at end of file
+if __name__ == "__main__":
+    if "--scan" in sys.argv:
+        asyncio.run(scan_main())
+    else:
+        asyncio.run(stream_main() if "--stream" in sys.argv else main())
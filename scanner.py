@@ -0,0 +1,75 @@
+import numpy as np
+import talib
+from colorama import Fore, Style
+
+# Multi-symbol scanner: the astro state is evaluated once per tick by the caller and shared by
+# every symbol; candles come from the caller's candle store (kept current by the poll scheduler,
+# higher timeframes resampled) and each symbol gets an EMA/RSI trend score, with a bonus when the
+# trend agrees with the astro mood, for one ranked table
+
+EXCHANGE_INFO_PATH = "/api/v3/exchangeInfo"
+SCAN_CONCURRENCY = 16
+# Score bonus when a symbol's trend agrees with the astro mood
+MOOD_ALIGNMENT_BONUS = 0.5
+
+# Trading symbols quoted in `quote_asset` (e.g. every *USDC pair)
+async def list_symbols(client, quote_asset="USDC", limit=None):
+    info = await client.request(EXCHANGE_INFO_PATH, {})
+    symbols = [s["symbol"] for s in info["symbols"]
+               if s.get("status") == "TRADING" and s.get("quoteAsset") == quote_asset]
+    return symbols[:limit] if limit else symbols
+
+# Bullish > 0, Bearish < 0, Neutral 0, from the mood counts of evaluate_market_mood()
+def mood_direction(mood_signals):
+    return int(np.sign(mood_signals["Bullish"] - mood_signals["Bearish"]))
+
+# Same indicators and trend rule as generate_report(), plus a score for ranking
+def trend_signal(candles):
+    closes = candles.close
+    rsi = talib.RSI(closes, timeperiod=14)[-1]
+    ema_50 = talib.EMA(closes, timeperiod=50)[-1]
+    ema_200 = talib.EMA(closes, timeperiod=200)[-1]
+    close = closes[-1]
+    if close > ema_50 and close > ema_200:
+        direction, trend = 1, "Uptrend"
+    elif close < ema_50 and close < ema_200:
+        direction, trend = -1, "Downtrend"
+    else:
+        direction, trend = 0, "Consolidation"
+    return {"close": close, "rsi": rsi, "ema_50": ema_50, "ema_200": ema_200,
+            "trend": trend, "direction": direction, "momentum": (rsi - 50) / 50}
+
+def score_symbol(signal, astro_direction):
+    score = signal["direction"] + signal["momentum"]
+    if signal["direction"] != 0 and signal["direction"] == astro_direction:
+        score += MOOD_ALIGNMENT_BONUS * signal["direction"]
+    return score
+
+# Rank `symbols` on one timeframe from the candle store against a shared astro state; returns rows
+# sorted most bullish first
+def scan(store, symbols, interval, astro):
+    astro_direction = mood_direction(astro["mood"])
+    rows = []
+    for symbol in symbols:
+        candles = store.candles(symbol, interval)
+        # EMA-200 needs at least 200 closes
+        if len(candles) < 200:
+            continue
+        signal = trend_signal(candles)
+        signal["symbol"] = symbol
+        signal["score"] = score_symbol(signal, astro_direction)
+        rows.append(signal)
+    rows.sort(key=lambda row: row["score"], reverse=True)
+    return rows
+
+def print_ranked_table(rows, interval, astro, top=None):
+    direction = mood_direction(astro["mood"])
+    mood = "Bullish" if direction > 0 else "Bearish" if direction < 0 else "Neutral"
+    print(f"\nTimeframe: {interval} | Astro mood: {mood} ({astro['mood']['Bullish']} bullish / "
+          f"{astro['mood']['Bearish']} bearish aspects) | Moon: {astro['moon']['moon_sign']}, "
+          f"phase {astro['moon']['moon_phase']:.2f}")
+    print(f"{'#':>4} {'Symbol':<12} {'Close':>14} {'RSI':>7} {'EMA-50':>14} {'EMA-200':>14} {'Trend':<14} {'Score':>6}")
+    colors = {"Uptrend": Fore.GREEN, "Downtrend": Fore.RED, "Consolidation": Fore.YELLOW}
+    for rank, row in enumerate(rows[:top] if top else rows, 1):
+        print(f"{rank:>4} {row['symbol']:<12} {row['close']:>14.6g} {row['rsi']:>7.2f} {row['ema_50']:>14.6g} "
+              f"{row['ema_200']:>14.6g} {colors[row['trend']]}{row['trend']:<14}{Style.RESET_ALL} {row['score']:>6.2f}")
@@ -0,0 +1,306 @@
+import functools
+import math
+import numpy as np
+
+# Spectral analysis of long, uniformly sampled series (FGI, aspect scores, closes)
+
+WINDOWS = ("boxcar", "hann", "hamming", "blackman")
+
+# Smallest 2/3/5-smooth length >= n, which numpy's FFT handles fastest
+@functools.lru_cache(maxsize=512)
+def fft_size(n):
+    if n <= 1:
+        return 1
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            size = p35
+            while size < n:
+                size *= 2
+            best = min(best, size)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+# Cached, read-only window coefficients
+@functools.lru_cache(maxsize=64)
+def get_window(name, n):
+    if name not in WINDOWS:
+        raise ValueError(f"Unknown window '{name}', expected one of {', '.join(WINDOWS)}")
+    if name == "boxcar" or n < 2:
+        window = np.ones(n)
+    elif name == "hann":
+        window = np.hanning(n)
+    elif name == "hamming":
+        window = np.hamming(n)
+    else:
+        window = np.blackman(n)
+    window.setflags(write=False)
+    return window
+
+# Remove the mean (or a least-squares line) along the last axis
+def detrend(values, kind="constant"):
+    values = np.asarray(values, dtype=float)
+    if kind == "constant":
+        return values - values.mean(axis=-1, keepdims=True)
+    if kind == "linear":
+        n = values.shape[-1]
+        t = np.arange(n) - (n - 1) / 2
+        slope = (values * t).sum(axis=-1, keepdims=True) / max((t * t).sum(), 1e-12)
+        return values - values.mean(axis=-1, keepdims=True) - slope * t
+    if kind is None:
+        return values
+    raise ValueError(f"Unknown detrend kind '{kind}'")
+
+# One-sided power spectral density of the rows of a 2-D array, padded to a fast FFT size
+def _segment_psd(segments, sample_spacing, window, detrend_kind, pad):
+    seg_len = segments.shape[-1]
+    win = get_window(window, seg_len)
+    data = detrend(segments, detrend_kind) * win
+    nfft = fft_size(seg_len) if pad else seg_len
+    spectrum = np.fft.rfft(data, n=nfft, axis=-1)
+    psd = (spectrum.real ** 2 + spectrum.imag ** 2) * (sample_spacing / (win * win).sum())
+    if nfft % 2 == 0:
+        psd[..., 1:-1] *= 2
+    else:
+        psd[..., 1:] *= 2
+    freqs = np.fft.rfftfreq(nfft, d=sample_spacing)
+    return freqs, psd
+
+# Single windowed periodogram over the whole series
+def periodogram(values, sample_spacing=1.0, window="hann", detrend_kind="constant", pad=True):
+    values = np.asarray(values, dtype=float)
+    freqs, psd = _segment_psd(values[np.newaxis, :], sample_spacing, window, detrend_kind, pad)
+    return freqs, psd[0]
+
+# Welch PSD: average periodograms of overlapping windowed segments, all FFTs in one call
+def welch_psd(values, sample_spacing=1.0, segment_length=256, overlap=0.5, window="hann",
+              detrend_kind="constant", pad=True):
+    values = np.ascontiguousarray(values, dtype=float)
+    n = values.shape[0]
+    segment_length = min(segment_length, n)
+    step = max(int(segment_length * (1 - overlap)), 1)
+    count = 1 + (n - segment_length) // step
+    segments = np.lib.stride_tricks.as_strided(
+        values, shape=(count, segment_length), strides=(values.strides[0] * step, values.strides[0]),
+        writeable=False)
+    freqs, psd = _segment_psd(segments, sample_spacing, window, detrend_kind, pad)
+    return freqs, psd.mean(axis=0), count
+
+# Dominant periods with a false-alarm based confidence in [0, 1]
+def dominant_periods(values, sample_spacing=1.0, top=5, window="hann", segment_length=None, overlap=0.5,
+                     min_period=None, max_period=None):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if values.shape[0] < 4:
+        return []
+    if segment_length is None or segment_length >= values.shape[0]:
+        freqs, psd = periodogram(values, sample_spacing, window)
+        segments = 1
+    else:
+        freqs, psd, segments = welch_psd(values, sample_spacing, segment_length, overlap, window)
+
+    mask = freqs > 0
+    if min_period is not None:
+        mask &= freqs <= 1.0 / min_period
+    if max_period is not None:
+        mask &= freqs >= 1.0 / max_period
+    total = psd[1:].sum()
+    if total <= 0 or not mask.any():
+        return []
+
+    # Local maxima only, so one broad peak is not reported as several neighbouring bins
+    peaks = np.zeros_like(mask)
+    peaks[1:-1] = (psd[1:-1] > psd[:-2]) & (psd[1:-1] >= psd[2:])
+    peaks[-1] = psd[-1] > psd[-2]
+    candidates = np.flatnonzero(peaks & mask)
+    if candidates.size == 0:
+        candidates = np.flatnonzero(mask)
+    if candidates.size > top:
+        candidates = candidates[np.argpartition(psd[candidates], -top)[-top:]]
+    candidates = candidates[np.argsort(psd[candidates])[::-1]]
+
+    # Noise level from the median (exponential distribution: median = mean * ln 2);
+    # averaging segments narrows the noise spread, so this stays conservative for Welch
+    noise = np.median(psd[1:]) / math.log(2)
+    independent = max(int(mask.sum()), 1)
+    results = []
+    for idx in candidates:
+        z = psd[idx] / noise if noise > 0 else float("inf")
+        false_alarm = 1.0 - (1.0 - math.exp(-z)) ** independent if math.isfinite(z) else 0.0
+        results.append({
+            "period": float(1.0 / freqs[idx]),
+            "frequency": float(freqs[idx]),
+            "power": float(psd[idx]),
+            "power_fraction": float(psd[idx] / total),
+            "confidence": float(min(max(1.0 - false_alarm, 0.0), 1.0)),
+            "segments": segments
+        })
+    return results
+
+# Lomb-Scargle periodogram for irregularly sampled series
+
+# Regular frequency grid (f0, df, count) covering the baseline of `times`
+def frequency_grid(times, samples_per_peak=5, nyquist_factor=5, minimum_frequency=None, maximum_frequency=None):
+    times = np.asarray(times, dtype=float)
+    baseline = times.max() - times.min()
+    if baseline <= 0:
+        raise ValueError("Lomb-Scargle needs at least two distinct timestamps")
+    df = 1.0 / (baseline * samples_per_peak)
+    f0 = 0.5 * df if minimum_frequency is None else minimum_frequency
+    if maximum_frequency is None:
+        maximum_frequency = 0.5 * nyquist_factor * times.shape[0] / baseline
+    count = max(int(math.ceil((maximum_frequency - f0) / df)), 1)
+    return f0, df, count
+
+# Spread values at fractional grid positions onto an integer grid (Press & Rybicki 1989)
+def _extirpolate(x, y, size, order=4):
+    result = np.zeros(size, dtype=y.dtype)
+    exact = (x % 1 == 0)
+    np.add.at(result, x[exact].astype(int), y[exact])
+    x, y = x[~exact], y[~exact]
+    low = np.clip((x - order // 2).astype(int), 0, size - order)
+    numerator = y * np.prod(x - low - np.arange(order)[:, np.newaxis], axis=0)
+    denominator = float(math.factorial(order - 1))
+    for j in range(order):
+        if j > 0:
+            denominator *= j / (j - order)
+        index = low + (order - 1 - j)
+        np.add.at(result, index, numerator / (denominator * (x - index)))
+    return result
+
+# Sums of h*sin(2 pi f t) and h*cos(2 pi f t) over a regular frequency grid
+def _trig_sums(times, weights, f0, df, count, freq_factor=1, use_fft=True, oversampling=5, order=4):
+    f0 *= freq_factor
+    df *= freq_factor
+    if not use_fft:
+        freqs = f0 + df * np.arange(count)
+        sin_sum = np.empty(count)
+        cos_sum = np.empty(count)
+        # Chunk the frequency axis so the (N x chunk) phase matrix stays around 4M elements
+        chunk = max(4_000_000 // max(times.shape[0], 1), 1)
+        for start in range(0, count, chunk):
+            phase = 2 * np.pi * np.outer(times, freqs[start:start + chunk])
+            sin_sum[start:start + chunk] = weights @ np.sin(phase)
+            cos_sum[start:start + chunk] = weights @ np.cos(phase)
+        return sin_sum, cos_sum
+
+    t0 = times.min()
+    h = weights.astype(complex)
+    if f0 > 0:
+        h = h * np.exp(2j * np.pi * f0 * (times - t0))
+    size = fft_size(count * oversampling)
+    grid = _extirpolate(((times - t0) * df) % 1 * size, h, size, order)
+    fft_grid = np.fft.ifft(grid)[:count]
+    if t0 != 0:
+        fft_grid *= np.exp(2j * np.pi * t0 * (f0 + df * np.arange(count)))
+    return size * fft_grid.imag, size * fft_grid.real
+
+# Floating-mean Lomb-Scargle power (standard normalization, 0..1) on a regular grid;
+# method="fast" is the O(N log N) extirpolation approximation, "direct" the exact O(N*M) sum
+def lomb_scargle(times, values, f0, df, count, errors=None, method="auto"):
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(times) & np.isfinite(values)
+    times, values = times[finite], values[finite]
+    weights = np.ones_like(values) if errors is None else np.asarray(errors, dtype=float)[finite] ** -2
+    weights = weights / weights.sum()
+    if method == "auto":
+        method = "fast" if times.shape[0] * count > 1_000_000 else "direct"
+    if method not in ("fast", "direct"):
+        raise ValueError(f"Unknown Lomb-Scargle method '{method}'")
+    use_fft = method == "fast"
+
+    centered = values - weights @ values
+    sh, ch = _trig_sums(times, weights * centered, f0, df, count, use_fft=use_fft)
+    s2, c2 = _trig_sums(times, weights, f0, df, count, freq_factor=2, use_fft=use_fft)
+    s, c = _trig_sums(times, weights, f0, df, count, use_fft=use_fft)
+
+    tan_2wt = (s2 - 2 * s * c) / (c2 - (c * c - s * s))
+    c2w = 1 / np.sqrt(1 + tan_2wt * tan_2wt)
+    s2w = tan_2wt * c2w
+    cw = np.sqrt(0.5) * np.sqrt(1 + c2w)
+    sw = np.sqrt(0.5) * np.sign(s2w) * np.sqrt(1 - c2w)
+
+    yy = weights @ (centered * centered)
+    yc = ch * cw + sh * sw
+    ys = sh * cw - ch * sw
+    cc = 0.5 * (1 + c2 * c2w + s2 * s2w) - (c * cw + s * sw) ** 2
+    ss = 0.5 * (1 - c2 * c2w - s2 * s2w) - (s * cw - c * sw) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        power = (yc * yc / cc + ys * ys / ss) / yy
+    power = np.clip(np.nan_to_num(power), 0.0, 1.0)
+    return f0 + df * np.arange(count), power
+
+# Top local maxima of a power curve, strongest first
+def _peak_indices(power, top):
+    peaks = np.zeros(power.shape[0], dtype=bool)
+    if power.shape[0] > 2:
+        peaks[1:-1] = (power[1:-1] > power[:-2]) & (power[1:-1] >= power[2:])
+    candidates = np.flatnonzero(peaks)
+    if candidates.size == 0:
+        candidates = np.arange(power.shape[0])
+    if candidates.size > top:
+        candidates = candidates[np.argpartition(power[candidates], -top)[-top:]]
+    return candidates[np.argsort(power[candidates])[::-1]]
+
+# Probability that noise alone produces a peak this high somewhere in the band
+def _ls_false_alarm(power, samples, independent):
+    single = (1 - power) ** ((samples - 3) / 2) if samples > 3 else 1.0
+    return 1 - (1 - single) ** independent
+
+# Dominant periods of an irregularly sampled series, with confidence = 1 - false alarm probability
+def lomb_scargle_periods(times, values, top=5, samples_per_peak=5, nyquist_factor=5,
+                         min_period=None, max_period=None, method="auto"):
+    times = np.asarray(times, dtype=float)
+    f0, df, count = frequency_grid(times, samples_per_peak, nyquist_factor,
+                                   None if max_period is None else 1.0 / max_period,
+                                   None if min_period is None else 1.0 / min_period)
+    freqs, power = lomb_scargle(times, values, f0, df, count, method=method)
+    independent = max((freqs[-1] - freqs[0]) * (times.max() - times.min()), 1.0)
+    results = []
+    for idx in _peak_indices(power, top):
+        results.append({
+            "period": float(1.0 / freqs[idx]),
+            "frequency": float(freqs[idx]),
+            "power": float(power[idx]),
+            "confidence": float(1 - _ls_false_alarm(power[idx], times.shape[0], independent))
+        })
+    return results
+
+# Dominant periods of a price series' log returns (the trend would swamp the spectrum of raw
+# closes); times must be evenly spaced apart from gaps, so the search stops at their Nyquist frequency
+def return_periods(times, closes, top=5, min_period=None, max_period=None):
+    times = np.asarray(times, dtype=float)
+    if times.shape[0] < 4:
+        return []
+    returns = np.diff(np.log(np.asarray(closes, dtype=float)))
+    return lomb_scargle_periods(times[1:], returns, top=top, nyquist_factor=1, min_period=min_period, max_period=max_period)
+
+# Periods present in both series (e.g. FGI and candle closes), ranked by the geometric mean of their powers;
+# both time arrays must use the same unit
+def shared_periods(times_a, values_a, times_b, values_b, top=5, samples_per_peak=5, nyquist_factor=5,
+                   min_period=None, max_period=None, method="auto"):
+    times_a = np.asarray(times_a, dtype=float)
+    times_b = np.asarray(times_b, dtype=float)
+    grid_a = frequency_grid(times_a, samples_per_peak, nyquist_factor)
+    grid_b = frequency_grid(times_b, samples_per_peak, nyquist_factor)
+    # Finest resolution of the two, but only up to the frequency both series can resolve
+    df = min(grid_a[1], grid_b[1])
+    f0 = 0.5 * df if max_period is None else 1.0 / max_period
+    f_max = min(grid_a[0] + grid_a[1] * grid_a[2], grid_b[0] + grid_b[1] * grid_b[2])
+    if min_period is not None:
+        f_max = min(f_max, 1.0 / min_period)
+    count = max(int(math.ceil((f_max - f0) / df)), 1)
+    freqs, power_a = lomb_scargle(times_a, values_a, f0, df, count, method=method)
+    _, power_b = lomb_scargle(times_b, values_b, f0, df, count, method=method)
+    joint = np.sqrt(power_a * power_b)
+    return [{
+        "period": float(1.0 / freqs[idx]),
+        "frequency": float(freqs[idx]),
+        "power": float(joint[idx]),
+        "power_a": float(power_a[idx]),
+        "power_b": float(power_b[idx])
+    } for idx in _peak_indices(joint, top)]
@@ -0,0 +1,166 @@
+import datetime
+import functools
+import os
+import numpy as np
+from angles import ecliptic_declination, greenwich_sidereal_time, julian_centuries, mean_obliquity, right_ascension_of_longitude
+
+# Sunrise, sunset and twilight tables: a year of events for one location is solved in one
+# vectorized pass (Sun altitude sampled, crossings bisected) and kept on disk as integer seconds.
+# The planetary day (sunrise to next sunrise), its ruler and its 24 planetary hours are then
+# binary searches in the table
+
+SUN_TABLE_DIR = os.environ.get("ASTRO_SUN_TABLE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "astro", "sun"))
+# Sun centre altitude (degrees) of each event pair; -0.8333 is refraction plus the semi-diameter
+# (astrob's horizon of -0:34 for the upper limb)
+ALTITUDES = {
+    "sunrise": -0.8333,
+    "civil": -6.0,
+    "nautical": -12.0,
+    "astronomical": -18.0,
+}
+# Event kinds: rising crossings are "<name>_rise" (dawn), setting ones "<name>_set" (dusk)
+EVENTS = [f"{name}_{edge}" for name in ALTITUDES for edge in ("rise", "set")]
+SAMPLE_STEP = 600
+RESOLUTION = 1.0
+# Days solved beyond each end of the year, so the planetary days around New Year resolve
+MARGIN_DAYS = 2
+
+# Planetary hours order (traditional Chaldean order) and day rulers by weekday (Monday first)
+PLANETARY_HOURS = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+DAY_RULERS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+
+# Apparent right ascension and declination (degrees) of the Sun, low-precision solar theory
+# (Meeus ch. 25, ~0.01°), for unix times
+def sun_equatorial(times):
+    t = julian_centuries(times)
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t ** 2
+    anomaly = np.radians(357.52911 + 35999.05029 * t - 0.0001537 * t ** 2)
+    center = ((1.914602 - 0.004817 * t - 0.000014 * t ** 2) * np.sin(anomaly)
+              + (0.019993 - 0.000101 * t) * np.sin(2 * anomaly) + 0.000289 * np.sin(3 * anomaly))
+    node = np.radians(125.04 - 1934.136 * t)
+    longitude = mean_longitude + center - 0.00569 - 0.00478 * np.sin(node)
+    obliquity = mean_obliquity(times) + 0.00256 * np.cos(node)
+    return right_ascension_of_longitude(longitude, obliquity), ecliptic_declination(longitude, obliquity)
+
+def sun_altitude(times, latitude, longitude):
+    ra, dec = sun_equatorial(times)
+    hour_angle = np.radians(greenwich_sidereal_time(times) + longitude - ra)
+    f, d = np.radians(latitude), np.radians(dec)
+    return np.degrees(np.arcsin(np.sin(f) * np.sin(d) + np.cos(f) * np.cos(d) * np.cos(hour_angle)))
+
+# Instants in [start, end) at which the Sun's altitude crosses each event altitude: {event: times}
+def solve_events(start, end, latitude, longitude):
+    times = np.append(np.arange(start, end, SAMPLE_STEP, dtype=np.float64), end)
+    altitude = sun_altitude(times, latitude, longitude)
+    events = {}
+    for name, level in ALTITUDES.items():
+        above = altitude > level
+        rows = np.nonzero(above[1:] != above[:-1])[0]
+        low, high = times[rows], times[rows + 1]
+        rising = above[rows + 1]
+        while len(rows) and (high - low).max() > RESOLUTION:
+            middle = (low + high) / 2
+            crossed = (sun_altitude(middle, latitude, longitude) > level) == rising
+            low = np.where(crossed, low, middle)
+            high = np.where(crossed, middle, high)
+        events[f"{name}_rise"] = np.round(high[rising])
+        events[f"{name}_set"] = np.round(high[~rising])
+    return events
+
+class SunTable:
+    # events: {event kind: sorted unix seconds}
+    def __init__(self, latitude, longitude, events):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.events = {kind: np.asarray(times, dtype=np.float64) for kind, times in events.items()}
+
+    # First event of `kind` after t, None when the table has none
+    def next_event(self, kind, t):
+        times = self.events[kind]
+        i = np.searchsorted(times, t, side="right")
+        return float(times[i]) if i < len(times) else None
+
+    # Last event of `kind` at or before t
+    def previous_event(self, kind, t):
+        times = self.events[kind]
+        i = np.searchsorted(times, t, side="right") - 1
+        return float(times[i]) if i >= 0 else None
+
+    # First event of `kind` after start and before end, None when there is none (polar day or night)
+    def event_between(self, kind, start, end):
+        t = self.next_event(kind, start)
+        return t if t is not None and t < end else None
+
+    # (sunrise, sunset, next sunrise) of the planetary day containing t
+    def planetary_day(self, t):
+        sunrise = self.previous_event("sunrise_rise", t)
+        sunset = self.next_event("sunrise_set", sunrise) if sunrise is not None else None
+        next_sunrise = self.next_event("sunrise_rise", t)
+        if sunrise is None or sunset is None or next_sunrise is None or not sunset < next_sunrise or next_sunrise - sunrise > 2 * 86400:
+            raise ValueError(f"No sunrise/sunset cycle around {t} at latitude {self.latitude}")
+        return sunrise, sunset, next_sunrise
+
+    # The planetary day is ruled by the weekday of its sunrise in local mean time
+    def day_ruler(self, t):
+        sunrise = self.planetary_day(t)[0]
+        weekday = (int((sunrise + self.longitude * 240) // 86400) + 3) % 7
+        return DAY_RULERS[weekday]
+
+    # The 24 planetary hours of the planetary day containing t: (start, end, planet, "Day"/"Night")
+    def schedule(self, t):
+        sunrise, sunset, next_sunrise = self.planetary_day(t)
+        start_idx = PLANETARY_HOURS.index(self.day_ruler(t))
+        hours = []
+        for period, begin, end, offset in (("Day", sunrise, sunset, 0), ("Night", sunset, next_sunrise, 12)):
+            edges = np.linspace(begin, end, 13)
+            for i in range(12):
+                hours.append((float(edges[i]), float(edges[i + 1]), PLANETARY_HOURS[(start_idx + offset + i) % 7], period))
+        return hours
+
+    # (planet, "Day"/"Night", start, end) of the planetary hour containing t
+    def planetary_hour(self, t):
+        sunrise, sunset, next_sunrise = self.planetary_day(t)
+        if t < sunset:
+            index = min(int((t - sunrise) / ((sunset - sunrise) / 12)), 11)
+        else:
+            index = 12 + min(int((t - sunset) / ((next_sunrise - sunset) / 12)), 11)
+        start, end, planet, period = self.schedule(t)[index]
+        return planet, period, start, end
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, location=np.array([self.latitude, self.longitude]),
+                            **{kind: times.astype(np.int64) for kind, times in self.events.items()})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            latitude, longitude = data["location"]
+            return cls(float(latitude), float(longitude), {kind: data[kind] for kind in EVENTS})
+
+def build_table(latitude, longitude, year):
+    start = datetime.datetime(year, 1, 1, tzinfo=datetime.timezone.utc).timestamp() - MARGIN_DAYS * 86400
+    end = datetime.datetime(year + 1, 1, 1, tzinfo=datetime.timezone.utc).timestamp() + MARGIN_DAYS * 86400
+    return SunTable(latitude, longitude, solve_events(start, end, latitude, longitude))
+
+# Table of a UTC year at a location, from the on-disk cache or solved and saved on first use
+@functools.lru_cache(maxsize=32)
+def sun_table(latitude, longitude, year, directory=SUN_TABLE_DIR):
+    path = os.path.join(directory, f"{latitude:.4f}_{longitude:.4f}_{year}.npz")
+    try:
+        return SunTable.load(path)
+    except (OSError, KeyError, ValueError):
+        pass
+    table = build_table(latitude, longitude, year)
+    try:
+        table.save(path)
+    except OSError as e:
+        print(f"Could not write sun table {path}: {e}")
+    return table
+
+# Table covering unix time t at a location (coordinates rounded to ~10 m for the cache)
+def table_at(t, latitude, longitude):
+    year = datetime.datetime.fromtimestamp(t, datetime.timezone.utc).year
+    return sun_table(round(float(latitude), 4), round(float(longitude), 4), year)
@@ -0,0 +1,97 @@
+import datetime
+import functools
+import numpy as np
+from angles import chart_angles
+from houses import HOUSE_COUNT, house_cusps
+
+# Sign-change timeline of the chart angles and house cusps: for one day at one place, the instants
+# at which the ascendant, the midheaven and every cusp enter a new sign are root-solved once
+# (vectorized bisection over all brackets at the same time) and cached, so "which sign is rising
+# now" and "when does it change" are binary searches
+
+SIGNS = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+         "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+POINTS = ["Ascendant", "Midheaven"] + [f"House {n + 1}" for n in range(HOUSE_COUNT)]
+# Sampling step (seconds) used to bracket the changes; the ascendant needs about two minutes per
+# degree, so a point cannot cross two sign boundaries within one step outside polar latitudes
+SAMPLE_STEP = 60
+# Precision (seconds) of the solved instants
+RESOLUTION = 0.01
+# Coordinates are rounded to this many decimals for the cache key (~10 m)
+COORDINATE_DECIMALS = 4
+
+# Ecliptic longitudes of every point at unix times, shape (len(times), len(POINTS))
+def point_longitudes(times, latitude, longitude, system="placidus"):
+    asc, mc, _ = chart_angles(times, latitude, longitude)
+    return np.column_stack([asc, mc, house_cusps(times, latitude, longitude, system)])
+
+def _signs(longitudes, ayanamsa):
+    return (np.floor((longitudes - ayanamsa) % 360 / 30)).astype(int)
+
+class SignTimeline:
+    # start/end: unix seconds; changes: per point, (instants, sign indices) beginning with the
+    # sign held at start
+    def __init__(self, start, end, changes):
+        self.start = start
+        self.end = end
+        self.changes = changes
+
+    def _index(self, point, t):
+        times, _ = self.changes[point]
+        if not self.start <= t < self.end:
+            raise ValueError(f"{t} is outside the timeline [{self.start}, {self.end})")
+        return np.searchsorted(times, t, side="right") - 1
+
+    # Sign index of a point at unix time t
+    def sign_at(self, t, point="Ascendant"):
+        return int(self.changes[point][1][self._index(point, t)])
+
+    # {point: sign name} at unix time t
+    def signs_at(self, t):
+        return {point: SIGNS[self.sign_at(t, point)] for point in POINTS}
+
+    # (unix time, sign index) of the point's next sign change after t, None if not within the timeline
+    def next_change(self, t, point="Ascendant"):
+        times, signs = self.changes[point]
+        i = self._index(point, t) + 1
+        return (float(times[i]), int(signs[i])) if i < len(times) else None
+
+    # Every change in time order as (unix time, point, sign index)
+    def events(self, points=POINTS):
+        found = [(float(t), point, int(s)) for point in points
+                 for t, s in zip(self.changes[point][0][1:], self.changes[point][1][1:])]
+        return sorted(found)
+
+# Root-solve the sign changes of every point within [start, end) (unix seconds)
+def build_timeline(start, end, latitude, longitude, system="placidus", ayanamsa=0.0):
+    times = np.append(np.arange(start, end, SAMPLE_STEP, dtype=np.float64), end)
+    signs = _signs(point_longitudes(times, latitude, longitude, system), ayanamsa)
+    rows, points = np.nonzero(signs[1:] != signs[:-1])
+    low, high = times[rows], times[rows + 1]
+    before = signs[rows, points]
+    while len(rows) and (high - low).max() > RESOLUTION:
+        middle = (low + high) / 2
+        unchanged = _signs(point_longitudes(middle, latitude, longitude, system)[np.arange(len(rows)), points], ayanamsa) == before
+        low = np.where(unchanged, middle, low)
+        high = np.where(unchanged, high, middle)
+    changes = {}
+    for p, point in enumerate(POINTS):
+        mine = points == p
+        changes[point] = (np.concatenate([[start], high[mine]]), np.concatenate([[signs[0, p]], signs[rows[mine] + 1, p]]))
+    return SignTimeline(start, end, changes)
+
+@functools.lru_cache(maxsize=64)
+def _cached_timeline(start, end, latitude, longitude, system, ayanamsa):
+    return build_timeline(start, end, latitude, longitude, system, ayanamsa)
+
+def _local_midnight(date, tz):
+    midnight = datetime.datetime.combine(date, datetime.time())
+    return tz.localize(midnight) if hasattr(tz, "localize") else midnight.replace(tzinfo=tz)
+
+# Cached timeline of the local calendar day `date` in timezone `tz` (pytz or datetime tzinfo);
+# ayanamsa shifts the signs for sidereal zodiacs
+def sign_timeline(date, latitude, longitude, tz=datetime.timezone.utc, system="placidus", ayanamsa=0.0):
+    start = _local_midnight(date, tz).timestamp()
+    end = _local_midnight(date + datetime.timedelta(days=1), tz).timestamp()
+    return _cached_timeline(start, end, round(float(latitude), COORDINATE_DECIMALS),
+                            round(float(longitude), COORDINATE_DECIMALS), system, float(ayanamsa))